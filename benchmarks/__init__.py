@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Benchmarks for graphab4py
+
+Synthetic neutral landscapes (benchmarks.landscapes), an offline stand-in
+for Graphab (benchmarks.fake_graphab) and a benchmark suite writing JSON
+reports (benchmarks.suite). Run with:
+    python -m benchmarks run --out report.json
+    python -m benchmarks compare old.json new.json
+'''
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:30:02 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+__main__
+
+Purpose
+-------
+Command line interface of the benchmark suite.
+
+Notes
+-----
+    python -m benchmarks run --sizes 256 512 --repeat 3 --out report.json
+    python -m benchmarks compare old.json new.json
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:31:44 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import argparse
+from benchmarks.suite import run_suite, compare
+
+def main():
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks")
+    commands = parser.add_subparsers(dest = "command", required = True)
+    run = commands.add_parser("run", help = "Run the benchmark suite.")
+    run.add_argument("--sizes", type = int, nargs = "+", default = [256, 512])
+    run.add_argument("--fragmentation", type = float, nargs = "+",
+                     default = [.45, .55])
+    run.add_argument("--habitat", type = float, default = .3)
+    run.add_argument("--repeat", type = int, default = 3)
+    run.add_argument("--seed", type = int, default = 0)
+    run.add_argument("--java", default = None)
+    run.add_argument("--graphab", default = None)
+    run.add_argument("--out", default = "benchmark-report.json")
+    cmp = commands.add_parser("compare", help = "Compare two reports.")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--tolerance", type = float, default = .1)
+    args = parser.parse_args()
+    
+    if args.command == "run":
+        report = run_suite(
+            sizes = args.sizes, fragmentation = args.fragmentation,
+            habitat = args.habitat, repeat = args.repeat, seed = args.seed,
+            java = args.java, graphab = args.graphab, out_file = args.out
+            )
+        
+        for r in report["results"]:
+            print(f"{r['scenario']:>20} {r['size']:>6} " +
+                  f"{r['fragmentation']:>5}: {r['median']:8.3f} s")
+    
+    else:
+        for row in compare(args.old, args.new, args.tolerance):
+            print("{0:>20} {1:>6} {2:>5}: {3:8.3f} s -> {4:8.3f} s " \
+                  "({5:.2f}x, {6})".format(*row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+bench_jvm_profiles
+
+Purpose
+-------
+Run a fixed Graphab workload (project, linkset, graph, global metric and
+delta analysis) under each JVM profile and report wall time and peak RSS.
+
+Notes
+-----
+Each profile runs in a separate Python process, so that the peak RSS of its
+Graphab child processes can be read from resource.getrusage. POSIX only.
+Example:
+    python -m benchmarks.bench_jvm_profiles landscape.tif --habitat 1 \
+        --memory 8g --cores 4
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 20:17:52 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import sys, time, json, argparse, resource, tempfile
+import multiprocessing as mp
+from graphab4py import project
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("landscape", help = "Landscape raster (.tif).")
+    parser.add_argument("--habitat", type = int, nargs = "+", default = [1])
+    parser.add_argument("--threshold", type = float, default = 1000.)
+    parser.add_argument("--memory", default = None)
+    parser.add_argument("--cores", type = int, default = None)
+    parser.add_argument("--profiles", nargs = "+",
+                        default = list(project.jvm_profiles.keys()))
+    parser.add_argument("--out", default = None,
+                        help = "Write the results to a JSON file.")
+    
+    return parser.parse_args()
+
+def workload(profile, args, queue):
+    steps = {}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        prj = project.Project(jvm_profile = profile, memory = args.memory,
+                              cores = args.cores)
+        calls = [
+            ("create", lambda: prj.create_project(
+                "bench", args.landscape,
+                habitat = ",".join(str(h) for h in args.habitat),
+                directory = tmp)),
+            ("linkset", lambda: prj.create_linkset(
+                "euclid", "L1", args.threshold, reuse = False)),
+            ("graph", lambda: prj.create_graph("g1")),
+            ("metric", lambda: prj.calculate_metric(
+                "PC", d = args.threshold, p = .05)),
+            ("delta", lambda: prj.delta_by_item(
+                "PC", select = list(range(1, 11)), d = args.threshold,
+                p = .05))
+            ]
+        
+        for name, call in calls:
+            start = time.perf_counter()
+            call()
+            steps[name] = time.perf_counter() - start
+    
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    rss = rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+    queue.put({"steps" : steps,
+               "wall_time" : sum(steps.values()),
+               "peak_rss_mb" : rss})
+
+def main():
+    args = parse_args()
+    ctx = mp.get_context("spawn")
+    results = {}
+    
+    for profile in args.profiles:
+        queue = ctx.Queue()
+        process = ctx.Process(target = workload,
+                              args = (profile, args, queue))
+        process.start()
+        results[profile] = queue.get()
+        process.join()
+        print(f"{profile:>14}: {results[profile]['wall_time']:8.2f} s, " +
+              f"peak RSS {results[profile]['peak_rss_mb']:8.1f} MB")
+    
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent = 2)
+
+if __name__ == "__main__":
+    main()
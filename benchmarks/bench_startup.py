@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+bench_startup
+
+Purpose
+-------
+Compare the startup time of Graphab calls with and without the class-data-
+sharing archive created by graphab4py.enable_fast_startup().
+
+Notes
+-----
+Requires Java 13 or newer and a Graphab .jar file set via set_graphab().
+Example:
+    python -m benchmarks.bench_startup --repeat 10
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 19:48:33 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import sys, time, argparse, statistics, subprocess
+from graphab4py import project
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type = int, default = 10,
+                        help = "Number of calls per configuration.")
+    parser.add_argument("--args", nargs = "*", default = ["--help"],
+                        help = "Graphab arguments of the timed call.")
+    
+    return parser.parse_args()
+
+def timed_calls(cmd, repeat):
+    times = []
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout = subprocess.DEVNULL,
+                       stderr = subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    
+    return times
+
+def main():
+    args = parse_args()
+    java = project.ga_settings.get("java") or project.sys_java
+    graphab = project.ga_settings["graphab"]
+    
+    if graphab is None:
+        sys.exit("Graphab not set. Use graphab4py.set_graphab().")
+    
+    archive = project.enable_fast_startup(temporary = True)
+    base = [java, "-Djava.awt.headless=true"]
+    runs = {
+        "default" : base + ["-jar", graphab] + args.args,
+        "cds" : base + project._cds_flags(java, graphab) +
+            ["-jar", graphab] + args.args
+        }
+    
+    print(f"Java: {project._java_version(java)[1].splitlines()[0]}")
+    print(f"Archive: {archive}")
+    
+    # Warm the file system cache
+    timed_calls(runs["default"], 1)
+    results = {name : timed_calls(cmd, args.repeat) for name, cmd in
+               runs.items()}
+    
+    for name, times in results.items():
+        print(f"{name:>8}: median {statistics.median(times):.3f} s, " +
+              f"min {min(times):.3f} s")
+    
+    speedup = statistics.median(results["default"]) / \
+        statistics.median(results["cds"])
+    print(f"Startup speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
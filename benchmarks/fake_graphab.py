@@ -0,0 +1,420 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+fake_graphab
+
+Purpose
+-------
+Offline stand-in for "java -jar graphab.jar". It accepts the command lines
+built by graphab4py.Project and writes the same kinds of outputs as Graphab
+(project XML, patch raster and table, link tables, local metric columns and
+delta files), computed with scipy and graphab4py's native modules.
+
+Notes
+-----
+Use make_java() to create an executable that can be set as the Java path:
+    java = make_java(directory)
+    graphab4py.project.ga_settings.update({"java" : java,
+                                          "graphab" : "fake.jar"})
+Outputs are computed with the installed graphab4py package, or with the
+package given to make_java() (e.g., "src.graphab4py" in the tests).
+Supported Graphab commands: --create, --project, --show, --linkset
+(euclid, or cost with extcost), --uselinkset, --graph, --usegraph,
+--gmetric and --delta (NC, PC, EC, IIC), --lmetric (F, Dg) and --capa.
+JVM options before -jar are ignored. POSIX only.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 21:38:05 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, sys, stat, math, importlib
+import xml.etree.ElementTree as ET
+import numpy as np
+
+_version = 'openjdk version "17.0.8" 2023-07-18 (graphab4py fake)'
+
+#-----------------------------------------------------------------------------|
+# Functions
+def make_java(directory, package = "graphab4py"):
+    '''
+    Write an executable "java" script that runs this module.
+    
+    Parameters
+    ----------
+    directory : str
+        Directory of the script.
+    package : str, optional
+        Name under which the graphab4py modules used by the stand-in are
+        imported. The default is "graphab4py".
+    
+    Returns
+    -------
+    java : str
+        Path to the script.
+
+    '''
+    os.makedirs(directory, exist_ok = True)
+    java = os.path.join(directory, "java")
+    
+    # The benchmarks package is imported from the directory containing it
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    with open(java, "w") as f:
+        f.write("#!/bin/sh\n" +
+                f'export FAKE_GRAPHAB_PACKAGE="{package}"\n' +
+                f'export PYTHONPATH="{root}${{PYTHONPATH:+:$PYTHONPATH}}"\n' +
+                f'exec "{sys.executable}" -m benchmarks.fake_graphab "$@"\n')
+    
+    os.chmod(java, os.stat(java).st_mode | stat.S_IEXEC)
+    
+    return java
+
+def _native(module):
+    '''
+    Import a module of the graphab4py package selected in make_java().
+    '''
+    package = os.environ.get("FAKE_GRAPHAB_PACKAGE", "graphab4py")
+    
+    return importlib.import_module(f"{package}.{module}")
+
+def _parse(argv):
+    '''
+    Split a command line into Graphab commands, e.g.,
+    ["-jar", "g.jar", "--graph", "name=g1", "nointra"] ->
+    [("graph", {"name" : "g1", "nointra" : True}, ["name=g1", "nointra"])].
+    '''
+    argv = argv[argv.index("-jar") + 2:] if "-jar" in argv else argv
+    commands = []
+    
+    for arg in argv:
+        if arg.startswith("--"):
+            commands.append((arg[2:], {}, []))
+        
+        elif len(commands) > 0:
+            key, _, value = arg.partition("=")
+            commands[-1][1][key] = value if "=" in arg else True
+            commands[-1][2].append(arg)
+    
+    return commands
+
+def _codes(value):
+    return [int(v) for v in str(value).strip("[]() ").replace(" ", "")
+            .split(",") if v != ""]
+
+def _child(parent, tag, text = None):
+    node = ET.SubElement(parent, tag)
+    
+    if text is not None:
+        node.text = str(text)
+    
+    return node
+
+def _entries(root, tag):
+    node = root.find(tag)
+    
+    return _child(root, tag) if node is None else node
+
+def _write_xml(root, file):
+    if hasattr(ET, "indent"):
+        ET.indent(root)
+    
+    ET.ElementTree(root).write(file, encoding = "utf-8",
+                               xml_declaration = True)
+
+def _create(args, positional):
+    import rasterio
+    from scipy import ndimage
+    
+    name, landscape = positional[:2]
+    directory = os.path.join(args["dir"], name)
+    os.makedirs(directory, exist_ok = True)
+    habitat = _codes(args["habitat"])
+    
+    with rasterio.open(landscape) as src:
+        data = src.read(1)
+        profile = src.profile
+        res = src.res[0]
+    
+    structure = np.ones((3, 3)) if args.get("con8") else None
+    labels, n = ndimage.label(np.isin(data, habitat), structure = structure)
+    cells = np.bincount(labels.ravel(), minlength = n + 1)[1:]
+    area = cells * res**2
+    keep = np.ones(n, dtype = bool)
+    
+    if "minarea" in args:
+        keep &= area >= float(args["minarea"]) * 1e4
+    
+    ids = np.zeros(n + 1, dtype = "int32")
+    ids[1:][keep] = np.arange(1, keep.sum() + 1)
+    labels = ids[labels]
+    area = area[keep]
+    perimeter = ndimage.sum_labels(
+        (labels > 0) & ~ndimage.binary_erosion(labels > 0),
+        labels, np.arange(1, len(area) + 1)
+        ) * res
+    
+    profile.update(dtype = "int32", nodata = None, count = 1)
+    
+    with rasterio.open(os.path.join(directory, "patches.tif"), "w",
+                       **profile) as dst:
+        dst.write(labels, 1)
+    
+    with open(os.path.join(directory, "patches.csv"), "w") as f:
+        f.write("Id,Area,Perim,Capacity\n")
+        
+        for i, (a, p) in enumerate(zip(area, perimeter)):
+            f.write(f"{i + 1},{a},{p},{a}\n")
+    
+    root = ET.Element("Project")
+    _child(root, "name", name)
+    _child(_child(root, "patchCodes"), "int", habitat[0])
+    _child(root, "noData", args.get("nodata", "NaN"))
+    _child(root, "merge", "false" if args.get("nomerge") else "true")
+    _child(root, "minArea", float(args.get("minarea", 0)))
+    _child(root, "maxSize", float(args.get("maxsize", 0)))
+    _child(root, "con8", "true" if args.get("con8") else "false")
+    _write_xml(root, os.path.join(directory, name + ".xml"))
+    print(f"Project {name} created\n100%")
+
+class _Project():
+    def __init__(self, file):
+        self.file = file
+        self.dir = os.path.dirname(file)
+        self.root = ET.parse(file).getroot()
+        self.linkset = None
+        self.graph = None
+    
+    def save(self):
+        _write_xml(self.root, self.file)
+    
+    def names(self, tag, kind):
+        node = self.root.find(tag)
+        
+        return [] if node is None else \
+            [e.find(kind).findtext("name") for e in node.findall("entry")]
+    
+    def show(self):
+        linksets = self.names("costLinks", "Linkset")
+        graphs = self.names("graphs", "Graph")
+        print("=== Link sets ===" + "=".join(linksets) + "=== Graphs ===" +
+              "=".join(graphs) + "=== Point sets ===")
+    
+    def create_linkset(self, args):
+        euclid_links = _native("euclid").euclid_links
+        cost_links = _native("costdist").cost_links
+        
+        patch_raster = os.path.join(self.dir, "patches.tif")
+        threshold = float(args["maxcost"]) if "maxcost" in args else None
+        
+        if args["distance"] == "cost":
+            if "extcost" not in args:
+                raise ValueError("The fake Graphab requires extcost.")
+            
+            links = cost_links(patch_raster, args["extcost"],
+                               threshold = np.inf if threshold is None
+                               else threshold)
+        
+        else:
+            links = euclid_links(patch_raster, threshold = threshold,
+                                 planar = not args.get("complete"))
+        
+        links[["ID1", "ID2", "Dist", "DistM"]].to_csv(
+            os.path.join(self.dir, args["name"] + "-links.csv"), index = False
+            )
+        entry = _child(_entries(self.root, "costLinks"), "entry")
+        _child(entry, "string", args["name"])
+        linkset = _child(entry, "Linkset")
+        _child(linkset, "name", args["name"])
+        _child(linkset, "type", 1 if args.get("complete") else 2)
+        _child(linkset, "type_dist", 2 if args["distance"] == "cost" else 1)
+        _child(linkset, "distMax", threshold if threshold else 0)
+        
+        if "extcost" in args:
+            _child(linkset, "extCostFile", args["extcost"])
+        
+        self.save()
+        print("Linkset created\n100.0%")
+    
+    def create_graph(self, args):
+        entry = _child(_entries(self.root, "graphs"), "entry")
+        _child(entry, "string", args["name"])
+        graph = _child(entry, "Graph")
+        _child(graph, "name", args["name"])
+        _child(graph, "linkset", self.linkset)
+        
+        if "threshold" in args:
+            _child(graph, "threshold", args["threshold"])
+        
+        self.save()
+        print("Graph created\n100%")
+    
+    def graph_settings(self):
+        for entry in self.root.find("graphs").findall("entry"):
+            graph = entry.find("Graph")
+            
+            if graph.findtext("name") == self.graph:
+                threshold = graph.findtext("threshold")
+                
+                return graph.findtext("linkset"), \
+                    None if threshold is None else float(threshold)
+        
+        raise ValueError(f"Unknown graph {self.graph}.")
+    
+    def load_graph(self, exclude = None, obj = "patch"):
+        import pandas as pd
+        import rasterio
+        Graph = _native("graph").Graph
+        
+        linkset, threshold = self.graph_settings()
+        patches = pd.read_csv(os.path.join(self.dir, "patches.csv"))
+        links = pd.read_csv(os.path.join(self.dir, linkset + "-links.csv"))
+        
+        with rasterio.open(os.path.join(self.dir, "patches.tif")) as src:
+            area = src.width * src.height * src.res[0] * src.res[1]
+        
+        if exclude is not None and obj == "patch":
+            patches = patches[patches["Id"] != int(exclude)]
+            links = links[(links["ID1"] != int(exclude)) &
+                          (links["ID2"] != int(exclude))]
+        
+        elif exclude is not None:
+            id1, id2 = [int(i) for i in str(exclude).split("-")]
+            links = links[~((links["ID1"] == id1) & (links["ID2"] == id2))]
+        
+        return Graph(patches, links, threshold = threshold, area = area)
+    
+    def metric_name(self, metric, args):
+        params = "".join(f"_{k}{v}" for k, v in args.items() if k != "obj"
+                         and v is not True and k not in ["sel", "fsel"])
+        
+        return f"{metric}{params}_{self.graph}"
+    
+    def global_metric(self, positional, args):
+        metric = positional[0]
+        value = self.load_graph().metric(
+            metric, d = args.get("d"), p = args.get("p"),
+            beta = float(args.get("beta", 1))
+            )
+        print(f"{self.metric_name(metric, args)} : {value}")
+    
+    def local_metric(self, positional, args):
+        import pandas as pd
+        
+        metric = positional[0].upper()
+        graph = self.load_graph()
+        file = os.path.join(self.dir, "patches.csv")
+        patches = pd.read_csv(file)
+        
+        if metric == "F":
+            alpha = -math.log(float(args["p"])) / float(args["d"])
+            values = np.zeros(len(graph.ids))
+            
+            for start in range(0, len(graph.ids), 512):
+                idx = graph.ids[start:start + 512]
+                dist = graph.distances(sources = idx)
+                weights = np.exp(-alpha * dist)
+                weights[np.arange(len(idx)), start + np.arange(len(idx))] = 0
+                values[start:start + len(idx)] = weights @ graph.capacity
+        
+        elif metric == "DG":
+            adjacency = graph.adjacency()
+            values = np.diff(adjacency.indptr)
+        
+        else:
+            raise ValueError(f"Local metric {metric} is not supported.")
+        
+        patches[self.metric_name(positional[0], args)] = values
+        patches.to_csv(file, index = False)
+        print("100%")
+    
+    def delta(self, positional, args):
+        metric = positional[0]
+        obj = args.get("obj", "patch")
+        
+        if "sel" in args:
+            items = str(args["sel"]).split(",")
+        
+        elif "fsel" in args:
+            with open(args["fsel"], "r") as f:
+                items = [l.strip() for l in f if l.strip() != ""]
+        
+        else:
+            items = [str(i) for i in self.load_graph().ids]
+        
+        kwargs = {"d" : args.get("d"), "p" : args.get("p"),
+                  "beta" : float(args.get("beta", 1))}
+        init = self.load_graph().metric(metric, **kwargs)
+        name = self.metric_name(metric, args)
+        
+        with open(os.path.join(self.dir, f"delta-{name}.txt"), "w") as f:
+            f.write(f"Id\td_{name}\n")
+            
+            for item in items:
+                value = self.load_graph(item, obj).metric(metric, **kwargs)
+                f.write(f"{item}\t{(init - value) / init}\n")
+        
+        print("100%")
+
+def main(argv):
+    if "-version" in argv:
+        print(_version, file = sys.stderr)
+        
+        return 0
+    
+    project = None
+    
+    for command, args, positional in _parse(argv):
+        if command == "create":
+            _create(args, positional)
+        
+        elif command == "project":
+            project = _Project(positional[0])
+        
+        elif command == "show":
+            project.show()
+        
+        elif command == "linkset":
+            project.create_linkset(args)
+        
+        elif command == "uselinkset":
+            project.linkset = positional[0]
+        
+        elif command == "graph":
+            project.create_graph(args)
+        
+        elif command == "usegraph":
+            project.graph = positional[0]
+        
+        elif command == "gmetric":
+            project.global_metric(positional, args)
+        
+        elif command == "lmetric":
+            project.local_metric(positional, args)
+        
+        elif command == "delta":
+            project.delta(positional, args)
+        
+        elif command == "capa":
+            print("100%")
+        
+        else:
+            print(f"Exception: command --{command} is not supported by " +
+                  "the fake Graphab.", file = sys.stderr)
+            
+            return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
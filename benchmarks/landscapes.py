@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+landscapes
+
+Purpose
+-------
+Generate synthetic neutral landscapes and resistance rasters of controllable
+size and fragmentation for benchmarks.
+
+Notes
+-----
+random_cluster follows the modified random clusters method (Saura &
+Martinez-Millan 2000), fractal uses spectral synthesis of fractional
+Brownian motion surfaces.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 21:55:46 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import numpy as np
+
+def random_cluster(shape, habitat = .3, p = .55, seed = None):
+    '''
+    Binary landscape by the modified random clusters method. Lower values of
+    p yield smaller, more fragmented patches.
+    
+    Parameters
+    ----------
+    shape : tuple
+        Rows and columns.
+    habitat : float, optional
+        Proportion of habitat (class 1). The default is .3.
+    p : float, optional
+        Probability of the initial percolation map (< .5928 for fragmented
+        landscapes). The default is .55.
+    seed : int, optional
+        Random seed. The default is None.
+    
+    Returns
+    -------
+    landscape : numpy.ndarray
+        Landscape (int16) with habitat 1 and matrix 0.
+
+    '''
+    from scipy import ndimage
+    
+    rng = np.random.default_rng(seed)
+    clusters, n = ndimage.label(rng.random(shape) < p)
+    classes = np.concatenate(
+        [[0], (rng.random(n) < habitat).astype("int16") + 1]
+        )
+    landscape = classes[clusters]
+    
+    # Cells outside the percolation map take the class of the nearest cluster
+    _, (rows, cols) = ndimage.distance_transform_edt(
+        landscape == 0, return_indices = True
+        )
+    landscape = landscape[rows, cols]
+    
+    return (landscape == 2).astype("int16")
+
+def fractal(shape, h = .5, seed = None):
+    '''
+    Continuous fractal surface scaled to [0, 1]. Higher values of h yield
+    smoother surfaces.
+    
+    Parameters
+    ----------
+    shape : tuple
+        Rows and columns.
+    h : float, optional
+        Hurst exponent in (0, 1). The default is .5.
+    seed : int, optional
+        Random seed. The default is None.
+    
+    Returns
+    -------
+    surface : numpy.ndarray
+        Surface (float64).
+
+    '''
+    rng = np.random.default_rng(seed)
+    fy = np.fft.fftfreq(shape[0])[:, None]
+    fx = np.fft.rfftfreq(shape[1])[None, :]
+    f = np.sqrt(fx**2 + fy**2)
+    f[0, 0] = 1.
+    amplitude = f ** -(h + 1.)
+    amplitude[0, 0] = 0.
+    phase = rng.random(amplitude.shape) * 2 * np.pi
+    surface = np.fft.irfft2(amplitude * np.exp(1j * phase), s = shape)
+    surface -= surface.min()
+    
+    return surface / surface.max()
+
+def fractal_landscape(shape, habitat = .3, h = .5, seed = None):
+    '''
+    Binary landscape obtained by thresholding a fractal surface at the
+    quantile that yields the requested proportion of habitat.
+    '''
+    surface = fractal(shape, h = h, seed = seed)
+    
+    return (surface >= np.quantile(surface, 1. - habitat)).astype("int16")
+
+def resistance(landscape, costs = None, noise = .5, h = .7, seed = None):
+    '''
+    Resistance raster for a landscape.
+    
+    Parameters
+    ----------
+    landscape : numpy.ndarray
+        Landscape classes.
+    costs : dict, optional
+        Resistance per class. The default is None ({0 : 10, 1 : 1}).
+    noise : float, optional
+        Relative variation of the resistance added by a fractal surface.
+        The default is .5.
+    h : float, optional
+        Hurst exponent of the noise. The default is .7.
+    seed : int, optional
+        Random seed. The default is None.
+    
+    Returns
+    -------
+    cost : numpy.ndarray
+        Resistance (float32, >= 1).
+
+    '''
+    costs = {0 : 10., 1 : 1.} if costs is None else costs
+    cost = np.ones(landscape.shape)
+    
+    for value, c in costs.items():
+        cost[landscape == value] = c
+    
+    cost *= 1. + noise * fractal(landscape.shape, h = h, seed = seed)
+    
+    return np.maximum(cost, 1.).astype("float32")
+
+def write(file, data, res = 10., origin = (2600000., 1200000.),
+          crs = "EPSG:2056"):
+    '''
+    Write an array as single-band GeoTIFF.
+    '''
+    import rasterio
+    from rasterio.transform import from_origin
+    
+    profile = {"driver" : "GTiff",
+               "height" : data.shape[0],
+               "width" : data.shape[1],
+               "count" : 1,
+               "dtype" : data.dtype,
+               "crs" : crs,
+               "transform" : from_origin(origin[0], origin[1], res, res)}
+    
+    with rasterio.open(file, "w", **profile) as dst:
+        dst.write(data, 1)
+    
+    return file
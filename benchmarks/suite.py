@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+suite
+
+Purpose
+-------
+Time graphab4py workflows (project creation, linkset and graph creation,
+metric sweeps, project and graph loading, distance conversion) on synthetic
+landscapes of different sizes and fragmentation, and write a JSON report that
+can be compared across releases.
+
+Notes
+-----
+By default, Graphab is replaced by benchmarks.fake_graphab, so the suite runs
+offline and measures graphab4py's own overhead plus the native computations.
+Pass java and graphab to time a real Graphab installation. The suite times
+the installed graphab4py package, e.g., after "pip install -e .".
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:14:20 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, json, time, platform, datetime, tempfile, statistics, \
+    subprocess
+import numpy as np
+import pandas as pd
+from benchmarks import landscapes
+from benchmarks.fake_graphab import make_java
+
+_report_version = 1
+
+def _environment():
+    import graphab4py
+    
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output = True,
+            text = True, cwd = os.path.dirname(os.path.abspath(__file__))
+            ).stdout.strip() or None
+    
+    except OSError:
+        commit = None
+    
+    return {"graphab4py" : graphab4py.__version__,
+            "commit" : commit,
+            "python" : platform.python_version(),
+            "numpy" : np.__version__,
+            "platform" : platform.platform(),
+            "processor" : platform.processor(),
+            "cpus" : os.cpu_count()}
+
+def _timed(times, runs, project, name, call):
+    '''
+    Run a scenario step and record its wall time and the Graphab processes it
+    started.
+    '''
+    n_runs = len(project.runs)
+    start = time.perf_counter()
+    result = call()
+    times.setdefault(name, []).append(time.perf_counter() - start)
+    runs.setdefault(name, []).extend(project.runs[n_runs:])
+    
+    return result
+
+def _pipeline(directory, landscape, cost, res, k, settings, times, runs):
+    import graphab4py
+    from graphab4py.project import Project
+    from graphab4py.graph import Graph
+    
+    threshold = 20 * res
+    prj = Project(**settings)
+    _timed(times, runs, prj, "create_project", lambda: prj.create_project(
+        f"bench{k}", landscape, habitat = 1, directory = directory
+        ))
+    _timed(times, runs, prj, "linkset_euclid", lambda: prj.create_linkset(
+        "euclid", "euclid", threshold, reuse = False
+        ))
+    _timed(times, runs, prj, "linkset_cost", lambda: prj.create_linkset(
+        "cost", "cost", threshold * 5, cost_raster = cost, reuse = False
+        ))
+    _timed(times, runs, prj, "create_graph", lambda: prj.create_graph(
+        "g1", linkset = "euclid"
+        ))
+    _timed(times, runs, prj, "metric_sweep", lambda: [
+        prj.calculate_metric(metric, d = d, p = .05)
+        for metric in ["PC", "EC"] for d in [threshold / 4, threshold / 2,
+                                             threshold]
+        ])
+    
+    prj_dir = os.path.dirname(prj.project_file)
+    
+    def load():
+        loaded = Project(**settings)
+        loaded.load_project_xml(prj.project_file)
+        graph = Graph(
+            graphab4py.read_table(os.path.join(prj_dir, "patches.csv"),
+                                  cache = False).reset_index(),
+            pd.read_csv(os.path.join(prj_dir, "euclid-links.csv"))
+            )
+        graph.components()
+        
+        return graph
+    
+    graph = _timed(times, runs, prj, "load_graph", load)
+    _timed(times, runs, prj, "distance_conversion", lambda: [
+        prj.enable_distance_conversion("cost", regression = regression)
+        for regression in ["linzero", "linear", "log"]
+        ])
+    
+    return {"patches" : len(graph.ids), "links" : len(graph.links)}
+
+def run_suite(sizes = (256, 512), fragmentation = (.45, .55), habitat = .3,
+              res = 10., repeat = 3, seed = 0, java = None, graphab = None,
+              out_file = None):
+    '''
+    Run the benchmark scenarios.
+    
+    Parameters
+    ----------
+    sizes : tuple, optional
+        Landscape sizes (cells per side). The default is (256, 512).
+    fragmentation : tuple, optional
+        Percolation probabilities of the random-cluster landscapes (lower
+        values yield more, smaller patches). The default is (.45, .55).
+    habitat : float, optional
+        Proportion of habitat. The default is .3.
+    res : float, optional
+        Cell size. The default is 10.
+    repeat : int, optional
+        Number of repetitions of each pipeline. The default is 3.
+    seed : int, optional
+        Random seed of the landscapes. The default is 0.
+    java, graphab : str, optional
+        Java executable and Graphab .jar file. The default is None, in which
+        case the fake Graphab is used.
+    out_file : str, optional
+        JSON report file. The default is None.
+    
+    Returns
+    -------
+    report : dict
+        Environment, parameters and one result per scenario and landscape.
+
+    '''
+    report = {"version" : _report_version,
+              "created" : datetime.datetime.now().isoformat(
+                  timespec = "seconds"
+                  ),
+              "environment" : _environment(),
+              "parameters" : {"sizes" : list(sizes),
+                              "fragmentation" : list(fragmentation),
+                              "habitat" : habitat, "res" : res,
+                              "repeat" : repeat, "seed" : seed,
+                              "engine" : "fake" if java is None else "graphab"},
+              "results" : []}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        if java is None:
+            settings = {"java" : make_java(tmp),
+                        "graphab" : os.path.join(tmp, "fake-graphab.jar")}
+        
+        else:
+            settings = {"java" : java, "graphab" : graphab}
+        
+        for size in sizes:
+            for p in fragmentation:
+                scale_dir = os.path.join(tmp, f"{size}-{p}")
+                os.makedirs(scale_dir)
+                data = landscapes.random_cluster((size, size), habitat, p,
+                                                 seed = seed)
+                landscape = landscapes.write(
+                    os.path.join(scale_dir, "landscape.tif"), data, res = res
+                    )
+                cost = landscapes.write(
+                    os.path.join(scale_dir, "cost.tif"),
+                    landscapes.resistance(data, seed = seed), res = res
+                    )
+                times, runs = {}, {}
+                
+                for k in range(repeat):
+                    size_info = _pipeline(scale_dir, landscape, cost, res, k,
+                                          settings, times, runs)
+                
+                for name, values in times.items():
+                    rss = [r["max_rss"] for r in runs[name]
+                           if r.get("max_rss") is not None]
+                    report["results"].append(dict({
+                        "scenario" : name,
+                        "size" : size,
+                        "fragmentation" : p,
+                        "median" : statistics.median(values),
+                        "min" : min(values),
+                        "times" : values,
+                        "graphab_calls" : len(runs[name]) // repeat,
+                        "graphab_time" : sum(r["wall_time"] for r in
+                                             runs[name]) / repeat,
+                        "graphab_max_rss" : max(rss) if rss else None
+                        }, **size_info))
+                
+                print(f"Size {size}, p = {p}: {size_info['patches']} " +
+                      f"patches, {size_info['links']} links.")
+    
+    if out_file is not None:
+        with open(out_file, "w") as f:
+            json.dump(report, f, indent = 2)
+    
+    return report
+
+def compare(old, new, tolerance = .1):
+    '''
+    Compare two reports by the median time of each scenario.
+    
+    Parameters
+    ----------
+    old, new : str or dict
+        Reports (or their files).
+    tolerance : float, optional
+        Relative change reported as regression or improvement. The default
+        is .1.
+    
+    Returns
+    -------
+    rows : list
+        (scenario, size, fragmentation, old median, new median, ratio,
+        status) for the scenarios present in both reports.
+
+    '''
+    reports = []
+    
+    for report in [old, new]:
+        if isinstance(report, str):
+            with open(report, "r") as f:
+                report = json.load(f)
+        
+        reports.append({(r["scenario"], r["size"], r["fragmentation"]) :
+                        r["median"] for r in report["results"]})
+    
+    rows = []
+    
+    for key, before in reports[0].items():
+        if key not in reports[1]:
+            continue
+        
+        after = reports[1][key]
+        ratio = after / before if before > 0 else float("inf")
+        status = "slower" if ratio > 1 + tolerance else \
+            "faster" if ratio < 1 - tolerance else "same"
+        rows.append(key + (before, after, ratio, status))
+    
+    return rows
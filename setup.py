@@ -40,7 +40,7 @@ setup(
       
       """,
       install_requires = [
-          "numpy", "matplotlib", "xmltodict"
+          "numpy", "matplotlib", "xmltodict", "pandas", "scipy", "rasterio"
           ],
       package_dir = {"" : "src"},
       packages = find_packages("./src"),
@@ -50,7 +50,7 @@ setup(
           "License :: OSI Approved :: Unlicense",
           "Operating System :: OS Independent"
           ],
-      python_requires = ">=3.8",
+      python_requires = ">=3.9",
       url = "https://github.com/ManuelPopp/graphab4py",
       keywords = ["Graphab", "Network analysis"]
       )
@@ -23,4 +23,15 @@ __email__ = "requests@cdpopp.de"
 __status__ = "Development"
 
 #-----------------------------------------------------------------------------|
-from .project import *
\ No newline at end of file
+from .project import *
+from .raster import *
+from .graph import *
+from .optimize import *
+from .tiling import *
+from .labeling import *
+from .costdist import *
+from .euclid import *
+from .circuit import *
+from .results import *
+from .batch import *
+from . import tracing
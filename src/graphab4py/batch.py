@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 23:40:19 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, json, time, hashlib, threading, warnings
+from .project import Project, _split_memory, _setting_keys
+from .tracing import span
+
+_state_dir = "batch-state"
+
+#-----------------------------------------------------------------------------|
+# Classes
+class _Budget():
+    def __init__(self, cores, memory):
+        '''
+        CPU cores and memory (in MB, None for no limit) shared by the
+        projects of a batch. Projects wait until their share is available.
+        '''
+        self.cores = cores
+        self.memory = memory
+        self._used = [0, 0]
+        self._condition = threading.Condition()
+    
+    def _fits(self, cores, memory):
+        return self._used[0] + cores <= self.cores and (
+            self.memory is None or self._used[1] + memory <= self.memory
+            )
+    
+    def acquire(self, cores, memory):
+        with self._condition:
+            self._condition.wait_for(lambda: self._fits(cores, memory))
+            self._used[0] += cores
+            self._used[1] += memory
+    
+    def release(self, cores, memory):
+        with self._condition:
+            self._used[0] -= cores
+            self._used[1] -= memory
+            self._condition.notify_all()
+
+#-----------------------------------------------------------------------------|
+# Functions
+def _megabytes(memory):
+    '''
+    Java memory limit (e.g., "16g") in MB.
+    '''
+    return 0 if memory is None else int(_split_memory(memory, 1)[:-1])
+
+def _fill(template, row):
+    '''
+    Replace placeholders such as "{threshold}" in the string values of a
+    pipeline template by the values of a manifest row.
+    '''
+    if isinstance(template, dict):
+        return {key : _fill(val, row) for key, val in template.items()}
+    
+    if isinstance(template, list):
+        return [_fill(val, row) for val in template]
+    
+    if isinstance(template, str) and "{" in template:
+        # A single placeholder keeps the type of the manifest value
+        if template.startswith("{") and template.endswith("}") and \
+                template.count("{") == 1:
+            return row[template[1:-1]]
+        
+        return template.format_map(row)
+    
+    return template
+
+def _signature(previous, step, params):
+    return hashlib.sha1(json.dumps(
+        [previous, step, params], sort_keys = True, default = str
+        ).encode()).hexdigest()
+
+def _steps(pipeline, row):
+    '''
+    Steps of the pipeline for one landscape with their parameters.
+    '''
+    unknown = [key for key in pipeline.keys() if key not in
+               ["project", "linksets", "graphs", "metrics"]]
+    
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown pipeline entries {unknown}.")
+    
+    steps = [("project", _fill(pipeline.get("project", {}), row))]
+    
+    for step in ["linkset", "graph", "metric"]:
+        steps += [(step, _fill(p, row)) for p in pipeline.get(step + "s", [])]
+    
+    return steps
+
+def _write_state(file, state):
+    tmp = file + ".tmp"
+    
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent = 1, default = str)
+    
+    os.replace(tmp, file)
+
+def _run_project(row, pipeline, directory, settings):
+    '''
+    Run the pipeline for one landscape. Steps whose parameters and preceding
+    steps are unchanged since a previous run are skipped. If a linkset or
+    graph of the previous run is outdated, the project is recreated, since
+    Graphab projects cannot hold two linksets or graphs of the same name.
+    '''
+    name = str(row["name"])
+    state_file = os.path.join(directory, _state_dir, name + ".json")
+    project_file = os.path.join(directory, name, name + ".xml")
+    state = {"steps" : []}
+    
+    if os.path.isfile(state_file) and os.path.isfile(project_file):
+        with open(state_file, "r") as f:
+            state = json.load(f)
+    
+    done = state["steps"]
+    prj = Project(**settings)
+    stat = os.stat(row["landscape"])
+    signature = _signature(
+        None, "landscape", [os.path.abspath(row["landscape"]), stat.st_size,
+                            stat.st_mtime_ns]
+        )
+    steps = _steps(pipeline, row)
+    signatures = []
+    
+    for step, params in steps:
+        signature = _signature(signature, step, params)
+        signatures.append(signature)
+    
+    valid = 0
+    
+    while valid < min(len(done), len(steps)) and \
+            done[valid]["signature"] == signatures[valid]:
+        valid += 1
+    
+    if any(d["step"] in ["linkset", "graph"] for d in done[valid:]):
+        valid = 0
+    
+    results = []
+    
+    for k, ((step, params), signature) in enumerate(zip(steps, signatures)):
+        if k < valid:
+            if step == "project":
+                prj.linksets = prj.graphs = prj.pointsets = None
+                prj.linkset_info = {}
+                prj.load_project_xml(project_file)
+                prj.directory = directory
+            
+            elif step == "metric":
+                results.append(dict(done[k]["result"], reused = True))
+            
+            continue
+        
+        del done[k:]
+        
+        with span("batch step", project = name, step = step):
+            if step == "project":
+                prj.create_project(name, row["landscape"],
+                                   directory = directory, overwrite = True,
+                                   **params)
+                record = None
+            
+            elif step == "linkset":
+                prj.create_linkset(**params)
+                record = None
+            
+            elif step == "graph":
+                prj.create_graph(**params)
+                record = None
+            
+            else:
+                params = dict(params)
+                metric = params.pop("metric")
+                out = prj.calculate_metric(metric, **params)
+                value = out.get("metric_value") if isinstance(out, dict) \
+                    else None
+                
+                if params.get("mtype", "global") == "global" and value is None:
+                    raise Exception(f"Metric {metric} failed: {out}")
+                
+                run = (out.get("run") or {}) if isinstance(out, dict) \
+                    else {}
+                record = {
+                    "metric" : metric,
+                    "graph" : params.pop("graph", None) or prj.graphs[0],
+                    "linkset" : params.pop("linkset", None) or
+                    prj.linksets[0],
+                    "parameters" : ",".join(
+                        f"{key}={val}" for key, val in sorted(params.items())
+                        if key not in ["mtype"]
+                        ) or None,
+                    "value" : value if isinstance(value, (int, float))
+                    else None,
+                    "wall_time" : run.get("wall_time")
+                    }
+                results.append(dict(record, reused = False))
+        
+        done.append({"step" : step, "signature" : signature,
+                     "result" : record, "finished" : time.time()})
+        _write_state(state_file, state)
+    
+    return results
+
+def run_batch(manifest, pipeline, directory, max_workers = None,
+              cores = None, memory = None, results_file = None,
+              **ga_settings):
+    '''
+    Run the same pipeline (create project, linksets, graphs, metrics) for
+    many landscapes. Projects run concurrently within a global budget of CPU
+    cores and memory. The steps completed for each landscape are recorded
+    in <directory>/batch-state, so that a rerun only executes steps which
+    failed, were added or whose parameters or landscape changed.
+    
+    Parameters
+    ----------
+    manifest : pandas.DataFrame or str
+        Table (or CSV file) with one row per landscape and the columns
+        "name" (project name) and "landscape" (raster file). The optional
+        columns "cores" and "memory" set the resources of a project; all
+        columns can be referenced in the pipeline as "{column}".
+    pipeline : dict
+        Pipeline template with the entries "project" (arguments of
+        create_project except name, patches and directory), "linksets",
+        "graphs" and "metrics" (lists of arguments of create_linkset,
+        create_graph and calculate_metric), e.g.,
+        {"project" : {"habitat" : 1},
+         "linksets" : [{"disttype" : "euclid", "linkname" : "L1",
+                        "threshold" : "{threshold}"}],
+         "graphs" : [{"graphname" : "g1"}],
+         "metrics" : [{"metric" : "EC", "d" : 1000, "p" : .05}]}
+    directory : str
+        Directory of the projects.
+    max_workers : int, optional
+        Maximum number of projects running at the same time. The default is
+        None (number of cores divided by the cores per project).
+    cores : int, optional
+        Total number of cores. The default is None (number of CPUs).
+    memory : str, optional
+        Total Java memory (e.g., "64g"). The default is None (no limit).
+    results_file : str, optional
+        Write the results to this file, as Parquet if it ends with
+        ".parquet" and as CSV otherwise. The default is None.
+    
+    :param kwargs:
+        Graphab settings for all projects (e.g., java, graphab, jvm_profile).
+    
+    Returns
+    -------
+    results : pandas.DataFrame
+        One row per landscape and metric with the manifest columns, the
+        metric, graph, linkset, parameters, global metric value ("value"),
+        wall time of the Graphab call and whether the result was reused.
+        Failed landscapes are listed in results.attrs["failed"].
+
+    '''
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if isinstance(manifest, str):
+        manifest = pd.read_csv(manifest)
+    
+    missing = [c for c in ["name", "landscape"] if c not in manifest.columns]
+    
+    if len(missing) > 0:
+        raise ValueError(f"Manifest lacks the columns {missing}.")
+    
+    if manifest["name"].duplicated().any():
+        raise ValueError("Project names in the manifest must be unique.")
+    
+    unknown = [key for key in ga_settings.keys() if key not in _setting_keys]
+    
+    if len(unknown) > 0:
+        raise TypeError(f"Unknown settings {unknown}.")
+    
+    cores = os.cpu_count() if cores is None else int(cores)
+    rows = manifest.to_dict("records")
+    n = len(rows) if max_workers is None else int(max_workers)
+    n = max(1, min(n, len(rows), cores))
+    budget = _Budget(cores, None if memory is None else _megabytes(memory))
+    default_cores = max(1, cores // n)
+    default_memory = _split_memory(memory, n)
+    
+    for row in rows:
+        row["cores"] = int(row["cores"]) if pd.notna(
+            row.get("cores", None)
+            ) else default_cores
+        row["memory"] = row["memory"] if pd.notna(
+            row.get("memory", None)
+            ) else default_memory
+        
+        if row["cores"] > cores or (memory is not None and
+                                    _megabytes(row["memory"]) >
+                                    budget.memory):
+            raise ValueError(
+                f"Resources of project {row['name']} exceed the budget."
+                )
+    
+    os.makedirs(os.path.join(directory, _state_dir), exist_ok = True)
+    failed = {}
+    
+    def run(row):
+        need = (row["cores"], _megabytes(row["memory"]))
+        budget.acquire(*need)
+        
+        try:
+            with span("batch project", project = row["name"]):
+                settings = dict(ga_settings, cores = row["cores"],
+                                memory = row["memory"])
+                
+                return [dict(row, **r) for r in _run_project(
+                    row, pipeline, directory, settings
+                    )]
+        
+        except Exception as e:
+            failed[row["name"]] = f"{type(e).__name__}: {e}"
+            warnings.warn(f"Project {row['name']} failed: {e}")
+            
+            return []
+        
+        finally:
+            budget.release(*need)
+    
+    with ThreadPoolExecutor(max_workers = n) as executor:
+        records = [r for rs in executor.map(run, rows) for r in rs]
+    
+    columns = list(manifest.columns) + [
+        c for c in ["cores", "memory", "metric", "graph", "linkset",
+                    "parameters", "value", "wall_time", "reused"]
+        if c not in manifest.columns
+        ]
+    results = pd.DataFrame(records, columns = columns)
+    
+    if results_file is not None:
+        if results_file.endswith(".parquet"):
+            results.to_parquet(results_file, index = False)
+        
+        else:
+            results.to_csv(results_file, index = False)
+    
+    results.attrs["failed"] = failed
+    
+    return results
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 17:05:31 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import math
+import numpy as np
+
+_SQRT2 = math.sqrt(2.)
+
+# Neighbour offsets (row, column, step length in cells), see costdist
+_steps = ((0, 1, 1.), (1, 0, 1.), (1, 1, _SQRT2), (1, -1, _SQRT2))
+
+# Memory (bytes) of the right-hand sides solved at once
+_solve_memory = 2**28
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _laplacian(rows, cols, conductance, n):
+    '''
+    Graph Laplacian from a list of undirected edges.
+    '''
+    from scipy import sparse
+    
+    adjacency = sparse.coo_matrix(
+        (np.concatenate([conductance, conductance]),
+         (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape = (n, n)
+        ).tocsr()
+    adjacency.sum_duplicates()
+    degree = np.asarray(adjacency.sum(axis = 1)).ravel()
+    
+    return (sparse.diags(degree) - adjacency).tocsc()
+
+def _raster_laplacian(labels, cost, patch_ids):
+    '''
+    Laplacian of the 8-neighbour graph of a cost raster, with all cells of a
+    patch collapsed into one node. The resistance between adjacent cells is
+    the mean of both cell costs times the step length in cells.
+    
+    Parameters
+    ----------
+    labels : numpy.ndarray
+        Patch IDs (<= 0 outside patches).
+    cost : numpy.ndarray
+        Cost values (NaN or <= 0 where impassable). Patch cells are always
+        passable.
+    patch_ids : numpy.ndarray
+        Sorted patch IDs. Patch i is node i.
+    
+    Returns
+    -------
+    laplacian : scipy.sparse.csc_matrix
+        Laplacian matrix.
+
+    '''
+    h, w = cost.shape
+    patch = labels > 0
+    cost = np.asarray(cost, dtype = "float64")
+    cost = np.where(np.isfinite(cost) & (cost > 0), cost, np.nan)
+    valid = np.isfinite(cost) | patch
+    node = np.full(cost.shape, -1, dtype = "int64")
+    node[patch] = np.searchsorted(patch_ids, labels[patch])
+    other = valid & ~patch
+    node[other] = len(patch_ids) + np.arange(np.count_nonzero(other))
+    rows, cols, conductance = [], [], []
+    
+    for dr, dc, f in _steps:
+        c0, c1 = max(0, -dc), w - max(0, dc)
+        na = node[0:h - dr, c0:c1]
+        nb = node[dr:h, c0 + dc:c1 + dc]
+        ca = cost[0:h - dr, c0:c1]
+        cb = cost[dr:h, c0 + dc:c1 + dc]
+        ok = (na >= 0) & (nb >= 0) & (na != nb)
+        na, nb, ca, cb = na[ok], nb[ok], ca[ok], cb[ok]
+        
+        # Patch cells without a cost take the cost of the other cell
+        ca = np.where(np.isnan(ca), cb, ca)
+        cb = np.where(np.isnan(cb), ca, cb)
+        keep = np.isfinite(ca)
+        rows.append(na[keep])
+        cols.append(nb[keep])
+        conductance.append(1. / ((ca[keep] + cb[keep]) * (f / 2.)))
+    
+    return _laplacian(np.concatenate(rows), np.concatenate(cols),
+                      np.concatenate(conductance),
+                      len(patch_ids) + np.count_nonzero(other))
+
+def _effective_resistance(laplacian, a, b, n_jobs = None, batch_size = None):
+    '''
+    Effective resistance between pairs of nodes. One node per connected
+    component is grounded, the reduced Laplacian is factorised once, and the
+    columns of its inverse are solved for all end nodes in batches of
+    right-hand sides, in parallel.
+    
+    Parameters
+    ----------
+    laplacian : scipy.sparse.csc_matrix
+        Laplacian matrix.
+    a, b : numpy.ndarray
+        Node indices of the pairs.
+    n_jobs : int, optional
+        Number of threads. The default is None (number of CPUs).
+    batch_size : int, optional
+        Number of right-hand sides solved at once. The default is None, in
+        which case it is derived from the size of the system.
+    
+    Returns
+    -------
+    resistance : numpy.ndarray
+        Effective resistance of each pair (inf for unconnected nodes).
+
+    '''
+    from scipy.sparse.csgraph import connected_components
+    from scipy.sparse.linalg import splu
+    from concurrent.futures import ThreadPoolExecutor
+    
+    n = laplacian.shape[0]
+    _, comp = connected_components(laplacian, directed = False)
+    _, ground = np.unique(comp, return_index = True)
+    keep = np.ones(n, dtype = bool)
+    keep[ground] = False
+    pos = np.full(n, -1, dtype = "int64")
+    pos[keep] = np.arange(np.count_nonzero(keep))
+    m = int(keep.sum())
+    
+    a = np.asarray(a, dtype = "int64")
+    b = np.asarray(b, dtype = "int64")
+    resistance = np.full(len(a), np.inf)
+    
+    if m == 0 or len(a) == 0:
+        resistance[(a == b)] = 0.
+        
+        return resistance
+    
+    lu = splu(laplacian[keep][:, keep].tocsc())
+    nodes = np.unique(np.concatenate([a, b]))
+    
+    if batch_size is None:
+        batch_size = max(1, min(256, _solve_memory // (8 * m)))
+    
+    # Entries G[s, t] of the inverse of the grounded Laplacian (zero for
+    # grounded nodes) for end nodes s and t
+    diag = np.zeros(n)
+    cross = np.zeros(len(a))
+    order = np.argsort(a, kind = "stable")
+    
+    def solve(batch):
+        rhs = np.zeros((m, len(batch)))
+        solvable = pos[batch] >= 0
+        rhs[pos[batch[solvable]], np.flatnonzero(solvable)] = 1.
+        x = lu.solve(rhs)
+        x[:, ~solvable] = 0.
+        
+        # Values at the end nodes, with zeros for grounded nodes
+        def at(t, j):
+            return np.where(pos[t] >= 0, x[np.maximum(pos[t], 0), j], 0.)
+        
+        col = np.arange(len(batch))
+        diag[batch] = at(batch, col)
+        lo = np.searchsorted(a[order], batch[0])
+        hi = np.searchsorted(a[order], batch[-1], side = "right")
+        links = order[lo:hi]
+        j = np.searchsorted(batch, a[links])
+        cross[links] = at(b[links], j)
+    
+    batches = [nodes[i:i + batch_size] for i in
+               range(0, len(nodes), batch_size)]
+    
+    with ThreadPoolExecutor(max_workers = n_jobs) as executor:
+        list(executor.map(solve, batches))
+    
+    connected = comp[a] == comp[b]
+    resistance[connected] = (diag[a] + diag[b] - 2. * cross)[connected]
+    
+    return resistance
+
+#-----------------------------------------------------------------------------|
+# Functions
+def raster_resistance(patch_raster, cost_raster, links, n_jobs = None,
+                      batch_size = None):
+    '''
+    Compute effective resistances (resistance distances) between linked
+    patches from a cost raster, as in circuit theory. Cells are nodes of a
+    resistor network (8-neighbourhood, resistance between adjacent cells is
+    the mean of both costs times the step length in cells) and each patch is
+    collapsed into a single node.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of patch IDs, e.g., the patches.tif file of a Graphab project.
+    cost_raster : str
+        Resistance raster on the same grid. NoData cells and cells with a
+        cost <= 0 are not part of the network.
+    links : pandas.DataFrame
+        Link table with the columns "ID1" and "ID2".
+    n_jobs : int, optional
+        Number of threads. The default is None (number of CPUs).
+    batch_size : int, optional
+        Number of right-hand sides solved at once. The default is None.
+    
+    Returns
+    -------
+    links : pandas.DataFrame
+        Copy of the link table with an additional column "Resistance".
+
+    '''
+    import rasterio
+    
+    with rasterio.open(patch_raster) as lab, \
+            rasterio.open(cost_raster) as cst:
+        if (lab.height, lab.width) != (cst.height, cst.width) or \
+                not np.allclose(tuple(lab.transform)[:6],
+                                tuple(cst.transform)[:6]):
+            raise ValueError(
+                f"Rasters {patch_raster} and {cost_raster} are not aligned."
+                )
+        
+        labels = lab.read(1)
+        cost = np.ma.filled(cst.read(1, masked = True).astype("float64"),
+                            np.nan)
+    
+    patch_ids = np.unique(labels[labels > 0])
+    laplacian = _raster_laplacian(labels, cost, patch_ids)
+    links = links.copy()
+    links["Resistance"] = _effective_resistance(
+        laplacian,
+        np.searchsorted(patch_ids, links["ID1"]),
+        np.searchsorted(patch_ids, links["ID2"]),
+        n_jobs = n_jobs, batch_size = batch_size
+        )
+    
+    return links
+
+def graph_resistance(links, weight = "Dist", n_jobs = None,
+                     batch_size = None):
+    '''
+    Compute effective resistances between linked patches on the patch graph,
+    using the link weights as resistances.
+    
+    Parameters
+    ----------
+    links : pandas.DataFrame
+        Link table with the columns "ID1", "ID2" and weight, e.g., a
+        <linkset>-links.csv file or the links of get_graph_representation().
+    weight : str, optional
+        Column used as link resistance. The default is "Dist".
+    n_jobs : int, optional
+        Number of threads. The default is None (number of CPUs).
+    batch_size : int, optional
+        Number of right-hand sides solved at once. The default is None.
+    
+    Returns
+    -------
+    links : pandas.DataFrame
+        Copy of the link table with an additional column "Resistance".
+
+    '''
+    ids, inverse = np.unique(
+        np.concatenate([links["ID1"], links["ID2"]]), return_inverse = True
+        )
+    a, b = inverse[:len(links)], inverse[len(links):]
+    r = np.asarray(links[weight], dtype = "float64")
+    
+    # Links of length zero would have an infinite conductance
+    r = np.maximum(r, np.finfo("float64").eps * max(r.max(initial = 0.), 1.))
+    laplacian = _laplacian(a, b, 1. / r, len(ids))
+    links = links.copy()
+    links["Resistance"] = _effective_resistance(
+        laplacian, a, b, n_jobs = n_jobs, batch_size = batch_size
+        )
+    
+    return links
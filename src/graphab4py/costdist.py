@@ -0,0 +1,942 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 14:02:37 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, math, json
+import numpy as np
+from .raster import _windows, _group_reduce, link_search_buffer
+
+_SQRT2 = math.sqrt(2.)
+
+# Neighbour offsets (row, column, step length in cells). Each undirected edge
+# of the 8-neighbourhood is generated once.
+_steps = ((0, 1, 1.), (1, 0, 1.), (1, 1, _SQRT2), (1, -1, _SQRT2))
+
+# Raster handles of the worker processes
+_worker = {}
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _grid_graph(cost):
+    '''
+    Build the 8-neighbour graph of a cost array. Moving between two adjacent
+    cells costs the mean of both cell costs times the step length in cells
+    (1 or sqrt(2)), which is how Graphab accumulates cost.
+    
+    Parameters
+    ----------
+    cost : numpy.ndarray
+        Two-dimensional cost array. Cells with NaN or a cost <= 0 cannot be
+        crossed.
+    
+    Returns
+    -------
+    graph : scipy.sparse.csr_matrix
+        Graph of the valid cells (to be used with directed = False).
+    index : numpy.ndarray
+        Node index of each cell (-1 for invalid cells).
+
+    '''
+    from scipy import sparse
+    
+    h, w = cost.shape
+    valid = np.isfinite(cost) & (cost > 0)
+    index = np.full(cost.shape, -1, dtype = "int64")
+    index[valid] = np.arange(np.count_nonzero(valid))
+    rows, cols, weights = [], [], []
+    
+    for dr, dc, f in _steps:
+        c0, c1 = max(0, -dc), w - max(0, dc)
+        ia = index[0:h - dr, c0:c1]
+        ib = index[dr:h, c0 + dc:c1 + dc]
+        ok = (ia >= 0) & (ib >= 0)
+        rows.append(ia[ok])
+        cols.append(ib[ok])
+        weights.append(
+            (cost[0:h - dr, c0:c1][ok] + cost[dr:h, c0 + dc:c1 + dc][ok]) * \
+                (f / 2.)
+            )
+    
+    n = int(valid.sum())
+    graph = sparse.csr_matrix(
+        (np.concatenate(weights),
+         (np.concatenate(rows), np.concatenate(cols))),
+        shape = (n, n)
+        )
+    
+    return graph, index
+
+def _path_lengths(predecessors, rows, cols, res, seed = None):
+    '''
+    Metric length of the shortest paths given a predecessor array, computed by
+    pointer jumping (logarithmic in the path length). Nodes whose predecessor
+    is a virtual source (index len(rows)) start with the length given in seed.
+    '''
+    n = rows.size
+    has = (predecessors >= 0) & (predecessors < n)
+    parent = np.where(has, predecessors, 0)
+    step = np.where(
+        has, np.hypot(rows - rows[parent], cols - cols[parent]) * res, 0.
+        )
+    
+    if seed is not None:
+        root = predecessors == n
+        step[root] = seed[root]
+    
+    parent = np.where(has, predecessors, -1)
+    
+    while np.any(parent >= 0):
+        ok = parent >= 0
+        step[ok] += step[parent[ok]]
+        parent[ok] = parent[parent[ok]]
+    
+    return step
+
+def _patch_bounds(patch_raster, block_size = None):
+    '''
+    Bounding boxes (in cells) of all patches of a patch raster.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of patch IDs. Cells with a value <= 0 are ignored.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    bounds : dict
+        Dictionary {patch ID : (row_min, row_max, col_min, col_max)}.
+
+    '''
+    import rasterio
+    
+    bounds = {}
+    
+    with rasterio.open(patch_raster) as src:
+        for window in _windows(src.height, src.width, block_size):
+            labels = src.read(1, window = window)
+            rows, cols = np.nonzero(labels > 0)
+            
+            if rows.size == 0:
+                continue
+            
+            ids = labels[rows, cols].astype("int64")
+            rows = rows + int(window.row_off)
+            cols = cols + int(window.col_off)
+            ids_, r0 = _group_reduce(ids, rows, np.minimum)
+            _, r1 = _group_reduce(ids, rows, np.maximum)
+            _, c0 = _group_reduce(ids, cols, np.minimum)
+            _, c1 = _group_reduce(ids, cols, np.maximum)
+            
+            for i, pid in enumerate(ids_):
+                new = (r0[i], r1[i], c0[i], c1[i])
+                old = bounds.get(int(pid), new)
+                bounds[int(pid)] = (min(old[0], new[0]), max(old[1], new[1]),
+                                    min(old[2], new[2]), max(old[3], new[3]))
+    
+    return {k : tuple(int(v) for v in b) for k, b in bounds.items()}
+
+def _search_window(bounds, buffer, shape):
+    '''
+    Window (row_off, col_off, height, width) around a patch bounding box.
+    '''
+    r0 = max(0, bounds[0] - buffer)
+    c0 = max(0, bounds[2] - buffer)
+    r1 = min(shape[0], bounds[1] + buffer + 1)
+    c1 = min(shape[1], bounds[3] + buffer + 1)
+    
+    return (r0, c0, r1 - r0, c1 - c0)
+
+def _read_window(src, window, nodata_to_nan = True):
+    from rasterio.windows import Window
+    
+    row_off, col_off, h, w = window
+    data = src.read(1, window = Window(col_off, row_off, w, h),
+                    masked = nodata_to_nan)
+    
+    if nodata_to_nan:
+        data = np.ma.filled(data.astype("float64"), np.nan)
+    
+    return data
+
+def _init_worker(patch_raster, cost_raster):
+    import rasterio
+    
+    _worker["labels"] = rasterio.open(patch_raster)
+    _worker["cost"] = rasterio.open(cost_raster)
+
+def _nearest_targets(pid, labels, dist, length, threshold):
+    '''
+    Cheapest cell of each patch with a higher ID than pid within threshold.
+    '''
+    target = (labels > pid) & (dist <= threshold)
+    ids = labels[target].astype("int64")
+    d = dist[target].astype("float64")
+    m = length[target].astype("float64")
+    
+    if ids.size == 0:
+        return np.zeros((0, 4))
+    
+    order = np.lexsort((d, ids))
+    ids, d, m = ids[order], d[order], m[order]
+    first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    
+    return np.column_stack(
+        [np.full(first.size, pid), ids[first], d[first], m[first]]
+        )
+
+def _source_surface(pid, window, threshold, res):
+    labels = _read_window(_worker["labels"], window, nodata_to_nan = False)
+    cost = _read_window(_worker["cost"], window)
+    dist, length = accumulated_cost(
+        labels == pid, cost, threshold, res = res
+        )
+    
+    return labels, dist, length
+
+def _extend_surface(dist, length, cost, threshold, res):
+    '''
+    Extend an accumulated cost surface computed for a lower threshold. Only
+    the band of cells beyond the previous threshold is searched, starting
+    from a virtual source connected to the frontier of the reached cells with
+    their stored accumulated cost.
+    '''
+    from scipy import sparse, ndimage
+    from scipy.sparse.csgraph import dijkstra
+    
+    cost = np.asarray(cost, dtype = "float64")
+    reached = np.isfinite(dist)
+    unreached = np.isfinite(cost) & (cost > 0) & ~reached
+    frontier = reached & ndimage.binary_dilation(
+        unreached, structure = np.ones((3, 3), dtype = bool)
+        )
+    
+    if not frontier.any():
+        return dist, length
+    
+    graph, index = _grid_graph(np.where(unreached | frontier, cost, np.nan))
+    n = graph.shape[0]
+    graph = graph.tocoo()
+    seeds = index[frontier]
+    
+    # Edges from the virtual source are offset by 1, as csgraph ignores
+    # zero weights
+    graph = sparse.csr_matrix(
+        (np.concatenate([graph.data, dist[frontier] + 1.]),
+         (np.concatenate([graph.row, np.full(seeds.size, n)]),
+          np.concatenate([graph.col, seeds]))),
+        shape = (n + 1, n + 1)
+        )
+    d, predecessors = dijkstra(
+        graph, directed = False, indices = n, limit = float(threshold) + 1.,
+        return_predecessors = True
+        )
+    rows, cols = np.nonzero(index >= 0)
+    seed = np.zeros(n)
+    seed[seeds] = length[frontier]
+    m = _path_lengths(predecessors[:n], rows, cols, float(res), seed = seed)
+    d = d[:n] - 1.
+    m[~np.isfinite(d)] = np.inf
+    
+    dist, length = dist.copy(), length.copy()
+    keep = reached[rows, cols]
+    dist[rows[~keep], cols[~keep]] = d[~keep]
+    length[rows[~keep], cols[~keep]] = m[~keep]
+    
+    return dist, length
+
+def _source_links(args):
+    '''
+    Links of one source patch to all patches with a higher ID.
+    '''
+    pid, window, threshold, res = args
+    labels, dist, length = _source_surface(pid, window, threshold, res)
+    
+    return _nearest_targets(pid, labels, dist, length, threshold)
+
+def _store_surface(args):
+    '''
+    Compute the accumulated cost surface of one source patch, crop it to the
+    cells reached and save it to file.
+    '''
+    pid, window, threshold, res, file, compress, dtype, previous = args
+    
+    if previous is None:
+        _, dist, length = _source_surface(pid, window, threshold, res)
+    
+    else:
+        # Place the surface of the lower threshold into the new window
+        surface, (pr, pc, ph, pw) = _load_surface(previous[0]), previous[1]
+        r, c = pr - window[0], pc - window[1]
+        dist = np.full(window[2:], np.inf)
+        length = np.full(window[2:], np.inf)
+        dist[r:r + ph, c:c + pw] = surface[0]
+        length[r:r + ph, c:c + pw] = surface[1]
+        cost = _read_window(_worker["cost"], window)
+        dist, length = _extend_surface(dist, length, cost, threshold, res)
+    
+    rows, cols = np.nonzero(np.isfinite(dist))
+    
+    if rows.size == 0:
+        r0 = c0 = 0
+        r1 = c1 = -1
+    
+    else:
+        r0, r1, c0, c1 = rows.min(), rows.max(), cols.min(), cols.max()
+    
+    surface = np.stack([dist[r0:r1 + 1, c0:c1 + 1],
+                        length[r0:r1 + 1, c0:c1 + 1]]).astype(dtype)
+    
+    if compress:
+        file += ".npz"
+        np.savez_compressed(file, surface = surface)
+    
+    else:
+        file += ".npy"
+        np.save(file, surface)
+    
+    return {"file" : os.path.basename(file),
+            "window" : [int(window[0] + r0), int(window[1] + c0),
+                        int(surface.shape[1]), int(surface.shape[2])],
+            "threshold" : float(threshold)}
+
+def _source_windows(patch_raster, cost_raster, threshold, block_size = None):
+    '''
+    Search window of each source patch (patch bounding box plus the number of
+    cells a path within threshold can traverse).
+    
+    Returns
+    -------
+    windows : dict
+        Dictionary {patch ID : (row_off, col_off, height, width)}.
+    res : float
+        Cell size.
+
+    '''
+    import rasterio
+    
+    with rasterio.open(patch_raster) as lab, \
+            rasterio.open(cost_raster) as cst:
+        if (lab.height, lab.width) != (cst.height, cst.width) or \
+                not np.allclose(tuple(lab.transform)[:6],
+                                tuple(cst.transform)[:6]):
+            raise ValueError(
+                f"Rasters {patch_raster} and {cost_raster} are not aligned."
+                )
+        
+        shape = (lab.height, lab.width)
+        res = max(abs(lab.res[0]), abs(lab.res[1]))
+    
+    buffer = int(round(link_search_buffer(
+        threshold, "cost", cost_raster, block_size = block_size
+        ) / res)) + 1
+    bounds = _patch_bounds(patch_raster, block_size = block_size)
+    windows = {pid : _search_window(b, buffer, shape)
+               for pid, b in sorted(bounds.items())}
+    
+    return windows, res
+
+def _links_table(results):
+    import pandas as pd
+    
+    results = np.concatenate([np.zeros((0, 4))] + list(results))
+    
+    return pd.DataFrame({"ID1" : results[:, 0].astype("int64"),
+                         "ID2" : results[:, 1].astype("int64"),
+                         "Dist" : results[:, 2],
+                         "DistM" : results[:, 3]})
+
+def _load_surface(file, mmap = True):
+    if file.endswith(".npz"):
+        with np.load(file) as archive:
+            return archive["surface"]
+    
+    return np.load(file, mmap_mode = "r" if mmap else None)
+
+def _raster_signature(file):
+    '''
+    Properties identifying a raster file (path, size, modification time and
+    grid), used to detect whether stored results are outdated.
+    '''
+    import rasterio
+    
+    stat = os.stat(file)
+    
+    with rasterio.open(file) as src:
+        shape = [src.height, src.width]
+        transform = list(tuple(src.transform)[:6])
+    
+    return {"file" : os.path.abspath(file),
+            "size" : stat.st_size,
+            "mtime" : stat.st_mtime,
+            "shape" : shape,
+            "transform" : transform}
+
+#-----------------------------------------------------------------------------|
+# Functions
+def accumulated_cost(sources, cost, threshold = None, res = 1.):
+    '''
+    Accumulated cost from a set of source cells (bounded multi-source
+    Dijkstra on the 8-neighbour graph of the cost array).
+    
+    Parameters
+    ----------
+    sources : numpy.ndarray
+        Boolean array marking the source cells.
+    cost : numpy.ndarray
+        Cost array of the same shape. Cells with NaN or a cost <= 0 cannot be
+        crossed.
+    threshold : numeric, optional
+        Maximum accumulated cost. Cells beyond are set to inf. The default is
+        None (unbounded).
+    res : numeric, optional
+        Cell size used to compute the metric path lengths. The default is 1.
+    
+    Returns
+    -------
+    dist : numpy.ndarray
+        Accumulated cost of each cell (inf where not reached).
+    length : numpy.ndarray
+        Metric length of the least-cost path to each cell (inf where not
+        reached).
+
+    '''
+    from scipy.sparse.csgraph import dijkstra
+    
+    cost = np.asarray(cost, dtype = "float64")
+    graph, index = _grid_graph(cost)
+    dist = np.full(cost.shape, np.inf)
+    length = np.full(cost.shape, np.inf)
+    src = index[np.asarray(sources, dtype = bool) & (index >= 0)]
+    
+    if src.size == 0:
+        return dist, length
+    
+    limit = np.inf if threshold is None else float(threshold)
+    d, predecessors, _ = dijkstra(
+        graph, directed = False, indices = src, limit = limit,
+        min_only = True, return_predecessors = True
+        )
+    rows, cols = np.nonzero(index >= 0)
+    m = _path_lengths(predecessors, rows, cols, float(res))
+    m[~np.isfinite(d)] = np.inf
+    dist[rows, cols] = d
+    length[rows, cols] = m
+    
+    return dist, length
+
+def cost_links(patch_raster, cost_raster, threshold, n_jobs = None,
+               block_size = None, out_file = None, store = None):
+    '''
+    Compute least-cost distances between habitat patches natively, without
+    calling Graphab. Costs accumulate as in Graphab: each move between two
+    adjacent cells (8-neighbourhood) costs the mean of both cell costs, times
+    sqrt(2) for diagonal moves. Paths start at any cell of the source patch
+    and may cross other patches. Source patches are processed in parallel,
+    each within a window bounded by the threshold.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of patch IDs, e.g., the patches.tif file of a Graphab project.
+        Cells with a value <= 0 are not part of a patch.
+    cost_raster : str
+        Resistance raster on the same grid as patch_raster. NoData cells and
+        cells with a cost <= 0 cannot be crossed.
+    threshold : numeric
+        Maximum accumulated cost of a link.
+    n_jobs : int, optional
+        Number of processes. The default is None (number of CPUs).
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    out_file : str, optional
+        Write the links to this CSV file. The default is None.
+    store : graphab4py.CostSurfaceStore, optional
+        Store of accumulated cost surfaces. Surfaces stored with a threshold
+        at least as large are read instead of recomputed, and missing
+        surfaces are computed and added to the store. The default is None.
+    
+    Returns
+    -------
+    links : pandas.DataFrame
+        Link table with the columns "ID1", "ID2", "Dist" (accumulated cost)
+        and "DistM" (length of the least-cost path in map units), as in the
+        <linkset>-links.csv files of Graphab.
+
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if store is not None:
+        if os.path.abspath(cost_raster) != store.signature["file"]:
+            raise ValueError(
+                f"The store holds surfaces of {store.signature['file']}, " +
+                f"not {cost_raster}."
+                )
+        
+        links = store.links(patch_raster, threshold, n_jobs = n_jobs,
+                            block_size = block_size)
+    
+    else:
+        windows, res = _source_windows(
+            patch_raster, cost_raster, threshold, block_size = block_size
+            )
+        tasks = [(pid, window, float(threshold), res)
+                 for pid, window in windows.items()]
+        
+        with ProcessPoolExecutor(
+                max_workers = n_jobs, initializer = _init_worker,
+                initargs = (patch_raster, cost_raster)
+                ) as pool:
+            links = _links_table(
+                pool.map(_source_links, tasks, chunksize = 4)
+                )
+    
+    if out_file is not None:
+        links.to_csv(out_file, index = False)
+    
+    return links
+
+def corridor_raster(store, patch_raster, links, width, out_file,
+                    value = "count", n_jobs = None, block_size = None):
+    '''
+    Map least-cost corridors of links from the accumulated cost surfaces of
+    their end patches. A cell belongs to the corridor of a link between
+    patches A and B if acc_A + acc_B - d_AB <= width, where acc are the
+    accumulated costs and d_AB is the cost of the link. The output raster is
+    processed block by block in parallel, each block accumulating all links
+    overlapping it, so memory does not depend on the number of links.
+    Surfaces are read when a block needs them: uncompressed surfaces are
+    memory-mapped, compressed surfaces are decompressed once per block.
+    
+    Parameters
+    ----------
+    store : graphab4py.CostSurfaceStore
+        Store holding the surfaces of all end patches.
+    patch_raster : str
+        Raster of patch IDs. Defines the grid of the output.
+    links : pandas.DataFrame
+        Links with the columns "ID1", "ID2" and "Dist" (native cost, see
+        CostSurfaceStore.links()).
+    width : numeric
+        Maximum additional cost of a corridor path compared to the least-cost
+        path.
+    out_file : str
+        Output raster file.
+    value : str {"count", "cost"}, optional
+        Write the number of corridors crossing each cell ("count") or the
+        cost of the cheapest corridor path through each cell ("cost").
+        The default is "count".
+    n_jobs : int, optional
+        Number of threads. The default is None (number of CPUs).
+    block_size : int, optional
+        Edge length of the blocks processed at once (in cells). The default is
+        None.
+    
+    Returns
+    -------
+    out_file : str
+        Output raster file.
+
+    '''
+    import threading
+    import rasterio
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if value not in ["count", "cost"]:
+        raise ValueError(
+            f"Invalid value {value} to argument value. Must be either " +
+            "'count' or 'cost'."
+            )
+    
+    ids = np.unique(np.concatenate([links["ID1"], links["ID2"]]))
+    missing = [int(pid) for pid in ids if int(pid) not in store.surfaces]
+    
+    if len(missing) > 0:
+        raise KeyError(f"No surface stored for patch(es) {missing}.")
+    
+    windows = {int(pid) : tuple(store.surfaces[int(pid)]["window"])
+               for pid in ids}
+    id1 = np.asarray(links["ID1"], dtype = "int64")
+    id2 = np.asarray(links["ID2"], dtype = "int64")
+    dist = np.asarray(links["Dist"], dtype = "float64")
+    
+    # Intersection of the surface windows of both ends (row0, col0, row1, col1)
+    extent = np.zeros((len(dist), 4), dtype = "int64")
+    
+    for k, (a, b) in enumerate(zip(id1, id2)):
+        wa, wb = windows[a], windows[b]
+        extent[k] = (max(wa[0], wb[0]), max(wa[1], wb[1]),
+                     min(wa[0] + wa[2], wb[0] + wb[2]),
+                     min(wa[1] + wa[3], wb[1] + wb[3]))
+    
+    with rasterio.open(patch_raster) as src:
+        profile = src.profile.copy()
+        shape = (src.height, src.width)
+    
+    nodata = 0 if value == "count" else -1.
+    profile.update(driver = "GTiff", count = 1, nodata = nodata,
+                   dtype = "int32" if value == "count" else "float32",
+                   tiled = True, blockxsize = 256, blockysize = 256,
+                   compress = "deflate")
+    lock = threading.Lock()
+    
+    def block(window):
+        r0, c0 = int(window.row_off), int(window.col_off)
+        r1, c1 = r0 + int(window.height), c0 + int(window.width)
+        
+        if value == "count":
+            out = np.zeros((r1 - r0, c1 - c0), dtype = "int32")
+        
+        else:
+            out = np.full((r1 - r0, c1 - c0), np.inf)
+        
+        hit = np.flatnonzero((extent[:, 0] < r1) & (extent[:, 2] > r0) &
+                             (extent[:, 1] < c1) & (extent[:, 3] > c0))
+        surfaces = {}
+        
+        for k in hit:
+            i0, j0 = max(extent[k, 0], r0), max(extent[k, 1], c0)
+            i1, j1 = min(extent[k, 2], r1), min(extent[k, 3], c1)
+            total = 0.
+            
+            for pid in (id1[k], id2[k]):
+                if pid not in surfaces:
+                    surfaces[pid] = store.get(pid)[0]
+                
+                surface = surfaces[pid]
+                wr, wc = windows[pid][:2]
+                total = total + surface[
+                    0, i0 - wr:i1 - wr, j0 - wc:j1 - wc
+                    ].astype("float64")
+            
+            # Cells on the least-cost path must not be lost to the rounding
+            # of the stored surfaces
+            tol = 10 * np.finfo(surface.dtype).resolution * dist[k]
+            inside = total - dist[k] <= width + tol
+            sub = out[i0 - r0:i1 - r0, j0 - c0:j1 - c0]
+            
+            if value == "count":
+                sub += inside
+            
+            else:
+                np.minimum(sub, np.where(inside, total, np.inf), out = sub)
+        
+        if value == "cost":
+            out = np.where(np.isfinite(out), out, nodata).astype("float32")
+        
+        with lock:
+            dst.write(out, 1, window = window)
+    
+    with rasterio.open(out_file, "w", **profile) as dst:
+        with ThreadPoolExecutor(max_workers = n_jobs) as executor:
+            list(executor.map(
+                block, _windows(*shape, block_size = block_size)
+                ))
+    
+    return out_file
+
+#-----------------------------------------------------------------------------|
+# Classes
+class CostSurfaceStore():
+    def __init__(self, directory, cost_raster, compress = False,
+                 dtype = "float32"):
+        '''
+        Persistent store of bounded accumulated cost surfaces, one per source
+        patch. Each surface is cropped to the cells reached within the
+        threshold it was computed for and saved as a NumPy file (memory-mapped
+        when read) or, if compress is True, as a compressed NumPy archive.
+        An index (index.json) maps patch IDs to files, windows and thresholds.
+        Surfaces are discarded if the cost raster or the patch raster they
+        were computed from changed.
+        
+        Parameters
+        ----------
+        directory : str
+            Directory of the store. Created if it does not exist.
+        cost_raster : str
+            Resistance raster the surfaces refer to. If the raster changed
+            since the surfaces were stored, they are discarded.
+        compress : bool, optional
+            Save compressed archives instead of memory-mappable arrays.
+            The default is False.
+        dtype : str, optional
+            Data type of the stored surfaces. The default is "float32".
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.directory = directory
+        self.cost_raster = cost_raster
+        self.compress = compress
+        self.dtype = dtype
+        self.index_file = os.path.join(directory, "index.json")
+        self.signature = _raster_signature(cost_raster)
+        self.patch_signature = None
+        self.surfaces = {}
+        
+        os.makedirs(directory, exist_ok = True)
+        
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, "r") as f:
+                index = json.load(f)
+            
+            if index["cost_raster"] != self.signature:
+                print("Cost raster changed. Discarding stored surfaces.")
+                self.surfaces = {int(k) : v for k, v in
+                                 index["surfaces"].items()}
+                self.clear()
+            
+            else:
+                self.surfaces = {int(k) : v for k, v in
+                                 index["surfaces"].items()}
+                self.patch_signature = index.get("patch_raster")
+    
+    def _check_patches(self, patch_raster):
+        '''
+        Discard the stored surfaces if the patch raster differs from the one
+        they were computed from. The path is not compared, so that surfaces
+        remain valid in a copy of the project.
+        '''
+        signature = _raster_signature(patch_raster)
+        del signature["file"]
+        
+        if signature == self.patch_signature:
+            return
+        
+        if len(self.surfaces) > 0:
+            print("Patch raster changed. Discarding stored surfaces.")
+        
+        self.patch_signature = signature
+        self.clear()
+    
+    def _save_index(self):
+        tmp = self.index_file + ".tmp"
+        
+        with open(tmp, "w") as f:
+            json.dump({"cost_raster" : self.signature,
+                       "patch_raster" : self.patch_signature,
+                       "surfaces" : {str(k) : v for k, v in
+                                     sorted(self.surfaces.items())}}, f)
+        
+        os.replace(tmp, self.index_file)
+    
+    def clear(self):
+        '''
+        Delete all stored surfaces.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        for entry in self.surfaces.values():
+            file = os.path.join(self.directory, entry["file"])
+            
+            if os.path.isfile(file):
+                os.remove(file)
+        
+        self.surfaces = {}
+        self._save_index()
+    
+    def has(self, pid, threshold = None):
+        '''
+        Check whether the surface of a patch is stored (for a threshold at
+        least as large as the given one).
+        
+        Parameters
+        ----------
+        pid : int
+            Patch ID.
+        threshold : numeric, optional
+            Required threshold. The default is None (any).
+        
+        Returns
+        -------
+        has : bool
+            True if the surface can be used.
+
+        '''
+        entry = self.surfaces.get(int(pid))
+        
+        if entry is None:
+            return False
+        
+        return threshold is None or entry["threshold"] >= float(threshold)
+    
+    def build(self, patch_raster, threshold, ids = None, n_jobs = None,
+              block_size = None):
+        '''
+        Compute and store the accumulated cost surfaces of source patches
+        which are not yet stored for the given threshold. Surfaces stored for
+        a lower threshold are extended by the missing distance band only.
+        
+        Parameters
+        ----------
+        patch_raster : str
+            Raster of patch IDs on the grid of the cost raster.
+        threshold : numeric
+            Maximum accumulated cost.
+        ids : list, optional
+            Patch IDs. The default is None (all patches).
+        n_jobs : int, optional
+            Number of processes. The default is None (number of CPUs).
+        block_size : int, optional
+            Edge length of the blocks read at once (in cells). The default is
+            None.
+        
+        Returns
+        -------
+        computed : list
+            IDs of the patches whose surfaces were computed.
+
+        '''
+        from concurrent.futures import ProcessPoolExecutor
+        
+        self._check_patches(patch_raster)
+        windows, res = _source_windows(
+            patch_raster, self.cost_raster, threshold, block_size = block_size
+            )
+        
+        if ids is not None:
+            unknown = [int(i) for i in ids if int(i) not in windows]
+            
+            if len(unknown) > 0:
+                raise KeyError(f"Unknown patch(es) {unknown}.")
+            
+            windows = {int(i) : windows[int(i)] for i in ids}
+        
+        tasks = []
+        
+        for pid, window in windows.items():
+            if self.has(pid, threshold):
+                continue
+            
+            # Surfaces of a lower threshold are extended by the missing band
+            previous = self.surfaces.get(pid)
+            
+            if previous is not None:
+                previous = (os.path.join(self.directory, previous["file"]),
+                            tuple(previous["window"]))
+            
+            file = f"surface-{pid}-{float(threshold):g}"
+            tasks.append((
+                pid, window, float(threshold), res,
+                os.path.join(self.directory, file), self.compress, self.dtype,
+                previous
+                ))
+        
+        if len(tasks) == 0:
+            return []
+        
+        with ProcessPoolExecutor(
+                max_workers = n_jobs, initializer = _init_worker,
+                initargs = (patch_raster, self.cost_raster)
+                ) as pool:
+            for task, entry in zip(
+                    tasks, pool.map(_store_surface, tasks, chunksize = 4)
+                    ):
+                self.surfaces[task[0]] = entry
+                
+                if task[-1] is not None and os.path.isfile(task[-1][0]):
+                    os.remove(task[-1][0])
+        
+        self._save_index()
+        
+        return [task[0] for task in tasks]
+    
+    def get(self, pid, mmap = True):
+        '''
+        Read the accumulated cost surface of a patch.
+        
+        Parameters
+        ----------
+        pid : int
+            Patch ID.
+        mmap : bool, optional
+            Memory-map uncompressed surfaces instead of reading them.
+            The default is True.
+        
+        Returns
+        -------
+        surface : numpy.ndarray
+            Array of shape (2, height, width) holding the accumulated cost
+            and the metric length of the least-cost path (inf where not
+            reached).
+        window : tuple
+            Position of the surface in the raster (row_off, col_off, height,
+            width).
+        threshold : float
+            Threshold the surface was computed for.
+
+        '''
+        entry = self.surfaces.get(int(pid))
+        
+        if entry is None:
+            raise KeyError(f"No surface stored for patch {pid}.")
+        
+        surface = _load_surface(
+            os.path.join(self.directory, entry["file"]), mmap = mmap
+            )
+        
+        return surface, tuple(entry["window"]), entry["threshold"]
+    
+    def links(self, patch_raster, threshold, ids = None, n_jobs = None,
+              block_size = None):
+        '''
+        Derive a link table from the stored surfaces. Missing surfaces are
+        computed first.
+        
+        Parameters
+        ----------
+        patch_raster : str
+            Raster of patch IDs on the grid of the cost raster.
+        threshold : numeric
+            Maximum accumulated cost of a link.
+        ids : list, optional
+            Only derive links starting at these patches (i.e., links to
+            patches with a higher ID). The default is None (all patches).
+        n_jobs : int, optional
+            Number of processes used to compute missing surfaces. The default
+            is None.
+        block_size : int, optional
+            Edge length of the blocks read at once (in cells). The default is
+            None.
+        
+        Returns
+        -------
+        links : pandas.DataFrame
+            Link table with the columns "ID1", "ID2", "Dist" and "DistM".
+
+        '''
+        import rasterio
+        
+        self.build(patch_raster, threshold, ids = ids, n_jobs = n_jobs,
+                   block_size = block_size)
+        sources = sorted(self.surfaces.keys()) if ids is None else \
+            sorted(set(int(i) for i in ids))
+        results = []
+        
+        with rasterio.open(patch_raster) as src:
+            for pid in sources:
+                surface, window, _ = self.get(pid)
+                
+                if window[2] == 0 or window[3] == 0:
+                    continue
+                
+                labels = _read_window(src, window, nodata_to_nan = False)
+                results.append(_nearest_targets(
+                    pid, labels, surface[0], surface[1], float(threshold)
+                    ))
+        
+        return _links_table(results)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 16:12:55 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import math
+import numpy as np
+from .raster import _windows
+
+_SQRT2 = math.sqrt(2.)
+
+# Number of boundary cells queried per task
+_chunk_size = 20000
+
+# Spatial index of the worker processes
+_worker = {}
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _boundary_cells(patch_raster, block_size = None):
+    '''
+    Cells of each patch with at least one edge not shared with a cell of the
+    same patch. Edge-to-edge distances between patches are always realised
+    between such cells.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of patch IDs. Cells with a value <= 0 are not part of a patch.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    points : numpy.ndarray
+        Array of shape (n, 2) with row and column of the boundary cells,
+        sorted by patch ID.
+    ids : numpy.ndarray
+        Patch ID of each boundary cell.
+    res : float
+        Cell size.
+
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    points, ids = [], []
+    
+    with rasterio.open(patch_raster) as src:
+        res = max(abs(src.res[0]), abs(src.res[1]))
+        
+        for window in _windows(src.height, src.width, block_size):
+            r0, c0 = int(window.row_off), int(window.col_off)
+            h, w = int(window.height), int(window.width)
+            
+            # Read a margin of one cell; cells outside the raster are no patch
+            rr0, cc0 = max(r0 - 1, 0), max(c0 - 1, 0)
+            rr1 = min(r0 + h + 1, src.height)
+            cc1 = min(c0 + w + 1, src.width)
+            data = src.read(1, window = Window(cc0, rr0, cc1 - cc0,
+                                               rr1 - rr0))
+            padded = np.zeros((h + 2, w + 2), dtype = data.dtype)
+            padded[rr0 - r0 + 1:rr1 - r0 + 1, cc0 - c0 + 1:cc1 - c0 + 1] = \
+                data
+            labels = padded[1:-1, 1:-1]
+            exposed = (padded[:-2, 1:-1] != labels) | \
+                (padded[2:, 1:-1] != labels) | \
+                (padded[1:-1, :-2] != labels) | \
+                (padded[1:-1, 2:] != labels)
+            rows, cols = np.nonzero((labels > 0) & exposed)
+            points.append(np.column_stack([rows + r0, cols + c0]))
+            ids.append(labels[rows, cols].astype("int64"))
+    
+    points = np.concatenate([np.zeros((0, 2), dtype = "int64")] + points)
+    ids = np.concatenate([np.zeros(0, dtype = "int64")] + ids)
+    order = np.argsort(ids, kind = "stable")
+    
+    return points[order], ids[order], res
+
+def _edge_distance(a, b):
+    '''
+    Edge-to-edge distance (in cells) between cells given by their row and
+    column.
+    '''
+    d = np.abs(np.asarray(a, dtype = "float64") - b) - 1.
+    
+    return np.sqrt(np.sum(np.maximum(d, 0.) ** 2, axis = -1))
+
+def _min_pairs(id1, id2, dist):
+    '''
+    Minimum distance of each unique pair of patch IDs.
+    '''
+    if dist.size == 0:
+        return np.zeros((0, 3))
+    
+    order = np.lexsort((dist, id2, id1))
+    id1, id2, dist = id1[order], id2[order], dist[order]
+    first = np.flatnonzero(
+        np.r_[True, (id1[1:] != id1[:-1]) | (id2[1:] != id2[:-1])]
+        )
+    
+    return np.column_stack([id1[first], id2[first], dist[first]])
+
+def _init_worker(points, ids):
+    from scipy.spatial import cKDTree
+    
+    _worker["points"] = points
+    _worker["ids"] = ids
+    _worker["tree"] = cKDTree(points)
+
+def _chunk_links(args):
+    '''
+    Links between the boundary cells of a chunk and all boundary cells of
+    patches with a higher ID within radius (in cells).
+    '''
+    start, stop, radius = args
+    points, ids, tree = _worker["points"], _worker["ids"], _worker["tree"]
+    neighbours = tree.query_ball_point(points[start:stop], radius)
+    counts = np.array([len(n) for n in neighbours], dtype = "int64")
+    
+    if counts.sum() == 0:
+        return np.zeros((0, 3))
+    
+    i = np.repeat(np.arange(start, stop), counts)
+    j = np.concatenate([np.asarray(n, dtype = "int64") for n in neighbours])
+    keep = ids[j] > ids[i]
+    i, j = i[keep], j[keep]
+    
+    return _min_pairs(ids[i], ids[j], _edge_distance(points[i], points[j]))
+
+def _pair_distance(args):
+    '''
+    Exact edge-to-edge distance between the boundary cells of two patches.
+    The minimum is attained among cell pairs whose centre distance exceeds
+    the smallest centre distance by at most sqrt(2) cells.
+    '''
+    from scipy.spatial import cKDTree
+    
+    a, b = args
+    points, starts = _worker["points"], _worker["starts"]
+    pa = points[starts[a][0]:starts[a][1]]
+    pb = points[starts[b][0]:starts[b][1]]
+    tree_b = cKDTree(pb)
+    nearest, _ = tree_b.query(pa)
+    pairs = cKDTree(pa).sparse_distance_matrix(
+        tree_b, nearest.min() + _SQRT2 + 1e-9, output_type = "ndarray"
+        )
+    
+    return _edge_distance(pa[pairs["i"]], pb[pairs["j"]]).min()
+
+def _init_pair_worker(points, starts):
+    _worker["points"] = points
+    _worker["starts"] = starts
+
+def _planar_pairs(points, ids):
+    '''
+    Pairs of patches which are neighbours in the Delaunay triangulation of
+    the boundary cells.
+    '''
+    from scipy.spatial import Delaunay
+    
+    if len(np.unique(ids)) < 2:
+        return np.zeros((0, 2), dtype = "int64")
+    
+    # Joggle the input, as the regular grid is degenerate for Qhull
+    tri = Delaunay(points.astype("float64"), qhull_options = "QJ Qbb")
+    s = tri.simplices
+    edges = np.concatenate([s[:, [0, 1]], s[:, [1, 2]], s[:, [0, 2]]])
+    a, b = ids[edges[:, 0]], ids[edges[:, 1]]
+    keep = a != b
+    pairs = np.column_stack([np.minimum(a, b)[keep], np.maximum(a, b)[keep]])
+    
+    return np.unique(pairs, axis = 0)
+
+#-----------------------------------------------------------------------------|
+# Functions
+def euclid_links(patch_raster, threshold = None, planar = False,
+                 n_jobs = None, block_size = None, out_file = None):
+    '''
+    Compute euclidean (edge-to-edge) distances between habitat patches
+    natively, without calling Graphab. Boundary cells of the patches are
+    indexed with a KD-tree to find patch pairs within the threshold, and
+    exact distances are computed vectorised for chunks of boundary cells in a
+    process pool.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of patch IDs, e.g., the patches.tif file of a Graphab project.
+        Cells with a value <= 0 are not part of a patch.
+    threshold : numeric, optional
+        Maximum distance of a link (in map units). Required for complete
+        linksets. The default is None.
+    planar : bool, optional
+        Create a planar linkset, i.e., only link patches which are neighbours
+        in the Delaunay triangulation of the patch boundary cells. Otherwise,
+        a complete linkset is created. The default is False.
+    n_jobs : int, optional
+        Number of processes. The default is None (number of CPUs).
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    out_file : str, optional
+        Write the links to this CSV file. The default is None.
+    
+    Returns
+    -------
+    links : pandas.DataFrame
+        Link table with the columns "ID1", "ID2", "Dist" and "DistM" (equal
+        to Dist for euclidean distances), as in the <linkset>-links.csv files
+        of Graphab.
+
+    '''
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if threshold is None and not planar:
+        raise ValueError("Complete linksets require a threshold.")
+    
+    points, ids, res = _boundary_cells(patch_raster, block_size = block_size)
+    
+    if planar:
+        pairs = _planar_pairs(points, ids)
+        unique, first, last = np.unique(ids, return_index = True,
+                                        return_counts = True)
+        starts = {int(u) : (int(f), int(f + n)) for u, f, n in
+                  zip(unique, first, last)}
+        
+        with ProcessPoolExecutor(
+                max_workers = n_jobs, initializer = _init_pair_worker,
+                initargs = (points, starts)
+                ) as pool:
+            dist = np.array(list(pool.map(
+                _pair_distance, [(int(a), int(b)) for a, b in pairs],
+                chunksize = 16
+                )), dtype = "float64")
+        
+        results = np.column_stack([pairs, dist]) if len(pairs) > 0 else \
+            np.zeros((0, 3))
+    
+    else:
+        radius = float(threshold) / res + _SQRT2
+        tasks = [(start, min(start + _chunk_size, len(ids)), radius)
+                 for start in range(0, len(ids), _chunk_size)]
+        
+        with ProcessPoolExecutor(
+                max_workers = n_jobs, initializer = _init_worker,
+                initargs = (points, ids)
+                ) as pool:
+            results = list(pool.map(_chunk_links, tasks))
+        
+        results = np.concatenate([np.zeros((0, 3))] + results)
+        results = _min_pairs(results[:, 0].astype("int64"),
+                             results[:, 1].astype("int64"), results[:, 2])
+    
+    dist = results[:, 2] * res
+    links = pd.DataFrame({"ID1" : results[:, 0].astype("int64"),
+                          "ID2" : results[:, 1].astype("int64"),
+                          "Dist" : dist,
+                          "DistM" : dist})
+    
+    if threshold is not None:
+        links = links[links["Dist"] <= float(threshold)].reset_index(
+            drop = True
+            )
+    
+    if out_file is not None:
+        links.to_csv(out_file, index = False)
+    
+    return links
+
+def added_patch_links(patch_raster, new_patch_raster, threshold,
+                      block_size = None):
+    '''
+    Compute euclidean (edge-to-edge) links of new habitat patches, e.g., of
+    a restoration scenario, without recomputing the links between existing
+    patches.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Raster of the IDs of existing patches (e.g., patches.tif).
+    new_patch_raster : str
+        Raster of the IDs of new patches on the same grid. IDs must differ
+        from existing patch IDs. Cells with a value <= 0 are no new patch.
+    threshold : numeric
+        Maximum distance of a link (in map units).
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    links : pandas.DataFrame
+        Links between new patches and between new and existing patches, with
+        the columns "ID1", "ID2", "Dist" and "DistM".
+
+    '''
+    import rasterio
+    import pandas as pd
+    from scipy.spatial import cKDTree
+    
+    with rasterio.open(patch_raster) as a, rasterio.open(new_patch_raster) \
+            as b:
+        if a.shape != b.shape or a.transform != b.transform:
+            raise ValueError(
+                "Rasters of existing and new patches must be aligned."
+                )
+    
+    points, ids, res = _boundary_cells(patch_raster, block_size = block_size)
+    new_points, new_ids, _ = _boundary_cells(new_patch_raster,
+                                             block_size = block_size)
+    
+    if np.isin(np.unique(new_ids), np.unique(ids)).any():
+        raise ValueError("IDs of new patches must differ from existing IDs.")
+    
+    all_points = np.concatenate([points, new_points])
+    all_ids = np.concatenate([ids, new_ids])
+    results = [np.zeros((0, 3))]
+    
+    if len(new_points) > 0:
+        tree = cKDTree(all_points)
+        
+        for start in range(0, len(new_points), _chunk_size):
+            stop = min(start + _chunk_size, len(new_points))
+            neighbours = tree.query_ball_point(
+                new_points[start:stop], float(threshold) / res + _SQRT2
+                )
+            counts = np.array([len(n) for n in neighbours], dtype = "int64")
+            
+            if counts.sum() == 0:
+                continue
+            
+            i = np.repeat(np.arange(start, stop), counts)
+            j = np.concatenate(
+                [np.asarray(n, dtype = "int64") for n in neighbours]
+                )
+            id1, id2 = new_ids[i], all_ids[j]
+            keep = id1 != id2
+            i, j, id1, id2 = i[keep], j[keep], id1[keep], id2[keep]
+            results.append(_min_pairs(
+                np.minimum(id1, id2), np.maximum(id1, id2),
+                _edge_distance(new_points[i], all_points[j])
+                ))
+    
+    results = np.concatenate(results)
+    results = _min_pairs(results[:, 0].astype("int64"),
+                         results[:, 1].astype("int64"), results[:, 2])
+    dist = results[:, 2] * res
+    links = pd.DataFrame({"ID1" : results[:, 0].astype("int64"),
+                          "ID2" : results[:, 1].astype("int64"),
+                          "Dist" : dist,
+                          "DistM" : dist})
+    
+    return links[links["Dist"] <= float(threshold)].reset_index(drop = True)
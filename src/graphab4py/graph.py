@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 10:31:08 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import math, copy, hashlib
+import numpy as np
+
+_chunk_size = 512
+
+# Number of per-component pair sums kept for scenario graphs
+_cache_size = 100000
+
+#-----------------------------------------------------------------------------|
+# Classes
+class Graph():
+    def __init__(self, patches, links, threshold = None, area = None):
+        '''
+        Create a graph of habitat patches that can be analysed in Python,
+        without calling Graphab.
+        
+        Parameters
+        ----------
+        patches : pandas.DataFrame
+            Patch table. Must contain the columns "Id" and "Area". If it
+            contains a column "Capacity", it is used as patch capacity,
+            otherwise the patch area is used.
+        links : pandas.DataFrame
+            Link table with the columns "ID1", "ID2", and "Dist" (as in the
+            <linkset>-links.csv files written by Graphab).
+        threshold : numeric, optional
+            Links with a distance above the threshold are omitted, similar to
+            create_graph(threshold = ...). The default is None.
+        area : numeric, optional
+            Landscape area used to normalise PC and IIC. The default is None,
+            in which case the sum of the patch areas is used.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.ids = np.asarray(patches["Id"], dtype = "int64")
+        
+        if "Capacity" in patches.columns:
+            self.capacity = np.asarray(patches["Capacity"], dtype = "float64")
+        
+        else:
+            self.capacity = np.asarray(patches["Area"], dtype = "float64")
+        
+        self.area = float(np.sum(patches["Area"])) if area is None \
+            else float(area)
+        self.threshold = threshold
+        
+        links = links[["ID1", "ID2", "Dist"]]
+        
+        if threshold is not None:
+            links = links[links["Dist"] <= float(threshold)]
+        
+        self.links = links.reset_index(drop = True)
+        self._index = {pid : i for i, pid in enumerate(self.ids)}
+        self._adjacency = None
+        self._components = None
+        self._pair_cache = {}
+    
+    def _node_index(self, ids):
+        try:
+            return np.array([self._index[i] for i in ids], dtype = "int64")
+        
+        except KeyError as e:
+            raise KeyError(f"Unknown patch {e}.")
+    
+    def adjacency(self, topological = False):
+        '''
+        Sparse adjacency matrix of the graph.
+        
+        Parameters
+        ----------
+        topological : bool, optional
+            Use a weight of 1 for each link instead of the link distance.
+            The default is False.
+        
+        Returns
+        -------
+        adjacency : scipy.sparse.csr_matrix
+            Symmetric adjacency matrix with patches ordered as in self.ids.
+
+        '''
+        from scipy import sparse
+        
+        n = len(self.ids)
+        i = self._node_index(self.links["ID1"])
+        j = self._node_index(self.links["ID2"])
+        w = np.ones(len(i)) if topological else \
+            np.asarray(self.links["Dist"], dtype = "float64")
+        
+        # Zero-length links would vanish from a sparse matrix
+        w = np.maximum(w, np.finfo("float64").tiny)
+        
+        # Keep the shortest of several links between the same patches (e.g.,
+        # a scenario link duplicating an existing one), as summing them in
+        # the sparse matrix would lengthen the link
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        order = np.lexsort((w, j, i))
+        i, j, w = i[order], j[order], w[order]
+        first = np.r_[True, (i[1:] != i[:-1]) | (j[1:] != j[:-1])]
+        i, j, w = i[first], j[first], w[first]
+        
+        adjacency = sparse.coo_matrix(
+            (np.concatenate([w, w]),
+             (np.concatenate([i, j]), np.concatenate([j, i]))),
+            shape = (n, n)
+            ).tocsr()
+        adjacency.sum_duplicates()
+        
+        return adjacency
+    
+    def components(self):
+        '''
+        Connected components of the graph.
+        
+        Returns
+        -------
+        labels : numpy.ndarray
+            Component index of each patch (ordered as in self.ids).
+
+        '''
+        if self._components is None:
+            from scipy.sparse.csgraph import connected_components
+            
+            _, self._components = connected_components(
+                self.adjacency(), directed = False
+                )
+        
+        return self._components
+    
+    def distances(self, sources = None, topological = False):
+        '''
+        Shortest path distances between patches.
+        
+        Parameters
+        ----------
+        sources : list, optional
+            Patch IDs of the sources. The default is None (all patches).
+        topological : bool, optional
+            Count links instead of summing distances. The default is False.
+        
+        Returns
+        -------
+        dist : numpy.ndarray
+            Matrix of shape (len(sources), number of patches). Unconnected
+            patches have a distance of inf.
+
+        '''
+        from scipy.sparse.csgraph import dijkstra
+        
+        indices = np.arange(len(self.ids)) if sources is None else \
+            self._node_index(sources)
+        
+        return dijkstra(
+            self.adjacency(topological = topological), directed = False,
+            indices = indices
+            )
+    
+    def _pair_sum(self, transform, topological = False, weights = None,
+                  key = None):
+        '''
+        Compute sum_i sum_j a_i a_j f(d_ij) component by component and in
+        chunks of source patches, so that no dense n x n matrix is created.
+        If a key identifying the transform is given, the sum of each
+        component is cached by its patches, weights and links. Scenario
+        graphs share the cache, so only components affected by a scenario
+        are recomputed.
+        '''
+        from scipy.sparse.csgraph import dijkstra
+        
+        a = self.capacity if weights is None else weights
+        adjacency = None
+        comps = self.components()
+        order = np.argsort(comps, kind = "stable")
+        bounds = np.flatnonzero(np.diff(comps[order])) + 1
+        total = 0.
+        
+        if key is not None:
+            id1 = np.asarray(self.links["ID1"], dtype = "int64")
+            id2 = np.asarray(self.links["ID2"], dtype = "int64")
+            lo, hi = np.minimum(id1, id2), np.maximum(id1, id2)
+            dist = np.asarray(self.links["Dist"], dtype = "float64")
+            link_comps = comps[self._node_index(lo)] if len(lo) > 0 else \
+                np.zeros(0, dtype = "int64")
+            link_order = np.lexsort((hi, lo, link_comps))
+            link_comps = link_comps[link_order]
+            link_bytes = np.column_stack(
+                [lo[link_order], hi[link_order], dist[link_order].view("int64")]
+                )
+        
+        for nodes in np.split(order, bounds):
+            if len(nodes) == 1:
+                total += a[nodes[0]] ** 2 * transform(np.zeros(1))[0]
+                continue
+            
+            if key is not None:
+                c = comps[nodes[0]]
+                rows = link_bytes[np.searchsorted(link_comps, c, "left"):
+                                  np.searchsorted(link_comps, c, "right")]
+                digest = (key, hashlib.sha1(
+                    self.ids[nodes].tobytes() + a[nodes].tobytes() +
+                    rows.tobytes()
+                    ).digest())
+                cached = self._pair_cache.get(digest)
+                
+                if cached is not None:
+                    total += cached
+                    continue
+            
+            if adjacency is None:
+                adjacency = self.adjacency(topological = topological)
+            
+            sub = adjacency[nodes][:, nodes]
+            part = 0.
+            
+            for start in range(0, len(nodes), _chunk_size):
+                idx = np.arange(start, min(start + _chunk_size, len(nodes)))
+                dist = dijkstra(sub, directed = False, indices = idx)
+                part += float(
+                    a[nodes[idx]] @ transform(dist) @ a[nodes]
+                    )
+            
+            if key is not None and len(self._pair_cache) < _cache_size:
+                self._pair_cache[digest] = part
+            
+            total += part
+        
+        return total
+    
+    def scenario(self, add = None, links = None, remove = None,
+                 capacity = None):
+        '''
+        Create a graph of a landscape change scenario, e.g., restored or lost
+        habitat patches. The scenario graph shares cached results with this
+        graph, so that metrics only need to be recomputed for the components
+        the scenario changes.
+        
+        Parameters
+        ----------
+        add : pandas.DataFrame, optional
+            New patches with the columns "Id" and "Area" and, optionally,
+            "Capacity". IDs must not exist in the graph. The default is None.
+        links : pandas.DataFrame, optional
+            Links to add, e.g., of the new patches, with the columns "ID1",
+            "ID2" and "Dist". The threshold of the graph is applied. The
+            default is None.
+        remove : list, optional
+            IDs of patches to remove together with their links. The default
+            is None.
+        capacity : dict, optional
+            New capacities by patch ID. The default is None.
+        
+        Returns
+        -------
+        graph : graphab4py.graph.Graph
+            Scenario graph. The landscape area is that of this graph.
+
+        '''
+        import pandas as pd
+        
+        graph = copy.copy(self)
+        ids, cap, table = self.ids, self.capacity, self.links
+        
+        if remove is not None:
+            remove = np.asarray(list(remove), dtype = "int64")
+            self._node_index(remove)
+            keep = ~np.isin(ids, remove)
+            ids, cap = ids[keep], cap[keep]
+            table = table[~(table["ID1"].isin(remove) |
+                            table["ID2"].isin(remove))]
+        
+        if add is not None:
+            new = np.asarray(add["Id"], dtype = "int64")
+            
+            if np.isin(new, self.ids).any() or len(np.unique(new)) < len(new):
+                raise ValueError("IDs of added patches must be unique.")
+            
+            column = "Capacity" if "Capacity" in add.columns else "Area"
+            ids = np.concatenate([ids, new])
+            cap = np.concatenate(
+                [cap, np.asarray(add[column], dtype = "float64")]
+                )
+        
+        if links is not None:
+            links = links[["ID1", "ID2", "Dist"]]
+            
+            if self.threshold is not None:
+                links = links[links["Dist"] <= float(self.threshold)]
+            
+            table = pd.concat([table, links], ignore_index = True)
+        
+        graph.ids = ids
+        graph.capacity = cap.copy()
+        graph.links = table.reset_index(drop = True)
+        graph._index = {pid : i for i, pid in enumerate(ids)}
+        graph._adjacency = None
+        graph._components = None
+        
+        if links is not None:
+            graph._node_index(links["ID1"])
+            graph._node_index(links["ID2"])
+        
+        if capacity is not None:
+            pids = list(dict(capacity).keys())
+            graph.capacity[graph._node_index(pids)] = [
+                float(capacity[pid]) for pid in pids
+                ]
+        
+        return graph
+    
+    def metric(self, metric, d = None, p = None, beta = 1.):
+        '''
+        Calculate a global metric.
+        
+        Parameters
+        ----------
+        metric : str {"NC", "PC", "EC", "IIC"}
+            Metric name. Definitions follow the Graphab manual.
+        d : numeric, optional
+            Distance at which the dispersal probability equals p. Required
+            for PC and EC.
+        p : numeric, optional
+            Dispersal probability at distance d. Required for PC and EC.
+        beta : numeric, optional
+            Exponent applied to patch capacities. The default is 1.
+        
+        Returns
+        -------
+        value : float
+            Metric value.
+
+        '''
+        metric = metric.upper()
+        weights = self.capacity ** float(beta)
+        
+        if metric == "NC":
+            return float(len(np.unique(self.components())))
+        
+        elif metric in ["PC", "EC"]:
+            if d is None or p is None:
+                raise ValueError(f"Metric {metric} requires arguments d and p.")
+            
+            alpha = -math.log(float(p)) / float(d)
+            total = self._pair_sum(
+                lambda x: np.exp(-alpha * x), weights = weights,
+                key = ("exp", alpha)
+                )
+            
+            return math.sqrt(total) if metric == "EC" else total / self.area**2
+        
+        elif metric == "IIC":
+            total = self._pair_sum(
+                lambda x: 1. / (1. + x), topological = True, weights = weights,
+                key = ("iic",)
+                )
+            
+            return total / self.area**2
+        
+        else:
+            raise ValueError(f"Metric {metric} is not supported natively.")
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 12:36:51 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, math, shutil, tempfile
+import numpy as np
+from .raster import _windows, _habitat_codes, _group_reduce
+
+_label_profile = {"driver" : "GTiff",
+                  "dtype" : "int32",
+                  "nodata" : None,
+                  "count" : 1,
+                  "tiled" : True,
+                  "blockxsize" : 256,
+                  "blockysize" : 256,
+                  "compress" : "deflate"
+                  }
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _structure(connexity):
+    if connexity == 8:
+        return np.ones((3, 3), dtype = "int8")
+    
+    elif connexity == 4:
+        return None
+    
+    raise ValueError(f"Invalid connexity {connexity}. Must be 4 or 8.")
+
+def _boundary_pairs(strip, connexity = 8, codes = None):
+    '''
+    Find pairs of labels touching each other across a boundary.
+    
+    Parameters
+    ----------
+    strip : numpy.ndarray
+        Array of shape (2, n) holding the labels on both sides of the
+        boundary.
+    connexity : int in {4, 8}, optional
+        Neighbourhood used to define contiguity. The default is 8.
+    codes : numpy.ndarray, optional
+        Landscape codes of the same cells. If provided, only cells with equal
+        codes are paired (Graphab "nomerge" option). The default is None.
+    
+    Returns
+    -------
+    pairs : numpy.ndarray
+        Array of shape (k, 2) of touching labels.
+
+    '''
+    a, b = strip[0], strip[1]
+    ca, cb = (None, None) if codes is None else (codes[0], codes[1])
+    offsets = [(slice(None), slice(None))]
+    
+    if connexity == 8:
+        offsets += [(slice(None, -1), slice(1, None)),
+                    (slice(1, None), slice(None, -1))]
+    
+    pairs = []
+    
+    for sa, sb in offsets:
+        la, lb = a[sa], b[sb]
+        valid = (la > 0) & (lb > 0)
+        
+        if ca is not None:
+            valid &= ca[sa] == cb[sb]
+        
+        pairs.append(np.stack([la[valid], lb[valid]], axis = 1))
+    
+    pairs = np.concatenate(pairs)
+    
+    return np.unique(pairs, axis = 0) if len(pairs) > 0 else pairs
+
+def _resolve_equivalences(n, pairs):
+    '''
+    Resolve label equivalences into a lookup table.
+    
+    Parameters
+    ----------
+    n : int
+        Number of provisional labels (labels are 1, ..., n).
+    pairs : numpy.ndarray
+        Array of shape (k, 2) of equivalent labels.
+    
+    Returns
+    -------
+    lut : numpy.ndarray
+        Lookup table of length n + 1 mapping provisional labels to merged
+        labels 1, ..., m. Label 0 (background) is mapped to 0.
+
+    '''
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    
+    pairs = np.asarray(pairs, dtype = "int64").reshape(-1, 2)
+    adjacency = sparse.coo_matrix(
+        (np.ones(len(pairs), dtype = "int8"), (pairs[:, 0], pairs[:, 1])),
+        shape = (n + 1, n + 1)
+        )
+    _, comps = connected_components(adjacency, directed = False)
+    
+    # Renumber components in order of their smallest provisional label
+    _, first, inverse = np.unique(
+        comps[1:], return_index = True, return_inverse = True
+        )
+    rank = np.empty(len(first), dtype = "int64")
+    rank[np.argsort(first)] = np.arange(1, len(first) + 1)
+    lut = np.zeros(n + 1, dtype = "int64")
+    lut[1:] = rank[inverse]
+    
+    return lut
+
+def _grid_equivalences(label_file, step, connexity = 8, codes_file = None,
+                       block_size = None):
+    '''
+    Collect equivalences of labels touching each other across the lines of a
+    regular grid (block or tile boundaries) of a provisional label raster.
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    pairs = [np.zeros((0, 2), dtype = "int64")]
+    chunk = int(block_size or 4096)
+    
+    with rasterio.open(label_file) as src:
+        lsc = rasterio.open(codes_file) if codes_file is not None else None
+        height, width = src.height, src.width
+        
+        def strip(window, transpose):
+            labels = src.read(1, window = window).astype("int64")
+            codes = None if lsc is None else lsc.read(1, window = window)
+            
+            if transpose:
+                labels = labels.T
+                codes = None if codes is None else codes.T
+            
+            return _boundary_pairs(labels, connexity, codes)
+        
+        try:
+            for row in range(step, height, step):
+                for col in range(0, width, chunk):
+                    w = min(chunk + 1, width - col)
+                    pairs.append(strip(Window(col, row - 1, w, 2), False))
+            
+            for col in range(step, width, step):
+                for row in range(0, height, chunk):
+                    h = min(chunk + 1, height - row)
+                    pairs.append(strip(Window(col - 1, row, 2, h), True))
+        
+        finally:
+            if lsc is not None:
+                lsc.close()
+    
+    return np.concatenate(pairs)
+
+def _finalize_labels(provisional, n, dst_file, step, connexity = 8,
+                     codes_file = None, minarea = None, maxsize = None,
+                     block_size = None):
+    '''
+    Turn a provisional label raster into the final patch raster and compute
+    the patch table.
+    
+    Parameters
+    ----------
+    provisional : str
+        Raster with labels that are unique within each cell of a regular grid
+        of edge length step.
+    n : int
+        Highest provisional label.
+    dst_file : str
+        Output patch raster.
+    step : int
+        Edge length of the grid (in cells) along which labels are merged.
+    connexity : int in {4, 8}, optional
+        Neighbourhood used to define contiguity. The default is 8.
+    codes_file : str, optional
+        Landscape raster. If set, patches of different codes are not merged.
+        The default is None.
+    minarea : numeric, optional
+        Minimum patch area in ha. The default is None.
+    maxsize : numeric, optional
+        Maximum patch area in ha. Larger patches are split along a square
+        grid with cells of this area. The default is None.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    table : pandas.DataFrame
+        Patch table.
+
+    '''
+    import rasterio
+    import pandas as pd
+    from rasterio.windows import Window
+    
+    pairs = _grid_equivalences(
+        provisional, step, connexity = connexity, codes_file = codes_file,
+        block_size = block_size
+        )
+    lut = _resolve_equivalences(n, pairs)
+    m = int(lut.max())
+    
+    with rasterio.open(provisional) as src:
+        height, width = src.height, src.width
+        profile = src.profile.copy()
+        resx, resy = abs(src.res[0]), abs(src.res[1])
+        
+        cells = np.zeros(m + 1)
+        
+        for window in _windows(height, width, block_size):
+            labels = lut[src.read(1, window = window)]
+            cells += np.bincount(labels.ravel(), minlength = m + 1)
+        
+        area = cells * resx * resy
+        keep = cells > 0
+        keep[0] = False
+        
+        if minarea is not None:
+            keep &= area >= float(minarea) * 10**4
+        
+        # Patches above maxsize are split along a square grid
+        big = np.zeros(m + 1, dtype = bool)
+        
+        if maxsize is not None:
+            big = keep & (area > float(maxsize) * 10**4)
+        
+        side = math.sqrt(float(maxsize) * 10**4) if maxsize is not None \
+            else 1.
+        gx = max(1, int(round(side / resx)))
+        gy = max(1, int(round(side / resy)))
+        ngx = -(-width // gx)
+        n_grid = ngx * -(-height // gy)
+        
+        def keys(labels, row_off, col_off):
+            k = labels.astype("int64") * n_grid
+            
+            if big.any():
+                b = big[labels]
+                rows, cols = np.nonzero(b)
+                k[b] += ((rows + row_off) // gy) * ngx + (cols + col_off) // gx
+            
+            return k
+        
+        key_list = [np.flatnonzero(keep & ~big) * n_grid]
+        
+        if big.any():
+            for window in _windows(height, width, block_size):
+                labels = lut[src.read(1, window = window)]
+                b = big[labels]
+                
+                if b.any():
+                    key_list.append(np.unique(
+                        keys(labels, window.row_off, window.col_off)[b]
+                        ))
+        
+        all_keys = np.unique(np.concatenate(key_list))
+        n_final = len(all_keys)
+        
+        def final(labels, row_off, col_off):
+            out = np.zeros(labels.shape, dtype = "int64")
+            valid = keep[labels]
+            out[valid] = np.searchsorted(
+                all_keys, keys(labels, row_off, col_off)[valid]
+                ) + 1
+            
+            return out
+        
+        stats = {k : np.zeros(n_final + 1) for k in
+                 ["cells", "x", "y", "perim"]}
+        bounds = {"row_min" : np.full(n_final + 1, np.iinfo("int64").max),
+                  "col_min" : np.full(n_final + 1, np.iinfo("int64").max),
+                  "row_max" : np.full(n_final + 1, -1),
+                  "col_max" : np.full(n_final + 1, -1)}
+        
+        profile.update(_label_profile)
+        
+        with rasterio.open(dst_file, "w", **profile) as dst:
+            for window in _windows(height, width, block_size):
+                r0, c0 = int(window.row_off), int(window.col_off)
+                h, w = int(window.height), int(window.width)
+                
+                # Read with a margin of one cell to find patch edges
+                pr0, pc0 = max(0, r0 - 1), max(0, c0 - 1)
+                pr1 = min(height, r0 + h + 1)
+                pc1 = min(width, c0 + w + 1)
+                padded = np.zeros((h + 2, w + 2), dtype = "int64")
+                padded[pr0 - r0 + 1 : pr1 - r0 + 1,
+                       pc0 - c0 + 1 : pc1 - c0 + 1] = final(
+                    lut[src.read(1, window = Window(
+                        pc0, pr0, pc1 - pc0, pr1 - pr0
+                        ))], pr0, pc0
+                    )
+                labels = padded[1:-1, 1:-1]
+                dst.write(labels.astype("int32"), 1, window = window)
+                
+                flat = labels.ravel()
+                rows, cols = np.indices(labels.shape)
+                x, y = src.window_transform(window) * (cols + .5, rows + .5)
+                edges = sum(
+                    (labels != padded[1 + dr : h + 1 + dr,
+                                      1 + dc : w + 1 + dc]).astype("int64")
+                    * (resy if dr != 0 else resx)
+                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                    )
+                
+                for key, weights in [("cells", None), ("x", x), ("y", y),
+                                     ("perim", edges)]:
+                    stats[key] += np.bincount(
+                        flat, minlength = n_final + 1,
+                        weights = None if weights is None else weights.ravel()
+                        )
+                
+                for key, values, func in [
+                        ("row_min", rows + r0, np.minimum),
+                        ("col_min", cols + c0, np.minimum),
+                        ("row_max", rows + r0, np.maximum),
+                        ("col_max", cols + c0, np.maximum)]:
+                    ids, red = _group_reduce(flat, values.ravel(), func)
+                    bounds[key][ids] = func(bounds[key][ids], red)
+    
+    ids = np.arange(1, n_final + 1)
+    area = stats["cells"][1:] * resx * resy
+    
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        table = pd.DataFrame({
+            "Id" : ids,
+            "Area" : area,
+            "Perim" : stats["perim"][1:],
+            "Capacity" : area,
+            "ncells" : stats["cells"][1:].astype("int64"),
+            "x" : stats["x"][1:] / stats["cells"][1:],
+            "y" : stats["y"][1:] / stats["cells"][1:]
+            })
+    
+    for key, values in bounds.items():
+        table[key] = values[1:]
+    
+    return table
+
+#-----------------------------------------------------------------------------|
+# Functions
+def label_patches(landscape, habitat, nomerge = False, nodata = None,
+                  minarea = None, maxsize = None, connexity = 8,
+                  out_file = None, block_size = None):
+    '''
+    Extract habitat patches from a landscape raster without calling Graphab.
+    The raster is labelled block by block and labels of patches crossing
+    block boundaries are merged afterwards, so rasters larger than the
+    available memory can be processed. Options correspond to those of
+    Project.create_project().
+    
+    Parameters
+    ----------
+    landscape : str
+        File path of the landscape raster.
+    habitat : int, str or list
+        Code(s) of habitat cells.
+    nomerge : bool, optional
+        Do not merge contiguous patches of different codes.
+        The default is False.
+    nodata : int, optional
+        NoData value. Cells with this value are never part of a patch.
+        The default is None.
+    minarea : numeric, optional
+        Minimum patch area in ha. The default is None.
+    maxsize : numeric, optional
+        Maximum patch area in ha. Patches exceeding maxsize are split along a
+        square grid. The default is None.
+    connexity : int in {4, 8}, optional
+        Consider the 4 or 8 neighbours when merging pixels to patches.
+        The default is 8.
+    out_file : str, optional
+        Output patch raster (.tif). The default is None, in which case
+        "<landscape>-patches.tif" is written next to the landscape raster.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    table : pandas.DataFrame
+        Patch table containing ID, area, perimeter, capacity, number of cells,
+        centroid coordinates, and bounding box (in cells) of each patch.
+    out_file : str
+        Patch raster with the patch ID of each cell (0 outside patches).
+
+    '''
+    import rasterio
+    from scipy import ndimage
+    from .raster import _block_size
+    
+    codes = _habitat_codes(habitat)
+    
+    if nodata is not None:
+        try:
+            codes = [c for c in codes if c != int(float(nodata))]
+        
+        except ValueError:
+            pass
+    
+    structure = _structure(connexity)
+    step = _block_size if block_size is None else int(block_size)
+    out_file = os.path.splitext(landscape)[0] + "-patches.tif" \
+        if out_file is None else out_file
+    tmp_dir = tempfile.mkdtemp(
+        dir = os.path.dirname(os.path.abspath(out_file))
+        )
+    provisional = os.path.join(tmp_dir, "provisional.tif")
+    
+    try:
+        offset = 0
+        
+        with rasterio.open(landscape) as src:
+            profile = src.profile.copy()
+            profile.update(_label_profile)
+            
+            with rasterio.open(provisional, "w", **profile) as dst:
+                for window in _windows(src.height, src.width, step):
+                    data = src.read(1, window = window)
+                    labels = np.zeros(data.shape, dtype = "int64")
+                    groups = [[c] for c in codes] if nomerge else [codes]
+                    
+                    for group in groups:
+                        mask = np.isin(data, group)
+                        
+                        if not mask.any():
+                            continue
+                        
+                        lab, count = ndimage.label(mask, structure = structure)
+                        labels[mask] = lab[mask] + offset
+                        offset += count
+                    
+                    if offset > np.iinfo("int32").max:
+                        raise OverflowError(
+                            "Too many provisional labels. Use a larger " +
+                            "block_size."
+                            )
+                    
+                    dst.write(labels.astype("int32"), 1, window = window)
+        
+        table = _finalize_labels(
+            provisional, offset, out_file, step, connexity = connexity,
+            codes_file = landscape if nomerge else None, minarea = minarea,
+            maxsize = maxsize, block_size = block_size
+            )
+    
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+    
+    return table, out_file
+
+def compare_patches(patch_raster, reference, block_size = None):
+    '''
+    Compare two patch rasters, e.g., the output of label_patches() and the
+    patch raster written by Graphab.
+    
+    Parameters
+    ----------
+    patch_raster : str
+        Patch raster.
+    reference : str
+        Patch raster to compare with. Must be on the same grid.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    report : dict
+        Number of patches in both rasters, number of cells that are part of a
+        patch in only one of the rasters, number of patches without a one to
+        one correspondence, and whether the rasters describe identical
+        patches (up to patch IDs).
+
+    '''
+    import rasterio
+    
+    pairs = []
+    mismatched = 0
+    
+    with rasterio.open(patch_raster) as a, rasterio.open(reference) as b:
+        if (a.height, a.width) != (b.height, b.width):
+            raise ValueError(
+                f"Rasters {patch_raster} and {reference} differ in shape."
+                )
+        
+        for window in _windows(a.height, a.width, block_size):
+            la = a.read(1, window = window).astype("int64")
+            lb = b.read(1, window = window).astype("int64")
+            la[la < 0] = 0
+            lb[lb < 0] = 0
+            mismatched += int(np.count_nonzero((la > 0) != (lb > 0)))
+            both = (la > 0) & (lb > 0)
+            pairs.append(np.unique(
+                np.stack([la[both], lb[both]], axis = 1), axis = 0
+                ))
+    
+    pairs = np.unique(np.concatenate(pairs), axis = 0) if pairs else \
+        np.zeros((0, 2), dtype = "int64")
+    ids_a, count_a = np.unique(pairs[:, 0], return_counts = True)
+    ids_b, count_b = np.unique(pairs[:, 1], return_counts = True)
+    ambiguous = int(np.count_nonzero(count_a > 1) +
+                    np.count_nonzero(count_b > 1))
+    
+    report = {"patches" : len(ids_a),
+              "patches_reference" : len(ids_b),
+              "mismatched_cells" : mismatched,
+              "ambiguous_patches" : ambiguous,
+              "identical" : mismatched == 0 and ambiguous == 0 and \
+                  len(ids_a) == len(ids_b)
+              }
+    
+    return report
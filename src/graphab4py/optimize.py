@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:58:40 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, heapq
+import numpy as np
+from .tracing import span
+
+_modes = ["add", "remove", "links"]
+
+#-----------------------------------------------------------------------------|
+# Functions
+def _candidate_links(links, item, present):
+    '''
+    Links of a candidate patch to patches present in the graph.
+    '''
+    touches = (links["ID1"] == item) | (links["ID2"] == item)
+    other = np.where(links["ID1"] == item, links["ID2"], links["ID1"])
+    
+    return links[touches & np.isin(other, list(present))]
+
+def _apply(graph, mode, item, candidates, links):
+    '''
+    Scenario graph with a single candidate applied.
+    '''
+    if mode == "remove":
+        return graph.scenario(remove = [item])
+    
+    if mode == "links":
+        return graph.scenario(links = candidates.loc[[item]])
+    
+    present = set(graph.ids.tolist()) | {item}
+    
+    return graph.scenario(
+        add = candidates.loc[[item]].reset_index(),
+        links = None if links is None else _candidate_links(
+            links, item, present
+            )
+        )
+
+def greedy_selection(graph, k, metric = "PC", d = None, p = None, beta = 1.,
+                     mode = "add", candidates = None, links = None,
+                     lazy = True, n_jobs = None):
+    '''
+    Select the set of k patches or links with the largest combined effect on
+    a global metric by greedy maximisation. In each step, the candidate with
+    the largest marginal gain given the previous selections is chosen. With
+    lazy evaluation (CELF), gains of the previous steps are used as upper
+    bounds and only candidates whose bound exceeds the best current gain are
+    re-evaluated. Marginal gains are evaluated on scenario graphs (see
+    Graph.scenario), so only the components a candidate changes are
+    recomputed.
+    
+    Parameters
+    ----------
+    graph : graphab4py.graph.Graph
+        Graph of the current landscape (e.g., from Project.get_graph).
+    k : int
+        Number of items to select.
+    metric : str {"PC", "EC", "IIC"}, optional
+        Global metric. The default is "PC".
+    d : numeric, optional
+        Distance at which the dispersal probability equals p (PC and EC).
+    p : numeric, optional
+        Dispersal probability at distance d (PC and EC).
+    beta : numeric, optional
+        Exponent applied to patch capacities. The default is 1.
+    mode : str {"add", "remove", "links"}, optional
+        "add" selects new patches (e.g., restoration sites) maximising the
+        metric gain. "remove" selects existing patches whose successive loss
+        decreases the metric most, i.e., the patches to protect first.
+        "links" selects new links (e.g., corridors). The default is "add".
+    candidates : pandas.DataFrame or list, optional
+        Candidate patches ("Id", "Area" and, optionally, "Capacity") for mode
+        "add", candidate links ("ID1", "ID2", "Dist") for mode "links", or
+        patch IDs for mode "remove". The default is None (all patches of the
+        graph for mode "remove").
+    links : pandas.DataFrame, optional
+        Links of the candidate patches ("ID1", "ID2", "Dist") for mode "add".
+        Links between candidates are used once both are selected. The default
+        is None.
+    lazy : bool, optional
+        Reuse gains of previous steps as upper bounds (CELF). Exact for
+        metrics with diminishing returns; as new patches can act as stepping
+        stones, gains in mode "add" may increase and lazy selections can then
+        differ from plain greedy selections. The default is True.
+    n_jobs : int, optional
+        Number of threads evaluating gains in parallel. The default is None
+        (number of CPUs).
+    
+    Returns
+    -------
+    selection : pandas.DataFrame
+        One row per step with the selected item ("Item"), its marginal gain
+        ("Gain"), the metric value after the step (column named after the
+        metric) and the number of gain evaluations in the step
+        ("Evaluations"). The metric value before the first step is stored
+        in selection.attrs["initial"].
+
+    '''
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if mode not in _modes:
+        raise ValueError(f"Argument 'mode' must be one of {_modes}.")
+    
+    metric = metric.upper()
+    
+    if metric not in ["PC", "EC", "IIC"]:
+        raise ValueError(f"Metric {metric} is not supported for selection.")
+    
+    if mode == "remove":
+        items = list(graph.ids) if candidates is None else list(candidates)
+        candidates = None
+    
+    elif candidates is None:
+        raise ValueError(f"Mode '{mode}' requires candidates.")
+    
+    elif mode == "add":
+        candidates = candidates.set_index("Id")
+        items = list(candidates.index)
+    
+    else:
+        candidates = candidates[["ID1", "ID2", "Dist"]].reset_index(drop = True)
+        items = list(candidates.index)
+    
+    if len(set(items)) < len(items):
+        raise ValueError("Candidates must be unique.")
+    
+    k = min(int(k), len(items))
+    n_jobs = os.cpu_count() if n_jobs is None else int(n_jobs)
+    sign = -1. if mode == "remove" else 1.
+    
+    def value(g):
+        return g.metric(metric, d = d, p = p, beta = beta)
+    
+    current = graph
+    current_value = value(current)
+    initial = current_value
+    rows = []
+    
+    with ThreadPoolExecutor(max_workers = n_jobs) as executor:
+        def gains(batch):
+            values = list(executor.map(
+                lambda item: value(_apply(current, mode, item, candidates,
+                                          links)), batch
+                ))
+            
+            return [sign * (v - current_value) for v in values]
+        
+        with span("evaluate gains", candidates = len(items)):
+            heap = [(-g, n, item, 0) for n, (item, g) in
+                    enumerate(zip(items, gains(items)))]
+        
+        heapq.heapify(heap)
+        evaluations = len(items)
+        
+        for step in range(k):
+            with span("select item", step = step + 1):
+                while lazy and heap[0][3] != step:
+                    # Re-evaluate all stale bounds which could exceed the
+                    # gain of the best candidate evaluated in this step
+                    fresh = [e for e in heap if e[3] == step]
+                    best = min(e[0] for e in fresh) if fresh else np.inf
+                    stale = [e for e in heap if e[3] != step and e[0] < best]
+                    stale = sorted(stale)[:max(1, n_jobs)]
+                    ids = {e[1] for e in stale}
+                    heap = [e for e in heap if e[1] not in ids]
+                    heap += [(-g, e[1], e[2], step) for e, g in
+                             zip(stale, gains([e[2] for e in stale]))]
+                    heapq.heapify(heap)
+                    evaluations += len(stale)
+                
+                if not lazy and step > 0:
+                    remaining = [e[2] for e in heap]
+                    heap = [(-g, e[1], e[2], step) for e, g in
+                            zip(heap, gains(remaining))]
+                    heapq.heapify(heap)
+                    evaluations += len(remaining)
+                
+                gain, _, item, _ = heapq.heappop(heap)
+                current = _apply(current, mode, item, candidates, links)
+                current_value = value(current)
+                rows.append({"Item" : item,
+                             "Gain" : -gain,
+                             metric : current_value,
+                             "Evaluations" : evaluations})
+                evaluations = 0
+    
+    selection = pd.DataFrame(rows, columns = ["Item", "Gain", metric,
+                                              "Evaluations"])
+    selection.index = pd.RangeIndex(1, len(rows) + 1, name = "Step")
+    selection.attrs["initial"] = initial
+    
+    if mode == "links":
+        selection = selection.join(
+            candidates.loc[selection["Item"]].set_index(selection.index)
+            )
+    
+    return selection
@@ -10,13 +10,25 @@ __email__ = "requests@cdpopp.de"
 __status__ = "Development"
 
 #-----------------------------------------------------------------------------|
-import os, sys, re, glob, platform, subprocess, signal, warnings, csv
+import os, sys, re, glob, copy, json, time, shutil, tempfile, platform, \
+    subprocess, signal, warnings, csv, threading, hashlib, datetime
+from types import MappingProxyType
 import xmltodict
 import xml.etree.ElementTree as ET
 from urllib.request import urlretrieve
 import numpy as np
 import pickle as pk
 import matplotlib
+from .raster import crop_to_habitat, crop_like, zonal_stats
+from .labeling import label_patches, compare_patches
+from .costdist import CostSurfaceStore, corridor_raster
+from .euclid import euclid_links, added_patch_links
+from .graph import Graph
+from .optimize import greedy_selection
+from .circuit import raster_resistance, graph_resistance
+from .results import read_table, read_delta, parse_metric_output, \
+    find_outputs
+from .tracing import span, trace_methods
 try:
     import matplotlib.pyplot as plt
 
@@ -25,10 +37,61 @@ except:
     import matplotlib.pyplot as plt
 
 process_ids = []
+_process_lock = threading.Lock()
+
+# Settings that can be set per project or per call
+_setting_keys = ["java", "memory", "cores", "graphab", "jvm_profile",
+                 "run_log", "scratch"]
+_log_lock = threading.Lock()
+
+# JVM tuning profiles. gc: garbage collector (-XX:+Use<gc>), xms: initial
+# heap ("max" for the heap limit), xss: thread stack size, options: further
+# JVM options, limit_processors: set -XX:ActiveProcessorCount to the cores
+jvm_profiles = {
+    "default" : {},
+    "throughput" : {"gc" : "ParallelGC",
+                    "xms" : "max",
+                    "limit_processors" : True},
+    "low-memory" : {"gc" : "SerialGC",
+                    "options" : ["-XX:MinHeapFreeRatio=10",
+                                 "-XX:MaxHeapFreeRatio=20",
+                                 "-XX:TieredStopAtLevel=1"],
+                    "limit_processors" : True},
+    "large-raster" : {"gc" : "G1GC",
+                      "xms" : "max",
+                      "xss" : "256m",
+                      "limit_processors" : True}
+    }
+
+# Profiles used by operation type unless a profile is set explicitly. The
+# built-in defaults only apply to calls with a memory or core limit; other
+# calls keep the plain JVM command line (see set_jvm_profile)
+_default_operation_profiles = MappingProxyType({
+    "create" : "large-raster",
+    "linkset" : "default",
+    "graph" : "default",
+    "metric" : "default",
+    "delta" : "throughput"
+    })
+operation_profiles = dict(_default_operation_profiles)
+
+# Selections with more items are passed to Graphab as a file (fsel)
+_max_select = 1000
+
+# Number of run records kept in Project.runs
+_max_runs = 1000
+
+# Files which are never modified once written (rasters and cached cost
+# surfaces) and can be shared between clones through hard links
+_immutable_extensions = [".tif", ".tiff", ".tfw", ".npy", ".npz"]
+_FICLONE = 0x40049409
 
 def sigterm_handler(signum, frame):
     print("Process will be terminated. Cleaning up...")
-    for pid in process_ids:
+    with _process_lock:
+        pids = list(process_ids)
+    
+    for pid in pids:
         os.kill(pid, signal.SIGTERM)
     sys.exit(0)
 
@@ -40,6 +103,12 @@ _cfg_file = "Settings.cfg"
 if not os.path.exists(_cfg_dir):
     os.makedirs(_cfg_dir)
 
+# Class-data-sharing archives for fast JVM startup
+_cds_dir = os.path.join(_cfg_dir, "cds")
+_cds_lock = threading.Lock()
+_cds_max_archives = 8
+_java_versions = {}
+
 #-----------------------------------------------------------------------------|
 # Functions
 def _get_settings(file = os.path.join(_cfg_dir, _cfg_file), silent = False):
@@ -102,6 +171,447 @@ def _delete_settings(file = os.path.join(_cfg_dir, _cfg_file)):
     '''
     os.remove(file)
 
+def _reflink(src, dst):
+    '''
+    Create a copy-on-write copy of a file (Linux FICLONE, e.g., on Btrfs or
+    XFS). Raises OSError if the file system does not support it.
+    '''
+    import fcntl
+    
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        
+        raise
+    
+    shutil.copystat(src, dst)
+
+def _rebase_paths(value, src, dst):
+    '''
+    Replace paths below directory src by the same paths below dst in a
+    string or in the strings of nested dicts, lists and tuples.
+    '''
+    if isinstance(value, dict):
+        return {key : _rebase_paths(val, src, dst)
+                for key, val in value.items()}
+    
+    if isinstance(value, (list, tuple)):
+        return type(value)(_rebase_paths(val, src, dst) for val in value)
+    
+    if isinstance(value, str) and os.path.isabs(value):
+        path = os.path.abspath(value)
+        
+        if path == src or path.startswith(src + os.sep):
+            return os.path.join(dst, os.path.relpath(path, src))
+    
+    return value
+
+def _clone_tree(src, dst, method = "auto"):
+    '''
+    Replicate a directory tree for a project clone. With method "auto",
+    files are reflinked if the file system supports it. Otherwise, files
+    with an extension in _immutable_extensions are hard-linked and all other
+    files, which Graphab may rewrite in place, are copied.
+    
+    Returns
+    -------
+    counts : dict
+        Number of files reflinked, hard-linked and copied.
+    '''
+    counts = {"reflink" : 0, "hardlink" : 0, "copy" : 0}
+    reflink = method == "auto" and sys.platform.startswith("linux")
+    
+    for root, dirs, files in os.walk(src):
+        target = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target, exist_ok = True)
+        
+        for file in files:
+            source = os.path.join(root, file)
+            destination = os.path.join(target, file)
+            
+            if reflink:
+                try:
+                    _reflink(source, destination)
+                    counts["reflink"] += 1
+                    continue
+                
+                except (OSError, ImportError):
+                    reflink = False
+            
+            if method != "copy" and os.path.splitext(file)[1].lower() in \
+                    _immutable_extensions:
+                try:
+                    os.link(source, destination)
+                    counts["hardlink"] += 1
+                    continue
+                
+                except OSError:
+                    pass
+            
+            shutil.copy2(source, destination)
+            counts["copy"] += 1
+    
+    return counts
+
+def _sync_journal(directory):
+    return os.path.join(directory, ".g4p-sync.json")
+
+def _recover_sync(directory):
+    '''
+    Complete an interrupted sync from a scratch directory (see _sync_back).
+    Files are only renamed once all of them were copied, so the journal
+    either lists completely copied files or does not exist.
+    '''
+    journal = _sync_journal(directory)
+    
+    if not os.path.isfile(journal):
+        for tmp in glob.glob(os.path.join(directory, "**", "*.g4p-sync"),
+                             recursive = True):
+            os.remove(tmp)
+        
+        return
+    
+    with open(journal, "r") as f:
+        pending = json.load(f)
+    
+    for rel in pending["replace"]:
+        tmp = os.path.join(directory, rel + ".g4p-sync")
+        
+        if os.path.isfile(tmp):
+            os.replace(tmp, os.path.join(directory, rel))
+    
+    for rel in pending["remove"]:
+        if os.path.isfile(os.path.join(directory, rel)):
+            os.remove(os.path.join(directory, rel))
+    
+    os.remove(journal)
+
+def _tree_states(directory):
+    '''
+    Size and modification time of all files below a directory, by relative
+    path.
+    '''
+    states = {}
+    
+    for root, _, files in os.walk(directory):
+        for name in files:
+            file = os.path.join(root, name)
+            stat = os.stat(file)
+            states[os.path.relpath(file, directory)] = (stat.st_size,
+                                                        stat.st_mtime_ns)
+    
+    return states
+
+def _file_hash(file):
+    digest = hashlib.sha1()
+    
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    
+    return digest.hexdigest()
+
+def _stage(directory, scratch):
+    '''
+    Copy a project directory to a new directory below scratch.
+    
+    Returns
+    -------
+    staged : str
+        Copy of the project directory.
+    states : dict
+        Size and modification time of the copied files (see _tree_states).
+    '''
+    os.makedirs(scratch, exist_ok = True)
+    root = tempfile.mkdtemp(prefix = "g4p-stage-", dir = scratch)
+    staged = os.path.join(root, os.path.basename(directory))
+    
+    if os.path.isdir(directory):
+        _recover_sync(directory)
+        shutil.copytree(directory, staged, copy_function = shutil.copy2)
+    
+    else:
+        os.makedirs(staged)
+    
+    return staged, _tree_states(staged)
+
+def _sync_back(staged, directory, states, delete = True):
+    '''
+    Copy files that Graphab created or changed in the staged directory back
+    to the project directory. Files with a new size or modification time are
+    compared by hash, so rewritten but identical files are not copied. All
+    files are first copied next to their targets and then renamed, with a
+    journal that lets _recover_sync finish an interrupted rename phase, so
+    the project directory never contains partly written files.
+    
+    Returns
+    -------
+    changed : list
+        Relative paths of the files copied or removed.
+    '''
+    after = _tree_states(staged)
+    replace = []
+    
+    for rel, state in after.items():
+        if rel not in states:
+            replace.append(rel)
+        
+        elif state != states[rel]:
+            target = os.path.join(directory, rel)
+            
+            if not os.path.isfile(target) or state[0] != states[rel][0] or \
+                    _file_hash(target) != _file_hash(os.path.join(staged, rel)):
+                replace.append(rel)
+    
+    remove = [rel for rel in states.keys() if rel not in after] if \
+        delete else []
+    
+    if len(replace) + len(remove) == 0:
+        return []
+    
+    for rel in replace:
+        target = os.path.join(directory, rel)
+        os.makedirs(os.path.dirname(target), exist_ok = True)
+        shutil.copy2(os.path.join(staged, rel), target + ".g4p-sync")
+    
+    journal = _sync_journal(directory)
+    
+    with open(journal + ".tmp", "w") as f:
+        json.dump({"replace" : replace, "remove" : remove}, f)
+    
+    os.replace(journal + ".tmp", journal)
+    _recover_sync(directory)
+    
+    return replace + remove
+
+def _split_memory(memory, n):
+    '''
+    Divide a Java memory limit (e.g., "16g") among n processes.
+    '''
+    if memory is None:
+        return None
+    
+    mem = str(memory).lower().strip("b")
+    unit = mem.lstrip("0123456789")
+    mega = int(mem[:len(mem) - len(unit)]) * (1024 if unit == "g" else 1)
+    
+    return f"{max(1, mega // n)}m"
+
+def _trim_partial_row(file):
+    '''
+    Remove an incomplete last line (e.g., left by an interrupted append)
+    from a text file. Files without a complete line are deleted.
+    '''
+    with open(file, "rb+") as f:
+        data = f.read()
+        
+        if data.endswith(b"\n"):
+            return
+        
+        end = data.rfind(b"\n") + 1
+        f.truncate(end)
+    
+    if end == 0:
+        os.remove(file)
+
+def _delta_files(directory):
+    '''
+    Delta output files in a directory (regular files named delta-*.txt, see
+    results.find_outputs).
+    '''
+    return [file for file in find_outputs(directory) if os.path.isfile(file)]
+
+def _file_states(files):
+    '''
+    Modification time and size of files, used to detect which outputs a
+    Graphab call has written.
+    '''
+    states = {}
+    
+    for file in files:
+        stat = os.stat(file)
+        states[file] = (stat.st_mtime_ns, stat.st_size)
+    
+    return states
+
+def _changed_files(before, files):
+    return [file for file, state in _file_states(files).items() if
+            before.get(file) != state]
+
+def _run_process(cmd):
+    '''
+    Run a Graphab process and measure its resource use. On POSIX systems, the
+    process is reaped with os.wait4, which returns the CPU times and the peak
+    resident set size of the process.
+    
+    Parameters
+    ----------
+    cmd : list
+        Command.
+    
+    Returns
+    -------
+    out : bytes
+        Process output.
+    err : bytes
+        Process error output.
+    usage : dict
+        Process ID, start time, wall time, user and system CPU time (s),
+        peak resident set size (bytes) and exit code. CPU times and peak RSS
+        are None where os.wait4 is not available.
+
+    '''
+    started = datetime.datetime.now().isoformat(timespec = "seconds")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        cmd,
+        shell = False,
+        stdout = subprocess.PIPE,
+        stderr = subprocess.PIPE
+        )
+    
+    pid = process.pid
+    print(f"Started subprocess\nProcess ID: {pid}")
+    
+    with _process_lock:
+        process_ids.append(pid)
+    
+    rusage = None
+    
+    try:
+        if hasattr(os, "wait4"):
+            streams = {}
+            
+            def read(name, stream):
+                streams[name] = stream.read()
+                stream.close()
+            
+            readers = [threading.Thread(target = read, args = item) for item
+                       in [("out", process.stdout), ("err", process.stderr)]]
+            
+            for reader in readers:
+                reader.start()
+            
+            for reader in readers:
+                reader.join()
+            
+            _, status, rusage = os.wait4(pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            out, err = streams["out"], streams["err"]
+        
+        else:
+            out, err = process.communicate()
+    
+    except BaseException:
+        # Do not leave Graphab running if the call is interrupted
+        process.kill()
+        process.wait()
+        
+        raise
+    
+    finally:
+        with _process_lock:
+            process_ids.remove(pid)
+    
+    usage = {"pid" : pid,
+             "start" : started,
+             "wall_time" : time.perf_counter() - start,
+             "user_time" : None,
+             "sys_time" : None,
+             "max_rss" : None,
+             "exit_code" : process.returncode}
+    
+    if rusage is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        usage.update({"user_time" : rusage.ru_utime,
+                      "sys_time" : rusage.ru_stime,
+                      "max_rss" : rusage.ru_maxrss * scale})
+    
+    return out, err, usage
+
+def _append_run_log(file, record):
+    '''
+    Append a run record to a JSON lines file.
+    '''
+    with _log_lock:
+        with open(file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+def set_run_log(file, temporary = True):
+    '''
+    Append a record of each Graphab call (operation, command, wall time, CPU
+    time, peak memory and exit code) to a JSON lines file.
+    
+    Parameters
+    ----------
+    file : str
+        Log file. None stops logging.
+    temporary : bool, optional
+        Whether to set the log file only for this session. The default is
+        True.
+    
+    Returns
+    -------
+    None.
+
+    '''
+    if not isinstance(temporary, bool):
+        raise ValueError(
+            f"Argument 'temporary' must be bool but is {type(temporary)}."
+            )
+    
+    file = None if file is None else os.path.abspath(file)
+    
+    global ga_settings
+    ga_settings["run_log"] = file
+    
+    if not temporary:
+        _ga_settings = _get_settings(silent = True)
+        _ga_settings["run_log"] = file
+        
+        _write_settings(_ga_settings)
+
+def set_scratch(directory, temporary = True):
+    '''
+    Run Graphab on a copy of the project in a local scratch directory, e.g.,
+    when projects are stored on a network file system. Only files created or
+    changed by Graphab are synced back to the project directory.
+    
+    Parameters
+    ----------
+    directory : str
+        Scratch directory (e.g., /dev/shm or a node-local SSD). None disables
+        staging.
+    temporary : bool, optional
+        Whether to set the scratch directory only for this session. The
+        default is True.
+    
+    Returns
+    -------
+    None.
+
+    '''
+    if not isinstance(temporary, bool):
+        raise ValueError(
+            f"Argument 'temporary' must be bool but is {type(temporary)}."
+            )
+    
+    directory = None if directory is None else os.path.abspath(directory)
+    
+    global ga_settings
+    ga_settings["scratch"] = directory
+    
+    if not temporary:
+        _ga_settings = _get_settings(silent = True)
+        _ga_settings["scratch"] = directory
+        
+        _write_settings(_ga_settings)
+
 def try_java(java):
     '''
     Try to receive and print the Java version from the given path or shortcut.
@@ -273,11 +783,11 @@ def set_cores(n, temporary = True):
     
     if isinstance(n, int):
         global ga_settings
-        ga_settings["memory"] = n
+        ga_settings["cores"] = n
         
         if not temporary:
             _ga_settings = _get_settings(silent = True)
-            _ga_settings["memory"] = n
+            _ga_settings["cores"] = n
             
             _write_settings(_ga_settings)
     
@@ -427,6 +937,297 @@ def get_graphab(directory):
     
     return out_file, exit_status.as_string()
 
+def _jvm_flags(profile, memory = None, cores = None):
+    '''
+    JVM options of a tuning profile (see jvm_profiles).
+    '''
+    if profile not in jvm_profiles.keys():
+        raise ValueError(
+            f"Unknown JVM profile '{profile}'. Available profiles: " +
+            ", ".join(jvm_profiles.keys()) + "."
+            )
+    
+    settings = jvm_profiles[profile]
+    flags = []
+    
+    if settings.get("gc") is not None:
+        flags += [f"-XX:+Use{settings['gc']}"]
+    
+    xms = settings.get("xms")
+    
+    if xms == "max":
+        xms = memory
+    
+    if xms is not None:
+        flags += [f"-Xms{xms}"]
+    
+    if settings.get("xss") is not None:
+        flags += [f"-Xss{settings['xss']}"]
+    
+    flags += list(settings.get("options", []))
+    
+    if settings.get("limit_processors") and cores is not None:
+        flags += [f"-XX:ActiveProcessorCount={int(cores)}"]
+    
+    return flags
+
+def set_jvm_profile(profile, operation = None):
+    '''
+    Select the JVM tuning profile for Graphab calls during this session.
+    
+    Parameters
+    ----------
+    profile : str
+        Name of a profile in graphab4py.project.jvm_profiles ("default",
+        "throughput", "low-memory", "large-raster" or a custom profile).
+    operation : str {create, linkset, graph, metric, delta}, optional
+        Use the profile for one operation type only. The default is None, in
+        which case the profile is used for all calls.
+    
+    Notes
+    -----
+    Without a profile set for all calls, each operation type uses its
+    profile in graphab4py.project.operation_profiles. By default, project
+    creation uses "large-raster" (G1 collector, initial heap set to the
+    memory limit, larger thread stacks), delta analyses use "throughput"
+    (parallel collector, initial heap set to the memory limit) and all other
+    operations use "default". These defaults only apply to calls with a
+    memory or core limit (see set_memory and set_cores). Other calls keep
+    the plain JVM command line. Profiles set with this function always
+    apply.
+    
+    Returns
+    -------
+    None.
+
+    '''
+    if profile not in jvm_profiles.keys():
+        raise ValueError(
+            f"Unknown JVM profile '{profile}'. Available profiles: " +
+            ", ".join(jvm_profiles.keys()) + "."
+            )
+    
+    if operation is None:
+        global ga_settings
+        ga_settings["jvm_profile"] = profile
+    
+    elif operation in operation_profiles.keys():
+        operation_profiles[operation] = profile
+    
+    else:
+        raise ValueError(
+            f"Unknown operation '{operation}'. Must be one of " +
+            ", ".join(operation_profiles.keys()) + "."
+            )
+
+def _java_version(java):
+    '''
+    Major version and version string of a Java executable. Results are kept
+    for the session.
+    '''
+    if java not in _java_versions:
+        proc = subprocess.run(
+            [java, "-version"], stdout = subprocess.PIPE,
+            stderr = subprocess.STDOUT
+            )
+        text = proc.stdout.decode("utf-8", errors = "replace")
+        match = re.search(r'version "(\d+)(?:\.(\d+))?', text)
+        
+        if match is None:
+            raise Exception(f"Unable to determine the version of {java}.")
+        
+        major = int(match.group(1))
+        
+        if major == 1 and match.group(2) is not None:
+            major = int(match.group(2))
+        
+        _java_versions[java] = (major, text.strip())
+    
+    return _java_versions[java]
+
+def _cds_archive(java, graphab):
+    '''
+    Path of the class-data-sharing archive for a Java executable and Graphab
+    .jar file. The name depends on the Java version and on the path, size and
+    modification time of both files, so that an update of either invalidates
+    the archive.
+    '''
+    signature = [_java_version(java)[1]]
+    
+    for file in _cds_files(java, graphab):
+        signature += file
+    
+    key = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:16]
+    
+    return os.path.join(_cds_dir, f"graphab-{key}.jsa")
+
+def _cds_files(java, graphab):
+    '''
+    Path, size and modification time of the Java executable and the Graphab
+    .jar file a class-data-sharing archive is created for.
+    '''
+    files = []
+    
+    for file in [shutil.which(java) or java, graphab]:
+        stat = os.stat(os.path.realpath(file))
+        files.append([os.path.realpath(file), stat.st_size,
+                      stat.st_mtime_ns])
+    
+    return files
+
+def _evict_cds_archives(keep):
+    '''
+    Remove class-data-sharing archives whose Java executable or Graphab .jar
+    file was changed or deleted, and the least recently used archives beyond
+    _cds_max_archives. Archives of other installations in use are kept.
+    '''
+    archives = []
+    
+    for file in glob.glob(os.path.join(_cds_dir, "graphab-*.jsa")):
+        if file == keep:
+            continue
+        
+        meta = os.path.splitext(file)[0] + ".json"
+        
+        try:
+            with open(meta, "r") as f:
+                files = json.load(f)["files"]
+            
+            outdated = any(
+                (os.stat(path).st_size, os.stat(path).st_mtime_ns) !=
+                (size, mtime) for path, size, mtime in files
+                )
+        
+        except (OSError, ValueError, KeyError):
+            outdated = True
+        
+        if outdated:
+            for remove in [file, meta]:
+                if os.path.isfile(remove):
+                    os.remove(remove)
+        
+        else:
+            archives.append(file)
+    
+    archives.sort(key = os.path.getmtime, reverse = True)
+    
+    for file in archives[max(0, _cds_max_archives - 1):]:
+        os.remove(file)
+        os.remove(os.path.splitext(file)[0] + ".json")
+
+def _create_cds_archive(java, graphab, archive, training = None):
+    '''
+    Run Graphab once with -XX:ArchiveClassesAtExit to dump the loaded classes
+    into a dynamic class-data-sharing archive. Outdated archives are removed
+    (see _evict_cds_archives).
+    '''
+    if _java_version(java)[0] < 13:
+        raise ValueError(
+            "Fast startup requires Java 13 or newer (dynamic CDS archives)."
+            )
+    
+    training = ["--help"] if training is None else list(training)
+    os.makedirs(_cds_dir, exist_ok = True)
+    _evict_cds_archives(archive)
+    tmp = archive + ".tmp"
+    subprocess.run(
+        [java, f"-XX:ArchiveClassesAtExit={tmp}", "-Djava.awt.headless=true",
+         "-jar", graphab] + training,
+        stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL
+        )
+    
+    if not os.path.isfile(tmp):
+        raise Exception(f"Java did not create a CDS archive at {tmp}.")
+    
+    with open(os.path.splitext(archive)[0] + ".json", "w") as f:
+        json.dump({"files" : _cds_files(java, graphab)}, f)
+    
+    os.replace(tmp, archive)
+
+def _cds_flags(java, graphab, training = None):
+    '''
+    JVM flags to use the class-data-sharing archive of the given Java and
+    Graphab versions. The archive is created on first use.
+    '''
+    try:
+        archive = _cds_archive(java, graphab)
+        
+        with _cds_lock:
+            if not os.path.isfile(archive):
+                _create_cds_archive(java, graphab, archive, training)
+            
+            else:
+                # Recently used archives are kept on eviction
+                os.utime(archive)
+    
+    except Exception as e:
+        warnings.warn(f"Fast startup disabled for this call: {e}")
+        
+        return []
+    
+    return [f"-XX:SharedArchiveFile={archive}", "-Xshare:auto"]
+
+def enable_fast_startup(enable = True, training = None, temporary = False):
+    '''
+    Speed up the start of Graphab calls with an application class-data-sharing
+    (AppCDS) archive. A training run of Graphab stores the classes it loads in
+    an archive next to the Graphab4py settings, and subsequent calls map the
+    archive instead of loading and verifying the classes again. A new archive
+    is created when the Java executable or the Graphab .jar file changes.
+    Requires Java 13 or newer.
+    
+    Parameters
+    ----------
+    enable : bool, optional
+        Enable or disable fast startup. The default is True.
+    training : list, optional
+        Graphab arguments of the training run. Classes not loaded during the
+        training run are loaded as usual. The default is None, in which case
+        ["--help"] is used.
+    temporary : bool, optional
+        Whether to enable fast startup only for this session. The default is
+        False.
+    
+    Returns
+    -------
+    archive : str
+        Path to the archive, or None if fast startup was disabled.
+
+    '''
+    if not isinstance(temporary, bool):
+        raise ValueError(
+            f"Argument 'temporary' must be bool but is {type(temporary)}."
+            )
+    
+    global ga_settings
+    ga_settings["fast_startup"] = bool(enable)
+    ga_settings["fast_startup_training"] = training
+    
+    if not temporary:
+        _ga_settings = _get_settings(silent = True)
+        _ga_settings["fast_startup"] = bool(enable)
+        _ga_settings["fast_startup_training"] = training
+        
+        _write_settings(_ga_settings)
+    
+    if not enable:
+        return None
+    
+    java = ga_settings.get("java") or sys_java
+    graphab = ga_settings.get("graphab")
+    
+    if graphab is None:
+        raise Exception("Graphab directory not set. Use set_graphab().")
+    
+    archive = _cds_archive(java, graphab)
+    
+    with _cds_lock:
+        if not os.path.isfile(archive):
+            print("Creating CDS archive for Graphab. This may take a while.")
+            _create_cds_archive(java, graphab, archive, training)
+    
+    return archive
+
 #-----------------------------------------------------------------------------|
 # Settings
 ga_settings = _get_settings(silent = True)
@@ -473,6 +1274,7 @@ else:
 
 #-----------------------------------------------------------------------------|
 # Classes
+@trace_methods
 class DistanceConverter():
     def __init__(self,
                  linkset_info,
@@ -546,7 +1348,8 @@ class DistanceConverter():
         self.limits = [lower_limit, upper_limit]
         
         # Open data table
-        with open(linkset_info, newline = "\n") as f:
+        with span("read link table", file = linkset_info), \
+                open(linkset_info, newline = "\n") as f:
             reader = csv.reader(f, delimiter = ",", quotechar = '"')
             
             dist_l = []
@@ -685,13 +1488,56 @@ class DistanceConverter():
         plt.savefig(file)
         plt.clf()
 
+@trace_methods
 class Project():
-    def __init__(self):
+    def __init__(self, **settings):
+        '''
+        Create an empty project. Use create_project or load_project to fill
+        it.
+        
+        :param kwargs:
+            Graphab settings (java, memory, cores, graphab, scratch, ...) for
+            all calls of this project. They override the session settings (ga_settings)
+            and are overridden by settings passed to individual methods.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        unknown = [key for key in settings.keys() if key not in _setting_keys]
+        
+        if len(unknown) > 0:
+            raise TypeError(
+                f"Unknown settings {unknown}. Allowed are {_setting_keys}."
+                )
+        
+        self.settings = {key : val for key, val in settings.items() if
+                         val is not None}
+        self.runs = []
+        self.last_run = None
         self.dist_converters = None
-        pass
+        self.crop = None
+        self.linkset_info = {}
+    
+    def _call_settings(self, **overrides):
+        '''
+        Settings of a single Graphab call: the session settings, updated by
+        the project settings and the non-None overrides. The result is
+        read-only and independent of later changes to ga_settings, so that
+        concurrent calls cannot leak settings into each other.
+        '''
+        settings = {key : None for key in _setting_keys}
+        settings.update(dict(ga_settings))
+        settings.update(getattr(self, "settings", {}))
+        settings.update({key : val for key, val in overrides.items() if
+                         key in _setting_keys and val is not None})
+        
+        return MappingProxyType(settings)
     
     def _base_call(self, java = None, memory = None, cores = None,
-                  graphab = None, **kwargs):
+                  graphab = None, jvm_profile = None, run_log = None,
+                  scratch = None, operation = None, **kwargs):
         '''
         Create and run a call to Graphab.
         
@@ -706,6 +1552,22 @@ class Project():
             Number of CPU cores to provide to Graphab. The default is None.
         graphab : str, optional
             Path to the Graphab .jar file. The default is None.
+        jvm_profile : str, optional
+            JVM tuning profile (see jvm_profiles). The default is None, in
+            which case the profile set for the project or session, or else
+            the profile of the operation type is used.
+        operation : str, optional
+            Operation type used to select the default JVM profile (see
+            operation_profiles). The default is None.
+        run_log : str, optional
+            JSON lines file to which the run record is appended. The default
+            is None, in which case the project or session setting is used.
+        scratch : str, optional
+            Local directory (e.g., /dev/shm or a node-local disk) to which the
+            project is copied before the call. Graphab runs on the copy and
+            only files it created or changed are synced back when it exits
+            successfully. The default is None, in which case the project or
+            session setting is used.
         
         :param kwargs:
             Arguments to append to the Graphab call.
@@ -714,22 +1576,16 @@ class Project():
         -------
         proc_out : bytes
             Process output.
+        
+        A record of the call (operation, command, project, wall time, CPU
+        time, peak resident memory and exit code) is stored in self.last_run
+        and appended to self.runs, which keeps the last _max_runs records.
 
         '''
-        global ga_settings
-        current_settings = ga_settings
-        
-        settings = {
-            key : val for key, val in locals().items() if (
-                (val is not None) and (
-                    key in ["java", "memory", "cores", "graphab"]
-                    )
-                )
-            }
-        
-        if len(settings) > 0:
-            current_settings.update(settings)
-        
+        current_settings = self._call_settings(
+            java = java, memory = memory, cores = cores, graphab = graphab,
+            jvm_profile = jvm_profile, run_log = run_log, scratch = scratch
+            )
         java = current_settings["java"]
         
         if java is None:
@@ -741,11 +1597,13 @@ class Project():
             except:
                 raise Exception("Java path not set. Use set_java().")
         
-        graphab = current_settings["graphab"].replace("\\", "/")
+        graphab = current_settings["graphab"]
         
         if graphab is None:
             raise Exception("Graphab directory not set. Use set_graphab().")
         
+        graphab = graphab.replace("\\", "/")
+        
         if "mpi" in kwargs.keys():
             mpi = kwargs["mpi"]
             del kwargs["mpi"]
@@ -763,15 +1621,36 @@ class Project():
             else:
                 mem = []
             
+            profile = current_settings.get("jvm_profile")
+            
+            if profile is None:
+                profile = operation_profiles.get(operation, "default")
+                
+                # Built-in defaults tune calls with resource limits only
+                if profile == _default_operation_profiles.get(operation) \
+                        and current_settings["memory"] is None and \
+                        current_settings["cores"] is None:
+                    profile = "default"
+            mem += _jvm_flags(profile, current_settings["memory"],
+                              current_settings["cores"])
+            cds = _cds_flags(
+                java, graphab, current_settings.get("fast_startup_training")
+                ) if current_settings.get("fast_startup") else []
             cmd = [
                 java, "-Djava.awt.headless=true"
-                ] + mem + [
+                ] + mem + cds + [
                 "-jar", graphab
                 ]
         
         if current_settings["cores"] is not None:
             cmd += ["-proc", str(current_settings["cores"])]
         
+        stage = None
+        
+        if current_settings.get("scratch") is not None:
+            stage = self._stage_call(current_settings["scratch"], kwargs)
+            kwargs = kwargs if stage is None else stage["kwargs"]
+        
         for key, val in kwargs.items():
             values = val if isinstance(val, list) else [val]
             cmd += ["--{0}".format(key)] + values
@@ -780,20 +1659,8 @@ class Project():
         print(cmd)
         
         try:
-            process = subprocess.Popen(
-                cmd,
-                shell = False,
-                stdout = subprocess.PIPE,
-                stderr = subprocess.PIPE
-                )
-            
-            pid = process.pid
-            print(f"Started subprocess\nProcess ID: {pid}")
-            
-            global process_ids
-            process_ids.append(pid)
-            
-            proc_out_b, proc_err_b = process.communicate()
+            with span("Graphab process", operation = operation):
+                proc_out_b, proc_err_b, usage = _run_process(cmd)
             
             try:
                 proc_out = proc_out_b.decode("utf-8")
@@ -805,18 +1672,100 @@ class Project():
                 proc_err = proc_err_b.decode("utf-8")
             except AttributeError:
                 proc_err = proc_err_b
-            
-            process_ids.pop()
         
         except FileNotFoundError:
+            if stage is not None:
+                shutil.rmtree(stage["root"], ignore_errors = True)
             
             raise FileNotFoundError(f"Unable to locate {java}.")
         
+        except BaseException:
+            if stage is not None:
+                shutil.rmtree(stage["root"], ignore_errors = True)
+            
+            raise
+        
+        if stage is not None:
+            try:
+                if usage["exit_code"] == 0:
+                    with span("sync from scratch", directory = stage["target"]):
+                        _sync_back(stage["staged"], stage["target"],
+                                   stage["states"], delete = stage["delete"])
+                
+                else:
+                    warnings.warn(
+                        f"Graphab exited with code {usage['exit_code']}. " +
+                        "Results in the scratch directory were discarded."
+                        )
+            
+            finally:
+                shutil.rmtree(stage["root"], ignore_errors = True)
+        
+        record = dict({"operation" : operation,
+                       "project" : getattr(self, "project_file", None),
+                       "command" : cmd}, **usage)
+        self.last_run = record
+        
+        if not hasattr(self, "runs"):
+            self.runs = []
+        
+        self.runs.append(record)
+        del self.runs[:-_max_runs]
+        
+        if current_settings.get("run_log") is not None:
+            _append_run_log(current_settings["run_log"], record)
+        
         if "Exception" in proc_err:
             warnings.warn(proc_err)
         
         return proc_out, proc_err
     
+    def _stage_call(self, scratch, kwargs):
+        '''
+        Stage the project directory of a Graphab call to scratch and replace
+        the project paths in the call arguments by paths to the staged copy.
+        '''
+        kwargs = dict(kwargs)
+        
+        if "create" in kwargs.keys():
+            settings = list(kwargs["create"])
+            directory = [s[4:] for s in settings if s.startswith("dir=")][0]
+            target = os.path.abspath(os.path.join(directory, settings[0]))
+            os.makedirs(scratch, exist_ok = True)
+            root = tempfile.mkdtemp(prefix = "g4p-stage-", dir = scratch)
+            kwargs["create"] = [f"dir={root}" if s.startswith("dir=") else s
+                                for s in settings]
+            
+            return {"root" : root,
+                    "staged" : os.path.join(root, settings[0]),
+                    "target" : target, "states" : {}, "delete" : False,
+                    "kwargs" : kwargs}
+        
+        if "project" not in kwargs.keys():
+            return None
+        
+        target = os.path.dirname(os.path.abspath(kwargs["project"]))
+        
+        with span("stage to scratch", directory = target):
+            staged, states = _stage(target, scratch)
+        
+        def restage(value):
+            if isinstance(value, list):
+                return [restage(v) for v in value]
+            
+            if isinstance(value, str) and target in value:
+                return value.replace(target, staged)
+            
+            return value
+        
+        project = os.path.join(staged, os.path.basename(kwargs["project"]))
+        kwargs = {key : project if key == "project" else restage(val)
+                  for key, val in kwargs.items()}
+        
+        return {"root" : os.path.dirname(staged), "staged" : staged,
+                "target" : target, "states" : states, "delete" : True,
+                "kwargs" : kwargs}
+    
     def create_project(self,
                        name,
                        patches,
@@ -828,6 +1777,8 @@ class Project():
                        connexity = 8,
                        directory = None,
                        overwrite = False,
+                       crop = False,
+                       crop_buffer = 0,
                        **ga_settings
                        ):
         '''
@@ -859,6 +1810,18 @@ class Project():
         overwrite : bool, optional
             Overwrite Graphab project if a project already exists at the
             given location.
+        crop : bool, optional
+            Crop the landscape raster to the extent of the habitat cells
+            before it is passed to Graphab. This reduces memory usage and
+            runtime for landscapes where habitat covers only a small part of
+            the raster extent. The cropped raster keeps the georeference of
+            the input and is stored in the project directory.
+            The default is False.
+        crop_buffer : numeric, optional
+            Buffer in map units kept around the habitat cells when cropping.
+            Should cover the distance links can reach. Use
+            graphab4py.raster.link_search_buffer() to derive it from a
+            linkset threshold. The default is 0.
         
         :param kwargs:
             Dictionary containing Graphab settings.
@@ -881,6 +1844,7 @@ class Project():
             .replace("\\", "/")
         self.project_file = os.path.join(directory, name, name + ".xml")
         self.linksets = None
+        self.linkset_info = {}
         self.graphs = None
         self.pointsets = None
         
@@ -909,6 +1873,25 @@ class Project():
                 
                 return
         
+        if crop:
+            # Graphab creates the project directory later, but the cropped
+            # landscape belongs to the project
+            prj_dir = os.path.join(self.directory, name)
+            os.makedirs(prj_dir, exist_ok = True)
+            self.crop = crop_to_habitat(
+                patches, habitat, os.path.join(prj_dir, name + "-crop.tif"),
+                buffer = crop_buffer
+                )
+            
+            print("Landscape cropped to window {0}.".format(
+                self.crop["window"]
+                ))
+            
+            patches = self.crop["file"]
+        
+        else:
+            self.crop = None
+        
         project_settings = [name,
                             patches,
                             f"habitat={habitat}"
@@ -932,7 +1915,7 @@ class Project():
         project_settings += [f"dir={directory}"]
         
         proc_out, proc_err = self._base_call(
-            **ga_settings, create = project_settings
+            **ga_settings, operation = "create", create = project_settings
             )
         
         out = {"process_output" : proc_out,
@@ -956,6 +1939,139 @@ class Project():
         
         return
     
+    def validate_patches(self, block_size = None):
+        '''
+        Extract patches from the landscape raster of the project using
+        graphab4py.labeling.label_patches() and compare them to the patches
+        created by Graphab.
+        
+        Parameters
+        ----------
+        block_size : int, optional
+            Edge length of the blocks read at once (in cells).
+            The default is None.
+        
+        Returns
+        -------
+        report : dict
+            Comparison of the native and the Graphab patch rasters (see
+            graphab4py.labeling.compare_patches()).
+
+        '''
+        prj_dir = os.path.dirname(self.project_file)
+        landscape = os.path.join(prj_dir, "source.tif")
+        
+        if not os.path.isfile(landscape):
+            if getattr(self, "crop", None) is not None:
+                landscape = self.crop["file"]
+            
+            elif isinstance(self.patches, str):
+                landscape = self.patches
+            
+            else:
+                raise FileNotFoundError(
+                    f"Landscape raster not found in {prj_dir}."
+                    )
+        
+        table, native = label_patches(
+            landscape, self.habitat, nomerge = self.nomerge,
+            nodata = self.nodata, minarea = self.minarea,
+            maxsize = self.maxsize, connexity = self.connexity,
+            out_file = os.path.join(prj_dir, "patches-native.tif"),
+            block_size = block_size
+            )
+        
+        report = compare_patches(
+            native, os.path.join(prj_dir, "patches.tif"),
+            block_size = block_size
+            )
+        
+        return report
+    
+    def patch_zonal_stats(self, value_raster, stats = ["mean"], n_jobs = None,
+                          block_size = None):
+        '''
+        Compute statistics of a value raster (e.g., habitat quality) within
+        each patch of the project.
+        
+        Parameters
+        ----------
+        value_raster : str
+            Raster of values. Must be on the grid of the landscape raster the
+            project was created from.
+        stats : list, optional
+            Statistics to compute. Any of "count", "sum", "mean", "min",
+            "max", and "std". The default is ["mean"].
+        n_jobs : int, optional
+            Number of threads. The default is None (number of CPUs).
+        block_size : int, optional
+            Edge length of the blocks read at once (in cells).
+            The default is None.
+        
+        Returns
+        -------
+        table : pandas.DataFrame
+            Statistics for each patch, indexed by patch ID ("Id"). A column
+            can be used as patch capacity with set_capacity().
+
+        '''
+        prj_dir = os.path.dirname(self.project_file)
+        patch_raster = os.path.join(prj_dir, "patches.tif")
+        
+        if not os.path.isfile(patch_raster):
+            raise FileNotFoundError(
+                f"Patch raster {patch_raster} not found. Use create_project " +
+                "to create a project first."
+                )
+        
+        if getattr(self, "crop", None) is not None:
+            value_raster = crop_like(
+                value_raster, self.crop,
+                os.path.join(prj_dir, os.path.splitext(
+                    os.path.basename(value_raster)
+                    )[0] + "-crop.tif")
+                )
+        
+        table = zonal_stats(
+            patch_raster, value_raster, stats = stats, n_jobs = n_jobs,
+            block_size = block_size
+            )
+        
+        return table
+    
+    def set_capacity(self, table, column, **ga_settings):
+        '''
+        Set patch capacities from a table.
+        
+        Parameters
+        ----------
+        table : pandas.DataFrame
+            Table indexed by patch ID, e.g., the output of
+            patch_zonal_stats().
+        column : str
+            Column containing the capacity values.
+        
+        :param kwargs:
+            Additional Graphab settings.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        capa_file = os.path.join(
+            os.path.dirname(self.project_file), f"capacity-{column}.csv"
+            )
+        capa = table[[column]].rename_axis("Id").reset_index()
+        capa.to_csv(capa_file, index = False)
+        
+        proc_out, proc_err = self._base_call(
+            **ga_settings, project = self.project_file,
+            capa = [f"file={capa_file}", "id=Id", f"capa={column}"]
+            )
+        
+        return
+    
     def load_project(self, project_file, **ga_settings):
         '''
         Load an existing Graphab or Graphab4py project.
@@ -1114,13 +2230,256 @@ class Project():
                 " Have you created a project already?"
                 )
         
-        with open(file, "wb") as f:
+        with span("pickle project", file = file), open(file, "wb") as f:
             pk.dump(self, f)
         
-        print(f"Output saved at {file}.")
+        print(f"Output saved at {file}.")
+    
+    def clone(self, new_name, directory = None, method = "auto"):
+        '''
+        Create a copy of the project, e.g., as a starting point for a
+        landscape change scenario. Unchanged files are shared with this
+        project instead of being copied, so that clones are fast and take
+        little disk space. Only the project file is rewritten. Paths to files
+        in the project directory (e.g., cropped cost rasters) are changed to
+        the files of the clone.
+        
+        Parameters
+        ----------
+        new_name : str
+            Name of the new project.
+        directory : str, optional
+            Directory in which the project folder is created. The default is
+            None, in which case the clone is placed next to this project.
+        method : str, optional
+            How files are shared. "auto" uses copy-on-write copies (reflinks)
+            where the file system supports them and otherwise hard links for
+            rasters and cost surfaces, which are never modified in place.
+            "hardlink" skips reflinks and "copy" copies all files. The
+            default is "auto".
+        
+        Returns
+        -------
+        prj : graphab4py.Project
+            The cloned project.
+
+        '''
+        if method not in ["auto", "hardlink", "copy"]:
+            raise ValueError(
+                "Argument 'method' must be 'auto', 'hardlink' or 'copy'."
+                )
+        
+        if getattr(self, "project_file", None) is None:
+            raise Exception(
+                "No project to clone. Have you created a project already?"
+                )
+        
+        prj_dir = os.path.dirname(os.path.abspath(self.project_file))
+        directory = os.path.dirname(prj_dir) if directory is None else \
+            os.path.abspath(directory)
+        new_dir = os.path.join(directory, new_name)
+        
+        if os.path.exists(new_dir):
+            raise FileExistsError(f"Directory {new_dir} already exists.")
+        
+        with span("clone project", directory = new_dir):
+            xml = os.path.basename(self.project_file)
+            _clone_tree(prj_dir, new_dir, method = method)
+            os.remove(os.path.join(new_dir, xml))
+            
+            tree = ET.parse(self.project_file)
+            name = tree.getroot().find("name")
+            
+            if name is not None:
+                name.text = new_name
+            
+            for element in tree.getroot().iter():
+                if element.text is not None:
+                    element.text = _rebase_paths(element.text, prj_dir,
+                                                 new_dir)
+            
+            tree.write(os.path.join(new_dir, new_name + ".xml"),
+                       encoding = "utf-8")
+        
+        prj = Project(**self.settings)
+        prj.__dict__.update({
+            key : _rebase_paths(copy.deepcopy(val), prj_dir, new_dir)
+            for key, val in self.__dict__.items()
+            if key not in ["settings", "runs", "last_run"]
+            })
+        prj.name = new_name
+        prj.project_file = os.path.join(new_dir, new_name + ".xml")
+        
+        if getattr(self, "directory", None) is not None:
+            prj.directory = new_dir if os.path.abspath(self.directory) == \
+                prj_dir else directory
+        
+        return prj
+    
+    def _crop_cost(self, cost_raster):
+        '''
+        Crop a cost raster to the window of a cropped project. The cropped
+        raster is written once per source raster and crop window and reused
+        by all linksets while it is newer than the source.
+        '''
+        name = os.path.splitext(os.path.basename(cost_raster))[0]
+        key = hashlib.sha1(repr(
+            [os.path.abspath(cost_raster), list(self.crop["window"])]
+            ).encode()).hexdigest()
+        dst_file = os.path.join(os.path.dirname(self.project_file),
+                                f"{name}-{key[:10]}-cost-crop.tif")
+        
+        if os.path.isfile(dst_file) and \
+                os.path.getmtime(dst_file) >= os.path.getmtime(cost_raster):
+            return dst_file
+        
+        return crop_like(cost_raster, self.crop, dst_file)
+    
+    def _surface_store(self, cost_raster, source = None):
+        '''
+        Store of accumulated cost surfaces for a cost raster, kept in the
+        surfaces subdirectory of the project. The directory name includes a
+        hash of the absolute path of the source raster (the raster before
+        cropping, see _crop_cost), so cost rasters with the same file name
+        do not share a store.
+        '''
+        source = cost_raster if source is None else source
+        name = os.path.splitext(os.path.basename(source))[0]
+        key = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()
+        
+        return CostSurfaceStore(
+            os.path.join(os.path.dirname(self.project_file), "surfaces",
+                         f"{name}-{key[:10]}"),
+            cost_raster
+            )
+    
+    def _linkset_params(self):
+        '''
+        Parameters of the linksets of the project. Parameters are read from
+        the project XML and completed by those recorded by create_linkset.
+        '''
+        params = {}
+        
+        try:
+            costlinks = ET.parse(self.project_file).getroot().find("costLinks")
+        
+        except (OSError, ET.ParseError):
+            costlinks = None
+        
+        if costlinks is not None:
+            for entry in costlinks.findall("entry"):
+                ls = entry.find("Linkset")
+                
+                if ls is None or ls.findtext("name") is None:
+                    continue
+                
+                dist_max = ls.findtext("distMax")
+                params[ls.findtext("name")] = {
+                    "disttype" : {"1" : "euclid", "2" : "cost"}.get(
+                        ls.findtext("type_dist")
+                        ),
+                    "threshold" : float(dist_max) if dist_max else None,
+                    "complete" : ls.findtext("type") != "2",
+                    "cost_raster" : ls.findtext("extCostFile")
+                    }
+        
+        for name, info in (getattr(self, "linkset_info", None) or {}).items():
+            params[name] = dict(params.get(name, {}), **info)
+        
+        return params
+    
+    def _reusable_linkset(self, disttype, threshold, complete, cost_raster):
+        '''
+        Find the existing linkset with the smallest threshold above the given
+        one that was created with the same distance type, cost raster and
+        topology.
+        '''
+        def same_file(a, b):
+            if a is None or b is None:
+                return a is None and b is None
+            
+            return os.path.abspath(a) == os.path.abspath(b)
+        
+        prj_dir = os.path.dirname(self.project_file)
+        best, best_threshold = None, np.inf
+        
+        for name, info in self._linkset_params().items():
+            source_threshold = info.get("threshold")
+            source_threshold = np.inf if not source_threshold else \
+                float(source_threshold)
+            
+            if info.get("disttype") != disttype or \
+                    info.get("complete", True) != complete or \
+                    not same_file(info.get("cost_source",
+                                           info.get("cost_raster")),
+                                  cost_raster) or \
+                    source_threshold < float(threshold) or \
+                    not os.path.isfile(
+                        os.path.join(prj_dir, name + "-links.csv")
+                        ):
+                continue
+            
+            if source_threshold < best_threshold:
+                best, best_threshold = name, source_threshold
+        
+        return best
+    
+    def _filter_linkset(self, source, linkname, threshold):
+        '''
+        Derive a linkset with a lower threshold from an existing linkset by
+        filtering its links (CSV table, shapefile and project XML entry).
+        Returns False if the shapefile cannot be filtered (geopandas missing).
+        '''
+        import pandas as pd
+        
+        prj_dir = os.path.dirname(self.project_file)
+        shapefiles = [suffix for suffix in [".shp", "-links.shp"] if
+                      os.path.isfile(os.path.join(prj_dir, source + suffix))]
+        
+        if len(shapefiles) > 0:
+            try:
+                import geopandas as gpd
+            
+            except ImportError:
+                return False
+        
+        links = pd.read_csv(os.path.join(prj_dir, source + "-links.csv"))
+        links[links["Dist"] <= float(threshold)].to_csv(
+            os.path.join(prj_dir, linkname + "-links.csv"), index = False
+            )
+        
+        for suffix in shapefiles:
+            shp = gpd.read_file(os.path.join(prj_dir, source + suffix))
+            shp[shp["Dist"] <= float(threshold)].to_file(
+                os.path.join(prj_dir, linkname + suffix)
+                )
+        
+        tree = ET.parse(self.project_file)
+        costlinks = tree.getroot().find("costLinks")
+        
+        for entry in [] if costlinks is None else costlinks.findall("entry"):
+            if entry.findtext("Linkset/name") != source:
+                continue
+            
+            clone = copy.deepcopy(entry)
+            
+            if clone.find("string") is not None:
+                clone.find("string").text = linkname
+            
+            clone.find("Linkset/name").text = linkname
+            
+            if clone.find("Linkset/distMax") is not None:
+                clone.find("Linkset/distMax").text = str(float(threshold))
+            
+            costlinks.append(clone)
+            tree.write(self.project_file, encoding = "utf-8")
+            break
+        
+        return True
     
     def create_linkset(self, disttype, linkname, threshold, complete = True,
-                       cost_raster = None, **ga_settings):
+                       cost_raster = None, reuse = False, native = False,
+                       **ga_settings):
         '''
         Create a linkset.
         
@@ -1139,6 +2498,20 @@ class Project():
             Whether to create a complete linkset. The default is True.
         cost_raster : str, optional
             Path to an external cost raster file (.tif). The default is None.
+        reuse : bool, optional
+            If the project contains a linkset with the same distance type,
+            cost raster and topology and a threshold at least as large,
+            derive the new linkset by filtering its links instead of calling
+            Graphab. The default is False.
+        native : bool, optional
+            Compute the links with graphab4py.euclid or graphab4py.costdist
+            instead of Graphab (complete cost linksets, complete or planar
+            euclidean linksets). For cost linksets, accumulated cost surfaces
+            are stored in the project, so that a linkset with a higher
+            threshold only computes the missing distance band. Native
+            linksets are written to <linkname>-links.csv and can be used by
+            graphab4py (e.g., corridors()), but are not registered in the
+            Graphab project. The default is False.
         
         :param kwargs:
             Additional Graphab settings.
@@ -1187,11 +2560,82 @@ class Project():
                     "'threshold'. Must be numeric."
                     )
         
+        cost_source = cost_raster
+        
         if cost_raster is not None:
+            if getattr(self, "crop", None) is not None:
+                cost_raster = self._crop_cost(cost_raster)
+            
             link_settings += [f"extcost={cost_raster}"]
         
+        if getattr(self, "linkset_info", None) is None:
+            self.linkset_info = {}
+        
+        info = {"disttype" : disttype,
+                "threshold" : threshold,
+                "complete" : complete,
+                "cost_raster" : cost_raster,
+                "cost_source" : cost_source,
+                "native" : native}
+        
+        if reuse and threshold:
+            source = self._reusable_linkset(
+                disttype, threshold, complete, cost_source
+                )
+            
+            if source is not None and \
+                    self._filter_linkset(source, linkname, threshold):
+                info["native"] = self._linkset_params()[source].get(
+                    "native", False
+                    )
+                self.linkset_info[linkname] = info
+                
+                if not info["native"]:
+                    if self.linksets is None:
+                        self.linksets = [linkname]
+                    
+                    else:
+                        self.linksets.append(linkname)
+                
+                print(f"Linkset derived from linkset '{source}'.")
+                
+                return
+        
+        if native:
+            prj_dir = os.path.dirname(self.project_file)
+            patch_raster = os.path.join(prj_dir, "patches.tif")
+            
+            if disttype == "euclid":
+                links = euclid_links(
+                    patch_raster, threshold = threshold if threshold else None,
+                    planar = not complete,
+                    n_jobs = self._call_settings(**ga_settings)["cores"]
+                    )
+            
+            elif not complete:
+                raise ValueError(
+                    "Native cost linksets must be complete (complete = True)."
+                    )
+            
+            elif not threshold:
+                raise ValueError("Native cost linksets require a threshold.")
+            
+            else:
+                links = self._surface_store(cost_raster, cost_source).links(
+                    patch_raster, threshold,
+                    n_jobs = self._call_settings(**ga_settings)["cores"]
+                    )
+            
+            links.to_csv(os.path.join(prj_dir, linkname + "-links.csv"),
+                         index = False)
+            self.linkset_info[linkname] = info
+            print("Linkset created.")
+            
+            return
+        
         proc_out, proc_err = self._base_call(
-            **ga_settings, project = self.project_file, linkset = link_settings
+            **ga_settings, operation = "linkset", project = self.project_file,
+            linkset = link_settings
             )
         
         if self.linksets is None:
@@ -1200,6 +2644,8 @@ class Project():
         else:
             self.linksets.append(linkname)
         
+        self.linkset_info[linkname] = info
+        
         if "canceled" in proc_out:
             raise Exception(
                 "Failed to create linkset. Check resistance surface." +
@@ -1211,6 +2657,155 @@ class Project():
         
         return
     
+    def corridors(self, linkset, links = None, width = 0, value = "count",
+                  out_file = None, n_jobs = None, block_size = None):
+        '''
+        Map least-cost corridors of (selected) links of a cost linkset
+        natively, without calling Graphab. Accumulated cost surfaces of the
+        end patches are computed once and stored in the project directory
+        (surfaces/<cost raster name>), so that further calls and native
+        linksets on the same cost raster reuse them.
+        
+        Parameters
+        ----------
+        linkset : str
+            Name of a cost linkset created with create_linkset().
+        links : pandas.DataFrame or list, optional
+            Links to map, either as a table with the columns "ID1" and "ID2"
+            or as a list of (ID1, ID2) tuples. The default is None (all links
+            within the linkset threshold).
+        width : numeric, optional
+            Maximum additional cost of a corridor path compared to the
+            least-cost path of the link. The default is 0.
+        value : str {"count", "cost"}, optional
+            Write the number of corridors crossing each cell ("count") or the
+            cost of the cheapest corridor path through each cell ("cost").
+            The default is "count".
+        out_file : str, optional
+            Output raster. The default is None, in which case the raster is
+            written to <linkset>-corridors.tif in the project directory.
+        n_jobs : int, optional
+            Number of parallel workers. The default is None (number of CPUs).
+        block_size : int, optional
+            Edge length of the blocks processed at once (in cells).
+            The default is None.
+        
+        Returns
+        -------
+        out_file : str
+            Output raster file.
+
+        '''
+        import pandas as pd
+        
+        info = self._linkset_params().get(linkset)
+        
+        if info is None:
+            raise ValueError(
+                f"Parameters of linkset '{linkset}' unknown. Use " +
+                "create_linkset to create the linkset."
+                )
+        
+        if info["disttype"] != "cost":
+            raise ValueError("Corridors require a linkset of disttype 'cost'.")
+        
+        if info.get("cost_raster") is None:
+            raise ValueError(
+                f"Linkset '{linkset}' has no external cost raster."
+                )
+        
+        prj_dir = os.path.dirname(self.project_file)
+        patch_raster = os.path.join(prj_dir, "patches.tif")
+        threshold = info["threshold"]
+        
+        if not threshold:
+            threshold = pd.read_csv(
+                os.path.join(prj_dir, linkset + "-links.csv")
+                )["Dist"].max()
+        
+        store = self._surface_store(info["cost_raster"],
+                                    info.get("cost_source"))
+        
+        if links is None:
+            table = store.links(patch_raster, threshold, n_jobs = n_jobs,
+                                block_size = block_size)
+        
+        else:
+            if not isinstance(links, pd.DataFrame):
+                links = pd.DataFrame(list(links), columns = ["ID1", "ID2"])
+            
+            pairs = pd.DataFrame({
+                "ID1" : np.minimum(links["ID1"], links["ID2"]).astype("int64"),
+                "ID2" : np.maximum(links["ID1"], links["ID2"]).astype("int64")
+                })
+            store.build(
+                patch_raster, threshold, n_jobs = n_jobs,
+                ids = np.unique(pairs.values), block_size = block_size
+                )
+            native = store.links(patch_raster, threshold,
+                                 ids = np.unique(pairs["ID1"]),
+                                 block_size = block_size)
+            table = pairs.merge(native, on = ["ID1", "ID2"], how = "left")
+            missing = table[table["Dist"].isna()]
+            
+            if len(missing) > 0:
+                raise ValueError(
+                    "Links not found within the linkset threshold: " +
+                    str(list(zip(missing["ID1"], missing["ID2"])))
+                    )
+        
+        if out_file is None:
+            out_file = os.path.join(prj_dir, linkset + "-corridors.tif")
+        
+        corridor_raster(
+            store, patch_raster, table, width, out_file, value = value,
+            n_jobs = n_jobs, block_size = block_size
+            )
+        
+        return out_file
+    
+    def link_resistance(self, linkset, graph = False, n_jobs = None):
+        '''
+        Compute effective resistances (circuit theory) between the linked
+        patches of a linkset.
+        
+        Parameters
+        ----------
+        linkset : str
+            Name of the linkset.
+        graph : bool, optional
+            Use the patch graph with link distances as resistances instead of
+            the cost raster of the linkset. The default is False.
+        n_jobs : int, optional
+            Number of threads. The default is None (number of CPUs).
+        
+        Returns
+        -------
+        links : pandas.DataFrame
+            Link table of the linkset with an additional column "Resistance".
+
+        '''
+        import pandas as pd
+        
+        prj_dir = os.path.dirname(self.project_file)
+        links = pd.read_csv(os.path.join(prj_dir, linkset + "-links.csv"))
+        
+        if graph:
+            return graph_resistance(links, n_jobs = n_jobs)
+        
+        info = self._linkset_params().get(linkset, {})
+        
+        if info.get("disttype") != "cost" or info.get("cost_raster") is None:
+            raise ValueError(
+                f"Linkset '{linkset}' has no cost raster. Use graph = True " +
+                "to compute resistances on the patch graph."
+                )
+        
+        return raster_resistance(
+            os.path.join(prj_dir, "patches.tif"), info["cost_raster"], links,
+            n_jobs = n_jobs
+            )
+    
     def create_graph(self, graphname, linkset = None, nointra = True,
                      threshold = None, **ga_settings):
         '''
@@ -1270,8 +2865,8 @@ class Project():
                     )
         
         proc_out, proc_err = self._base_call(
-            **ga_settings, project = self.project_file, uselinkset = linkset,
-            graph = graph_settings
+            **ga_settings, operation = "graph", project = self.project_file,
+            uselinkset = linkset, graph = graph_settings
             )
         
         if self.graphs is None:
@@ -1338,19 +2933,184 @@ class Project():
         else:
             raise Exception("Linkset {} not found.".format(f_links))
         
-        self.links = gpd.read_file(f_links)
+        with span("read shapefile", file = f_links):
+            self.links = gpd.read_file(f_links)
         
         f_patches = os.path.join(self.directory, self.name, "patches.shp")
-        self.patches = gpd.read_file(f_patches)
         
-        self.nodes = gpd.GeoDataFrame(
-            data = self.patches.drop(columns = "geometry"),
-            geometry = self.patches.geometry.centroid,
-            crs = self.patches.crs
-            )
+        with span("read shapefile", file = f_patches):
+            self.patches = gpd.read_file(f_patches)
+        
+        with span("patch centroids"):
+            self.nodes = gpd.GeoDataFrame(
+                data = self.patches.drop(columns = "geometry"),
+                geometry = self.patches.geometry.centroid,
+                crs = self.patches.crs
+                )
         
         return
     
+    def get_graph(self, linkset = None, threshold = None):
+        '''
+        Create a graph of the patches and links of the project, which can be
+        used to calculate metrics and evaluate scenarios in Python.
+        
+        Parameters
+        ----------
+        linkset : str, optional
+            Name of the linkset. The default is None (first linkset).
+        threshold : numeric, optional
+            Omit links with a distance above threshold. The default is None.
+        
+        Returns
+        -------
+        graph : graphab4py.graph.Graph
+            Graph of the project. The landscape area is the extent of the
+            patch raster.
+
+        '''
+        import rasterio
+        import pandas as pd
+        
+        if self.linksets is None:
+            raise Exception(
+                "No linksets were created yet. Use create_linkset to " +
+                "create a linkset first."
+                )
+        
+        linkset = self.linksets[0] if linkset is None else linkset
+        prj_dir = os.path.dirname(self.project_file)
+        patches = read_table(
+            os.path.join(prj_dir, "patches.csv"), index = "Id"
+            ).reset_index()
+        links = pd.read_csv(os.path.join(prj_dir, linkset + "-links.csv"))
+        
+        with rasterio.open(os.path.join(prj_dir, "patches.tif")) as src:
+            area = src.width * src.height * abs(src.res[0] * src.res[1])
+        
+        return Graph(patches, links, threshold = threshold, area = area)
+    
+    def scenario(self, add = None, remove = None, capacity = None,
+                 links = None, linkset = None, graph = None,
+                 block_size = None):
+        '''
+        Create a graph of a landscape change scenario (restored or lost
+        patches, changed capacities) without creating a new Graphab project.
+        Only links of added patches are computed and metrics are only
+        recomputed for the graph components the scenario changes, so that
+        many scenarios can be screened before confirming the best ones with
+        Graphab.
+        
+        Parameters
+        ----------
+        add : str or pandas.DataFrame, optional
+            New patches. Either a raster of new patch IDs on the grid of the
+            project (their areas and euclidean links are computed) or a table
+            with the columns "Id", "Area" and, optionally, "Capacity". The
+            default is None.
+        remove : list, optional
+            IDs of patches that are lost. The default is None.
+        capacity : dict, optional
+            New capacities by patch ID. The default is None.
+        links : pandas.DataFrame, optional
+            Links of the added patches ("ID1", "ID2", "Dist"). Required for
+            added patches given as a table and for cost distance linksets.
+            The default is None.
+        linkset : str, optional
+            Name of the linkset. The default is None (first linkset).
+        graph : graphab4py.graph.Graph, optional
+            Graph the scenario is based on. Pass the same graph to all
+            scenarios to share cached results. The default is None, in which
+            case the graph of the project is read (see get_graph).
+        block_size : int, optional
+            Edge length of the raster blocks read at once (in cells). The
+            default is None.
+        
+        Returns
+        -------
+        graph : graphab4py.graph.Graph
+            Scenario graph.
+
+        '''
+        import pandas as pd
+        
+        linkset = self.linksets[0] if linkset is None and self.linksets \
+            is not None else linkset
+        graph = self.get_graph(linkset) if graph is None else graph
+        
+        if isinstance(add, str):
+            import rasterio
+            
+            with rasterio.open(add) as src:
+                data = src.read(1)
+                cell_area = abs(src.res[0] * src.res[1])
+            
+            new_ids, counts = np.unique(data[data > 0], return_counts = True)
+            table = pd.DataFrame({"Id" : new_ids.astype("int64"),
+                                  "Area" : counts * cell_area})
+            
+            if links is None:
+                params = self._linkset_params().get(linkset, {})
+                
+                if params.get("disttype") not in [None, "euclid"] or \
+                        params.get("threshold") is None:
+                    raise ValueError(
+                        f"Links of new patches cannot be computed for " +
+                        f"linkset {linkset}. Provide argument 'links'."
+                        )
+                
+                links = added_patch_links(
+                    os.path.join(os.path.dirname(self.project_file),
+                                 "patches.tif"),
+                    add, params["threshold"], block_size = block_size
+                    )
+                
+                if remove is not None:
+                    links = links[~(links["ID1"].isin(remove) |
+                                    links["ID2"].isin(remove))]
+            
+            add = table
+        
+        elif add is not None and links is None:
+            raise ValueError("Argument 'links' is required for added patches.")
+        
+        return graph.scenario(add = add, links = links, remove = remove,
+                              capacity = capacity)
+    
+    def prioritize(self, k, metric = "PC", linkset = None, graph = None,
+                   **kwargs):
+        '''
+        Select the k patches or links with the largest combined effect on a
+        global metric by greedy (CELF) maximisation, instead of ranking them
+        independently as in a delta analysis.
+        
+        Parameters
+        ----------
+        k : int
+            Number of items to select.
+        metric : str {"PC", "EC", "IIC"}, optional
+            Global metric. The default is "PC".
+        linkset : str, optional
+            Name of the linkset. The default is None (first linkset).
+        graph : graphab4py.graph.Graph, optional
+            Graph to start from, e.g., a scenario graph. The default is None,
+            in which case the graph of the project is read (see get_graph).
+        
+        :param kwargs:
+            Arguments passed to greedy_selection (e.g., d, p, mode,
+            candidates, links, lazy, n_jobs).
+        
+        Returns
+        -------
+        selection : pandas.DataFrame
+            Selected items in order with their marginal gains and the metric
+            trajectory.
+
+        '''
+        graph = self.get_graph(linkset) if graph is None else graph
+        
+        return greedy_selection(graph, k, metric = metric, **kwargs)
+    
     def get_distances(self, dist_type = "cost", linkset = None):
         '''
         Extract distance matrix from graph.
@@ -1384,9 +3144,10 @@ class Project():
         
         distance_type = "Dist" if dist_type == "euclid" else "DistM"
         
-        dist_mat = self.links.drop(columns = "geometry").pivot(
-            index = "ID1", columns = "ID2", values = distance_type
-            )
+        with span("pivot distance matrix"):
+            dist_mat = self.links.drop(columns = "geometry").pivot(
+                index = "ID1", columns = "ID2", values = distance_type
+                )
         
         self.distances = dist_mat
         
@@ -1417,7 +3178,13 @@ class Project():
         Returns
         -------
         out : dict
-            A dictionary containing process output and project name.
+            A dictionary containing the process output ("process_output"),
+            the parsed metric values ("metric_values", metric names as
+            printed by Graphab mapped to a float or a list of floats), and
+            the last of these values ("metric_value") and the record of the
+            Graphab call ("run", see _base_call). For local metrics,
+            "metric_table" holds the columns Graphab added to the patch or
+            link table as a DataFrame indexed by ID.
 
         '''
         if self.linksets is None:
@@ -1452,11 +3219,22 @@ class Project():
             
             raise ValueError(mssg)
         
+        prj_dir = os.path.dirname(self.project_file)
+        tables = [os.path.join(prj_dir, "patches.csv"),
+                  os.path.join(prj_dir, f"{linkset}-links.csv")]
+        tables = [file for file in tables if os.path.isfile(file)]
+        columns = {}
+        
+        if mtype == "local":
+            # Cache the tables, so that only the added columns are read later
+            for file in tables:
+                columns[file] = list(read_table(file).columns)
+        
         metric_settings = [metric]
         ga_settings = {}
         
         for key, val in metric_args.items():
-            if key in ["java", "memory", "cores", "graphab"]:
+            if key in _setting_keys:
                 ga_settings.update({key : val})
             
             else:
@@ -1491,19 +3269,40 @@ class Project():
         # END
         
         proc_out, proc_err = self._base_call(
-            **ga_settings, project = self.project_file, uselinkset = linkset,
-            usegraph = graph, **metric
+            **ga_settings, operation = "metric", project = self.project_file,
+            uselinkset = linkset, usegraph = graph, **metric
             )
         
-        try:
-            metric_value = float(
-                proc_out.split(" ")[-1].strip().strip("}").strip("]")
-                )
+        values = parse_metric_output(proc_out)
+        
+        if mtype == "local":
+            out = {"process_output" : proc_out,
+                   "metric_values" : values,
+                   "metric_value" : None,
+                   "run" : self.last_run}
+            
+            for file in tables:
+                table = read_table(file)
+                added = [c for c in table.columns if c not in columns[file]]
+                
+                if len(added) > 0:
+                    out["metric_table"] = table[added]
+            
+            return out
+        
+        if len(values) > 0:
+            value = list(values.values())[-1]
+            
+            # Graphab prints some global metrics in brackets, e.g., [3.1E-4]
+            if isinstance(value, list) and len(value) == 1:
+                value = value[0]
             
             out = {"process_output" : proc_out,
-                   "metric_value" : metric_value}
+                   "metric_values" : values,
+                   "metric_value" : value,
+                   "run" : self.last_run}
         
-        except:
+        else:
             if "Exception" in proc_out:
                 out = proc_err
                 
@@ -1519,7 +3318,7 @@ class Project():
     
     def delta_by_item(self, metric, linkset = None, graph = None,
                     select = None, select_from_file = None, obj = "patch",
-                    mpi = False, **metric_args):
+                    mpi = False, shards = 1, **metric_args):
         '''
         Calculate a global metric in delta mode on patches or links depending
         on obj parameter for the selected graph.
@@ -1536,7 +3335,9 @@ class Project():
             Metric name.
         select : list, optional
             Restrict the calculation to items (patches or links) listed by
-            identifier. The default is None.
+            identifier. Selections of more than graphab4py.project._max_select
+            items are passed to Graphab as a temporary file. The default is
+            None.
         select_from_file : str, optional
             Restrict the calculations on items listed in a .txt file. The file
             must contain one identifier per line. The default is None.
@@ -1544,6 +3345,14 @@ class Project():
             Type of objects to remove. The default is "patch".
         mpi : bool, optional
             Run in MPI mode (on cluster).
+        shards : int, optional
+            Split the selection into the given number of shards, which are
+            run as parallel Graphab processes sharing the cores and memory
+            set for Graphab. Each shard runs on a clone of the project
+            directory which shares only immutable files (rasters) with it
+            (see Project.clone), and the delta output files of the shards
+            are merged into the project directory. Without a selection, all
+            patches are used (obj = "patch" only). The default is 1.
         
         :param kwargs:
             Metric paramneters;
@@ -1551,8 +3360,11 @@ class Project():
         
         Returns
         -------
-        out : dict
-            A dictionary containing process output and project name.
+        delta : pandas.DataFrame
+            Delta values read from the output files Graphab wrote during the
+            call, indexed by the ID of the removed item, or None if no output
+            was written. Unless sharded, the record of the Graphab call (see
+            _base_call) is stored in delta.attrs["run"].
 
         '''
         if self.linksets is None:
@@ -1591,26 +3403,324 @@ class Project():
         ga_settings = {}
         
         for key, val in metric_args.items():
-            if key in ["java", "memory", "cores", "graphab"]:
+            if key in _setting_keys:
                 ga_settings.update({key : val})
             
             else:
                 delta_settings += ["{0}={1}".format(key, val)]
         
+        delta_settings += [f"obj={obj}"]
+        prj_dir = os.path.dirname(self.project_file)
+        before = _file_states(_delta_files(prj_dir))
+        
+        if shards > 1:
+            self._delta_shards(
+                self._delta_selection(select, select_from_file, obj), shards,
+                delta_settings, linkset, graph, mpi, ga_settings
+                )
+            
+            return self._delta_results(before)
+        
+        spill = None
+        
         if select is not None:
-            delta_settings += ["sel=" + ",".join(select)]
+            select = [str(s) for s in select]
+            
+            if len(select) > _max_select:
+                spill = self._write_selection(select, prj_dir)
+                delta_settings += [f"fsel={spill}"]
+            
+            else:
+                delta_settings += ["sel=" + ",".join(select)]
         
         if select_from_file is not None:
             delta_settings += [f"fsel={select_from_file}"]
         
-        delta_settings += [f"obj={obj}"]
+        try:
+            proc_out, proc_err = self._base_call(
+                **ga_settings, project = self.project_file,
+                uselinkset = linkset, usegraph = graph, mpi = mpi,
+                operation = "delta", delta = delta_settings
+                )
         
-        proc_out, proc_err = self._base_call(
-            **ga_settings, project = self.project_file, uselinkset = linkset,
-            usegraph = graph, mpi = mpi, delta = delta_settings
+        finally:
+            if spill is not None:
+                os.remove(spill)
+        
+        delta = self._delta_results(before)
+        
+        if delta is not None:
+            delta.attrs["run"] = self.last_run
+        
+        return delta
+    
+    def _delta_results(self, before):
+        '''
+        Read the delta output files written since the snapshot "before" (see
+        _file_states) into one DataFrame.
+        '''
+        prj_dir = os.path.dirname(self.project_file)
+        files = _changed_files(before, _delta_files(prj_dir))
+        
+        if len(files) == 0:
+            return None
+        
+        tables = [read_delta(file) for file in files]
+        delta = tables[0]
+        
+        for table in tables[1:]:
+            delta = delta.join(
+                table[[c for c in table.columns if c not in delta.columns]],
+                how = "outer"
+                )
+        
+        return delta
+    
+    def _delta_selection(self, select = None, select_from_file = None,
+                         obj = "patch"):
+        '''
+        Items of a delta analysis as a list of strings. Without a selection,
+        all patches of the project are returned.
+        '''
+        if select is not None:
+            return [str(s) for s in select]
+        
+        if select_from_file is not None:
+            with open(select_from_file, "r") as f:
+                return [l.strip() for l in f if l.strip() != ""]
+        
+        if obj != "patch":
+            raise ValueError("Link deltas require a selection.")
+        
+        patches = os.path.join(os.path.dirname(self.project_file),
+                               "patches.csv")
+        
+        with open(patches, "r") as f:
+            return [row["Id"] for row in csv.DictReader(f)]
+    
+    def delta_by_chunks(self, metric, linkset = None, graph = None,
+                        select = None, select_from_file = None,
+                        obj = "patch", chunk_size = 500, run_dir = None,
+                        **metric_args):
+        '''
+        Resumable version of delta_by_item. The selection is processed in
+        chunks and the results of each chunk are appended to a results file
+        in a run directory, together with a manifest (manifest.json) that
+        records progress, throughput (items/s) and the estimated remaining
+        time. If the run is interrupted, calling the method again with the
+        same run directory skips all items with results, so at most one chunk
+        is lost. An incomplete last row left by an interrupted append is
+        removed before resuming.
+        
+        Parameters
+        ----------
+        metric : str
+            Metric name.
+        linkset : str, optional
+            Name of the linkset. The default is None.
+        graph : str, optional
+            Graph name. The default is None.
+        select : list, optional
+            Items (patches or links) to remove. The default is None (all
+            patches).
+        select_from_file : str, optional
+            File listing the items, one identifier per line. The default is
+            None.
+        obj : str {patch, link}, optional
+            Type of objects to remove. The default is "patch".
+        chunk_size : int, optional
+            Number of items per Graphab run. The default is 500.
+        run_dir : str, optional
+            Directory of the results file (results.txt) and the manifest.
+            The default is None, in which case runs/delta-<metric> in the
+            project directory is used.
+        
+        :param kwargs:
+            Metric parameters;
+            Additional Graphab settings.
+        
+        Returns
+        -------
+        results : pandas.DataFrame
+            Delta results of all items processed so far.
+
+        '''
+        prj_dir = os.path.dirname(self.project_file)
+        run_dir = os.path.join(prj_dir, "runs", f"delta-{metric}") if \
+            run_dir is None else run_dir
+        results_file = os.path.join(run_dir, "results.txt")
+        manifest_file = os.path.join(run_dir, "manifest.json")
+        items = self._delta_selection(select, select_from_file, obj)
+        analysis = {"metric" : metric,
+                    "linkset" : linkset,
+                    "graph" : graph,
+                    "obj" : obj,
+                    "arguments" : {k : str(v) for k, v in metric_args.items()
+                                   if k not in _setting_keys}}
+        os.makedirs(run_dir, exist_ok = True)
+        
+        if os.path.isfile(manifest_file):
+            with open(manifest_file, "r") as f:
+                manifest = json.load(f)
+            
+            if manifest["analysis"] != analysis:
+                raise ValueError(
+                    f"Run directory {run_dir} belongs to a different " +
+                    "analysis."
+                    )
+        
+        else:
+            manifest = {"analysis" : analysis, "chunks" : []}
+        
+        def read_results():
+            if not os.path.isfile(results_file):
+                return None
+            
+            return read_delta(results_file)
+        
+        if os.path.isfile(results_file):
+            _trim_partial_row(results_file)
+        
+        results = read_results()
+        done = set() if results is None else set(results.index.astype(str))
+        todo = [i for i in items if i not in done]
+        chunks = [todo[i:i + chunk_size] for i in
+                  range(0, len(todo), chunk_size)]
+        
+        for k, chunk in enumerate(chunks):
+            start = time.time()
+            table = self.delta_by_item(
+                metric, linkset = linkset, graph = graph, select = chunk,
+                obj = obj, **metric_args
+                )
+            seconds = time.time() - start
+            
+            if table is None:
+                raise Exception(
+                    "Graphab did not write delta results. Check the process " +
+                    "output."
+                    )
+            
+            table = table[table.index.astype(str).isin(chunk)]
+            
+            with open(results_file, "a", newline = "") as f:
+                table.to_csv(f, sep = "\t", header = f.tell() == 0)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            manifest["chunks"].append({"items" : len(chunk),
+                                       "seconds" : seconds,
+                                       "finished" : time.time()})
+            n_done = len(done) + sum(len(c) for c in chunks[:k + 1])
+            busy = sum(c["seconds"] for c in manifest["chunks"])
+            chunk_items = sum(c["items"] for c in manifest["chunks"])
+            throughput = chunk_items / busy if busy > 0 else None
+            manifest.update({
+                "total" : len(items),
+                "completed" : n_done,
+                "throughput" : throughput,
+                "eta" : None if throughput is None else
+                    (len(items) - n_done) / throughput
+                })
+            
+            tmp = manifest_file + ".tmp"
+            
+            with open(tmp, "w") as f:
+                json.dump(manifest, f, indent = 2)
+            
+            os.replace(tmp, manifest_file)
+            rate = "" if throughput is None else \
+                f", {throughput:.2f} items/s, ETA {manifest['eta']:.0f} s"
+            print(
+                f"Chunk {k + 1}/{len(chunks)} done " +
+                f"({n_done}/{len(items)} items{rate})."
+                )
+        
+        return read_results()
+    
+    def _write_selection(self, select, directory):
+        '''
+        Write a selection to a temporary file (one identifier per line).
+        '''
+        fd, file = tempfile.mkstemp(
+            prefix = "select-", suffix = ".txt", dir = directory
             )
         
-        return
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(select) + "\n")
+        
+        return file
+    
+    def _delta_shards(self, select, shards, delta_settings, linkset, graph,
+                      mpi, call_settings):
+        '''
+        Run a delta analysis as parallel Graphab processes, each on a share
+        of the selection and a clone of the project (see _clone_tree), and
+        merge their delta output files into the project directory.
+        '''
+        import pandas as pd
+        from concurrent.futures import ThreadPoolExecutor
+        
+        prj_dir = os.path.dirname(self.project_file)
+        shard_root = tempfile.mkdtemp(prefix = self.name + "-shards-",
+                                      dir = os.path.dirname(prj_dir))
+        chunks = [c for c in np.array_split(np.array(select, dtype = object),
+                                            shards) if len(c) > 0]
+        settings = self._call_settings(**call_settings)
+        cores = os.cpu_count() if settings.get("cores") is None else \
+            int(settings["cores"])
+        memory = settings.get("memory")
+        shard_settings = dict(call_settings,
+                              cores = max(1, cores // len(chunks)),
+                              memory = _split_memory(memory, len(chunks)))
+        
+        def run(k):
+            shard_dir = os.path.join(shard_root, f"shard-{k}")
+            _clone_tree(prj_dir, shard_dir)
+            
+            # Delta outputs of a previous run are not inputs of the shard and
+            # must not be merged back
+            for file in _delta_files(shard_dir):
+                os.remove(file)
+            
+            settings = list(delta_settings)
+            
+            if len(chunks[k]) > _max_select:
+                spill = self._write_selection(list(chunks[k]), shard_dir)
+                settings += [f"fsel={spill}"]
+            
+            else:
+                settings += ["sel=" + ",".join(chunks[k])]
+            
+            self._base_call(
+                **shard_settings, project = os.path.join(
+                    shard_dir, os.path.basename(self.project_file)
+                    ),
+                uselinkset = linkset, usegraph = graph, mpi = mpi,
+                operation = "delta", delta = settings
+                )
+            
+            return _delta_files(shard_dir)
+        
+        try:
+            with ThreadPoolExecutor(max_workers = len(chunks)) as executor:
+                outputs = list(executor.map(run, range(len(chunks))))
+            
+            tables = {}
+            
+            for files in outputs:
+                for file in files:
+                    tables.setdefault(os.path.basename(file), []).append(
+                        pd.read_csv(file, sep = "\t")
+                        )
+            
+            for name, parts in tables.items():
+                pd.concat(parts, ignore_index = True).drop_duplicates().to_csv(
+                    os.path.join(prj_dir, name), sep = "\t", index = False
+                    )
+        
+        finally:
+            shutil.rmtree(shard_root, ignore_errors = True)
     
     def enable_distance_conversion(self,
                             linkset = None,
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 09:12:44 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, math
+import numpy as np
+
+_block_size = 1024
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _habitat_codes(habitat):
+    '''
+    Convert the habitat argument of a Graphab project into a list of codes.
+    
+    Parameters
+    ----------
+    habitat : int, str or list
+        Habitat code, comma-separated string of codes or list of codes.
+    
+    Returns
+    -------
+    codes : list
+        List of integer habitat codes.
+
+    '''
+    if isinstance(habitat, str):
+        habitat = [h for h in habitat.split(",") if h.strip() != ""]
+    
+    elif not isinstance(habitat, (list, tuple, set, np.ndarray)):
+        habitat = [habitat]
+    
+    try:
+        codes = [int(h) for h in habitat]
+    
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid habitat code(s) {habitat}.")
+    
+    return codes
+
+def _windows(height, width, block_size = None):
+    '''
+    Split a raster of the given shape into a regular grid of windows.
+    
+    Parameters
+    ----------
+    height : int
+        Number of raster rows.
+    width : int
+        Number of raster columns.
+    block_size : int, optional
+        Edge length of the windows in cells. The default is None, in which case
+        1024 cells are used.
+    
+    Returns
+    -------
+    windows : generator
+        Yields rasterio.windows.Window objects.
+
+    '''
+    from rasterio.windows import Window
+    
+    block_size = _block_size if block_size is None else int(block_size)
+    
+    for row_off in range(0, height, block_size):
+        h = min(block_size, height - row_off)
+        
+        for col_off in range(0, width, block_size):
+            w = min(block_size, width - col_off)
+            
+            yield Window(col_off, row_off, w, h)
+
+def _group_reduce(labels, values, ufunc):
+    '''
+    Reduce values by label in a vectorised manner.
+    
+    Parameters
+    ----------
+    labels : numpy.ndarray
+        One-dimensional array of integer labels.
+    values : numpy.ndarray
+        Values of the same shape as labels.
+    ufunc : numpy.ufunc
+        Reduction, e.g., numpy.minimum or numpy.maximum.
+    
+    Returns
+    -------
+    ids : numpy.ndarray
+        Unique labels.
+    reduced : numpy.ndarray
+        Reduced values for each label in ids.
+
+    '''
+    if labels.size == 0:
+        return labels, values
+    
+    order = np.argsort(labels, kind = "stable")
+    labels, values = labels[order], values[order]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    
+    return labels[starts], ufunc.reduceat(values, starts)
+
+def _block_windows(src, block_size = None):
+    '''
+    Iterate over a raster dataset in blocks.
+    
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Opened raster dataset.
+    block_size : int, optional
+        Edge length of the blocks in cells. The default is None.
+    
+    Returns
+    -------
+    windows : generator
+        Yields rasterio.windows.Window objects.
+
+    '''
+    return _windows(src.height, src.width, block_size = block_size)
+
+#-----------------------------------------------------------------------------|
+# Functions
+def habitat_extent(landscape, habitat, block_size = None):
+    '''
+    Compute the bounding box of habitat cells in a landscape raster. The raster
+    is scanned block by block, so it is never loaded into memory entirely.
+    
+    Parameters
+    ----------
+    landscape : str
+        File path of the landscape raster.
+    habitat : int, str or list
+        Code(s) of habitat cells.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    window : rasterio.windows.Window or None
+        Window enclosing all habitat cells. None if the raster does not
+        contain any habitat cells.
+
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    codes = _habitat_codes(habitat)
+    row_min, row_max = math.inf, -1
+    col_min, col_max = math.inf, -1
+    
+    with rasterio.open(landscape) as src:
+        for window in _block_windows(src, block_size = block_size):
+            data = src.read(1, window = window)
+            mask = np.isin(data, codes)
+            
+            if not mask.any():
+                continue
+            
+            rows = np.flatnonzero(mask.any(axis = 1)) + window.row_off
+            cols = np.flatnonzero(mask.any(axis = 0)) + window.col_off
+            row_min, row_max = min(row_min, rows[0]), max(row_max, rows[-1])
+            col_min, col_max = min(col_min, cols[0]), max(col_max, cols[-1])
+    
+    if row_max < 0:
+        return None
+    
+    return Window(
+        int(col_min), int(row_min),
+        int(col_max - col_min + 1), int(row_max - row_min + 1)
+        )
+
+def link_search_buffer(threshold, disttype = "euclid", cost_raster = None,
+                       block_size = None):
+    '''
+    Derive the buffer (in map units) around habitat cells which a linkset
+    with the given threshold can reach.
+    
+    Parameters
+    ----------
+    threshold : numeric
+        Maximum distance or maximum accumulated cost of the linkset.
+    disttype : str, optional
+        Type of distance. Either "euclid" or "cost". The default is "euclid".
+    cost_raster : str, optional
+        Resistance raster. Required for disttype "cost". The lowest cost value
+        determines how far a path with the given threshold can reach.
+        The default is None.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    buffer : float
+        Buffer distance in map units.
+
+    '''
+    threshold = float(threshold)
+    
+    if disttype == "euclid":
+        return threshold
+    
+    elif disttype != "cost":
+        raise ValueError(
+            f"Invalid value {disttype} to argument disttype." +
+            "Must be either 'euclid' or 'cost'."
+            )
+    
+    if cost_raster is None:
+        raise ValueError("A cost raster is required for disttype 'cost'.")
+    
+    import rasterio
+    
+    min_cost = math.inf
+    
+    with rasterio.open(cost_raster) as src:
+        res = max(abs(src.res[0]), abs(src.res[1]))
+        
+        for window in _block_windows(src, block_size = block_size):
+            data = src.read(1, window = window, masked = True)
+            valid = data.compressed()
+            valid = valid[valid > 0]
+            
+            if valid.size > 0:
+                min_cost = min(min_cost, float(valid.min()))
+    
+    if not np.isfinite(min_cost):
+        raise ValueError(f"No positive cost values found in {cost_raster}.")
+    
+    # Graphab accumulates cost per cell crossed, hence the number of cells a
+    # path can traverse is bounded by threshold / min_cost.
+    return math.ceil(threshold / min_cost) * res
+
+def crop_raster(src_file, dst_file, window, block_size = None):
+    '''
+    Write a window of a raster to a new GeoTIFF file. The output keeps data
+    type, NoData value, and coordinate reference system of the input and is
+    georeferenced to the position of the window.
+    
+    Parameters
+    ----------
+    src_file : str
+        Input raster.
+    dst_file : str
+        Output raster file (.tif).
+    window : rasterio.windows.Window
+        Window (in cells of the input raster) to copy.
+    block_size : int, optional
+        Edge length of the blocks copied at once (in cells).
+        The default is None.
+    
+    Returns
+    -------
+    dst_file : str
+        Output raster file.
+
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    with rasterio.open(src_file) as src:
+        window = window.intersection(Window(0, 0, src.width, src.height))
+        profile = src.profile.copy()
+        profile.update(
+            driver = "GTiff",
+            width = int(window.width),
+            height = int(window.height),
+            transform = src.window_transform(window)
+            )
+        
+        with rasterio.open(dst_file, "w", **profile) as dst:
+            for w in _windows(
+                    int(window.height), int(window.width), block_size
+                    ):
+                src_window = Window(
+                    w.col_off + window.col_off, w.row_off + window.row_off,
+                    w.width, w.height
+                    )
+                dst.write(src.read(window = src_window), window = w)
+    
+    return dst_file
+
+def crop_to_habitat(landscape, habitat, dst_file, buffer = 0,
+                    block_size = None):
+    '''
+    Crop a landscape raster to the extent of its habitat cells.
+    
+    Parameters
+    ----------
+    landscape : str
+        File path of the landscape raster.
+    habitat : int, str or list
+        Code(s) of habitat cells.
+    dst_file : str
+        Output raster file (.tif).
+    buffer : numeric, optional
+        Buffer in map units to keep around the habitat cells, e.g., the
+        output of link_search_buffer(). The default is 0.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Raises
+    ------
+    ValueError
+        The landscape does not contain any habitat cells.
+    
+    Returns
+    -------
+    crop : dict
+        Output file, cropping window (col_off, row_off, width, height),
+        shape and transform of the input raster, and offset of the output
+        relative to the input in map units.
+
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    window = habitat_extent(landscape, habitat, block_size = block_size)
+    
+    if window is None:
+        raise ValueError(
+            f"Landscape {landscape} contains no cells of habitat {habitat}."
+            )
+    
+    with rasterio.open(landscape) as src:
+        shape = (src.height, src.width)
+        transform = src.transform
+        bx = math.ceil(float(buffer) / abs(src.res[0]))
+        by = math.ceil(float(buffer) / abs(src.res[1]))
+    
+    col_off = max(0, window.col_off - bx)
+    row_off = max(0, window.row_off - by)
+    col_end = min(shape[1], window.col_off + window.width + bx)
+    row_end = min(shape[0], window.row_off + window.height + by)
+    window = Window(col_off, row_off, col_end - col_off, row_end - row_off)
+    
+    crop_raster(landscape, dst_file, window, block_size = block_size)
+    
+    x_off, y_off = transform * (col_off, row_off)
+    
+    crop = {"file" : dst_file,
+            "window" : (int(col_off), int(row_off),
+                        int(window.width), int(window.height)),
+            "shape" : shape,
+            "transform" : tuple(transform)[:6],
+            "offset" : (x_off - transform.c, y_off - transform.f)
+            }
+    
+    return crop
+
+def crop_like(src_file, crop, dst_file, block_size = None):
+    '''
+    Crop a raster on the same grid as a landscape that was cropped using
+    crop_to_habitat(). Rasters already on the grid of the cropped landscape
+    are not modified.
+    
+    Parameters
+    ----------
+    src_file : str
+        Input raster, e.g., a resistance surface.
+    crop : dict
+        Output of crop_to_habitat().
+    dst_file : str
+        Output raster file (.tif).
+    block_size : int, optional
+        Edge length of the blocks copied at once (in cells).
+        The default is None.
+    
+    Returns
+    -------
+    file : str
+        File path of the cropped raster, or src_file if the raster is on the
+        grid of the cropped landscape.
+    
+    Raises
+    ------
+    ValueError
+        If the raster is neither on the grid of the original nor on the grid
+        of the cropped landscape.
+
+    '''
+    import rasterio
+    from rasterio.windows import Window
+    
+    cropped = list(crop["transform"])
+    cropped[2] += crop["offset"][0]
+    cropped[5] += crop["offset"][1]
+    
+    with rasterio.open(src_file) as src:
+        shape = (src.height, src.width)
+        transform = tuple(src.transform)[:6]
+    
+    if shape == (crop["window"][3], crop["window"][2]) and \
+            np.allclose(transform, cropped):
+        return src_file
+    
+    if shape != tuple(crop["shape"]) or \
+            not np.allclose(transform, crop["transform"]):
+        raise ValueError(
+            f"Raster {src_file} is not aligned with the landscape. Rasters " +
+            "of a cropped project must have the extent and resolution of " +
+            "the original or the cropped landscape."
+            )
+    
+    return crop_raster(
+        src_file, dst_file, Window(*crop["window"]), block_size = block_size
+        )
+
+def zonal_stats(label_raster, value_raster, stats = ["mean"], n_jobs = None,
+                block_size = None):
+    '''
+    Compute statistics of a value raster for each patch of a patch (label)
+    raster. Both rasters are read in aligned blocks, which are processed in
+    parallel, and statistics are accumulated with vectorised reductions.
+    
+    Parameters
+    ----------
+    label_raster : str
+        Raster of patch IDs, e.g., the patches.tif file of a Graphab project.
+        Cells with a value <= 0 are ignored.
+    value_raster : str
+        Raster of values. Must be on the same grid as label_raster. NoData
+        and NaN cells are ignored.
+    stats : list, optional
+        Statistics to compute. Any of "count", "sum", "mean", "min", "max",
+        and "std". The default is ["mean"].
+    n_jobs : int, optional
+        Number of threads. The default is None, in which case the number of
+        CPUs is used.
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    table : pandas.DataFrame
+        Statistics for each patch, indexed by patch ID ("Id").
+
+    '''
+    import threading
+    import rasterio
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    
+    stats = [stats] if isinstance(stats, str) else list(stats)
+    valid_stats = ["count", "sum", "mean", "min", "max", "std"]
+    invalid = [s for s in stats if s not in valid_stats]
+    
+    if len(invalid) > 0:
+        raise ValueError(
+            f"Invalid statistic(s) {invalid}. Must be in {valid_stats}."
+            )
+    
+    with rasterio.open(label_raster) as lab, \
+            rasterio.open(value_raster) as val:
+        if (lab.height, lab.width) != (val.height, val.width) or \
+                not np.allclose(tuple(lab.transform)[:6],
+                                tuple(val.transform)[:6]):
+            raise ValueError(
+                f"Rasters {label_raster} and {value_raster} are not aligned."
+                )
+        
+        windows = list(_block_windows(lab, block_size = block_size))
+    
+    # Datasets must not be shared between threads
+    local = threading.local()
+    
+    def block_stats(window):
+        if not hasattr(local, "lab"):
+            local.lab = rasterio.open(label_raster)
+            local.val = rasterio.open(value_raster)
+            opened.append((local.lab, local.val))
+        
+        labels = local.lab.read(1, window = window).astype("int64").ravel()
+        values = local.val.read(1, window = window, masked = True)
+        mask = np.ma.getmaskarray(values).ravel()
+        values = np.ma.getdata(values).astype("float64").ravel()
+        present = np.unique(labels[labels > 0])
+        valid = (labels > 0) & ~mask & np.isfinite(values)
+        ids, inverse = np.unique(labels[valid], return_inverse = True)
+        v = values[valid]
+        out = {"present" : present,
+               "ids" : ids,
+               "count" : np.bincount(inverse, minlength = len(ids)),
+               "sum" : np.bincount(inverse, v, minlength = len(ids)),
+               "sumsq" : np.bincount(inverse, v**2, minlength = len(ids))}
+        
+        if "min" in stats:
+            out["min"] = _group_reduce(inverse, v, np.minimum)[1]
+        
+        if "max" in stats:
+            out["max"] = _group_reduce(inverse, v, np.maximum)[1]
+        
+        return out
+    
+    opened = []
+    n = 0
+    acc = {k : np.zeros(0) for k in ["count", "sum", "sumsq"]}
+    acc["min"] = np.zeros(0)
+    acc["max"] = np.zeros(0)
+    acc["present"] = np.zeros(0, dtype = bool)
+    
+    def grow(size):
+        fill = {"min" : np.inf, "max" : -np.inf, "present" : False}
+        
+        for key, arr in acc.items():
+            new = np.full(size, fill.get(key, 0), dtype = arr.dtype)
+            new[:len(arr)] = arr
+            acc[key] = new
+    
+    try:
+        with ThreadPoolExecutor(max_workers = n_jobs) as executor:
+            for out in executor.map(block_stats, windows):
+                top = int(out["present"].max()) \
+                    if len(out["present"]) > 0 else 0
+                
+                if top >= n:
+                    n = max(top + 1, 2 * n)
+                    grow(n)
+                
+                ids = out["ids"]
+                acc["present"][out["present"]] = True
+                
+                for key in ["count", "sum", "sumsq"]:
+                    acc[key][ids] += out[key]
+                
+                if "min" in out:
+                    acc["min"][ids] = np.minimum(acc["min"][ids], out["min"])
+                
+                if "max" in out:
+                    acc["max"][ids] = np.maximum(acc["max"][ids], out["max"])
+    
+    finally:
+        for handles in opened:
+            for handle in handles:
+                handle.close()
+    
+    ids = np.flatnonzero(acc["present"])
+    count = acc["count"][ids]
+    table = pd.DataFrame(index = pd.Index(ids, name = "Id"))
+    
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        mean = acc["sum"][ids] / count
+        columns = {
+            "count" : count.astype("int64"),
+            "sum" : acc["sum"][ids],
+            "mean" : mean,
+            "min" : np.where(count > 0, acc["min"][ids], np.nan),
+            "max" : np.where(count > 0, acc["max"][ids], np.nan),
+            "std" : np.sqrt(np.maximum(
+                acc["sumsq"][ids] / count - mean**2, 0
+                ))
+            }
+    
+    for s in stats:
+        table[s] = columns[s]
+    
+    return table
+
+def reclassify(values, table, default = np.nan):
+    '''
+    Apply a lookup table to an array (e.g., land cover codes to cost values).
+    
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of codes.
+    table : dict
+        Lookup table {code : value}.
+    default : numeric, optional
+        Value assigned to codes missing from the table. The default is NaN.
+    
+    Returns
+    -------
+    out : numpy.ndarray
+        Array of float64 values.
+
+    '''
+    keys = np.array(sorted(table.keys()), dtype = "float64")
+    lookup = np.array([table[k] for k in sorted(table.keys())],
+                      dtype = "float64")
+    values = np.asarray(values, dtype = "float64")
+    out = np.full(values.shape, default, dtype = "float64")
+    
+    if len(keys) == 0:
+        return out
+    
+    idx = np.clip(np.searchsorted(keys, values), 0, len(keys) - 1)
+    found = keys[idx] == values
+    out[found] = lookup[idx[found]]
+    
+    return out
+
+def build_cost_rasters(layers, outputs, nodata = -9999., dtype = "float32",
+                       compress = "deflate", n_jobs = None, block_size = None):
+    '''
+    Create one or several cost (resistance) rasters from land cover and other
+    layers. The input rasters are read once, block by block, in a thread
+    pool, and all outputs are computed from the same blocks. Outputs are
+    written as tiled, compressed GeoTIFF files.
+    
+    Parameters
+    ----------
+    layers : str or dict
+        Input raster, or dictionary {name : raster} of aligned input rasters.
+        A single raster is available under the name "landcover". The first
+        layer is used for lookup tables.
+    outputs : dict
+        Dictionary {output file : specification}. A specification is either a
+        lookup table {code : cost} applied to the first layer, or a function
+        which receives a dictionary {name : numpy.ndarray} of blocks (NoData
+        set to NaN) and returns an array of costs, e.g.,
+        lambda b: reclassify(b["landcover"], table) * (1 + b["slope"] / 45).
+    nodata : numeric, optional
+        NoData value of the outputs. Cells with NaN costs (NoData in the
+        inputs or codes missing from a lookup table) are set to nodata.
+        The default is -9999.
+    dtype : str, optional
+        Data type of the outputs. The default is "float32".
+    compress : str, optional
+        GeoTIFF compression. The default is "deflate".
+    n_jobs : int, optional
+        Number of threads. The default is None (number of CPUs).
+    block_size : int, optional
+        Edge length of the blocks read at once (in cells). The default is None.
+    
+    Returns
+    -------
+    files : list
+        Output files.
+
+    '''
+    import threading
+    import rasterio
+    from concurrent.futures import ThreadPoolExecutor
+    
+    layers = {"landcover" : layers} if isinstance(layers, str) else \
+        dict(layers)
+    names = list(layers.keys())
+    functions = {}
+    
+    for out_file, spec in outputs.items():
+        if isinstance(spec, dict):
+            functions[out_file] = lambda b, t = spec: reclassify(b[names[0]], t)
+        
+        elif callable(spec):
+            functions[out_file] = spec
+        
+        else:
+            raise TypeError(
+                f"Invalid specification for {out_file}. Must be a dict or " +
+                "a function."
+                )
+    
+    with rasterio.open(layers[names[0]]) as src:
+        profile = src.profile.copy()
+        shape = (src.height, src.width)
+        transform = tuple(src.transform)[:6]
+    
+    for name in names[1:]:
+        with rasterio.open(layers[name]) as src:
+            if (src.height, src.width) != shape or \
+                    not np.allclose(tuple(src.transform)[:6], transform):
+                raise ValueError(
+                    f"Layer {name} is not aligned with layer {names[0]}."
+                    )
+    
+    profile.update(driver = "GTiff", count = 1, dtype = dtype,
+                   nodata = nodata, tiled = True, blockxsize = 256,
+                   blockysize = 256, compress = compress,
+                   BIGTIFF = "IF_SAFER")
+    
+    if compress is not None and np.dtype(dtype).kind == "f":
+        profile.update(predictor = 3)
+    
+    local = threading.local()
+    lock = threading.Lock()
+    opened = []
+    dsts = {}
+    
+    def process(window):
+        if not hasattr(local, "srcs"):
+            local.srcs = {n : rasterio.open(f) for n, f in layers.items()}
+            opened.extend(local.srcs.values())
+        
+        blocks = {}
+        
+        for name, src in local.srcs.items():
+            data = src.read(1, window = window, masked = True)
+            blocks[name] = np.ma.filled(data.astype("float64"), np.nan)
+        
+        results = {}
+        
+        for out_file, function in functions.items():
+            cost = np.asarray(function(blocks), dtype = "float64")
+            cost = np.where(np.isfinite(cost), cost, nodata)
+            results[out_file] = cost.astype(dtype)
+        
+        with lock:
+            for out_file, cost in results.items():
+                dsts[out_file].write(cost, 1, window = window)
+    
+    try:
+        for out_file in outputs.keys():
+            dsts[out_file] = rasterio.open(out_file, "w", **profile)
+        
+        with ThreadPoolExecutor(max_workers = n_jobs) as executor:
+            list(executor.map(
+                process, _windows(*shape, block_size = block_size)
+                ))
+    
+    finally:
+        for dst in list(dsts.values()) + opened:
+            dst.close()
+    
+    return list(outputs.keys())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 18:40:27 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, re, glob, threading
+from .tracing import span
+
+_cache = {}
+_cache_lock = threading.Lock()
+_number = re.compile(
+    r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[-+]?Infinity|NaN"
+    )
+_assignment = re.compile(
+    r"([A-Za-z][\w.\-]*)\s*[:=]\s*(\[[^\]]*\]|[^\s,;{}\]]+)"
+    )
+
+#-----------------------------------------------------------------------------|
+# Functions
+def _engine():
+    '''
+    Fastest CSV engine available to pandas.
+    '''
+    try:
+        import pyarrow
+        
+        return "pyarrow"
+    
+    except ImportError:
+        return "c"
+
+def _separator(file):
+    return "\t" if os.path.splitext(file)[1].lower() == ".txt" else ","
+
+def _header(file, sep):
+    with open(file, "r") as f:
+        return f.readline().rstrip("\r\n").split(sep)
+
+def _typed(table, index):
+    '''
+    Convert numeric columns to float64 and set the ID column as index. Patch
+    IDs become int64, other IDs (e.g., links) stay strings.
+    '''
+    import pandas as pd
+    
+    for col in table.columns:
+        if col != index and table[col].dtype == object:
+            try:
+                table[col] = pd.to_numeric(table[col])
+            
+            except (ValueError, TypeError):
+                pass
+        
+        elif col != index and table[col].dtype.kind in "iu":
+            table[col] = table[col].astype("float64")
+    
+    if index not in table.columns:
+        return table
+    
+    ids = table[index].astype(str).str.strip()
+    
+    if ids.str.fullmatch(r"-?\d+").all():
+        ids = ids.astype("int64")
+    
+    return table.drop(columns = index).set_index(
+        pd.Index(ids, name = index)
+        )
+
+def _read(file, sep, usecols = None):
+    import pandas as pd
+    
+    return pd.read_csv(file, sep = sep, usecols = usecols,
+                       engine = _engine())
+
+def read_table(file, index = None, sep = None, cache = True):
+    '''
+    Read a table written by Graphab (e.g., patches.csv or a delta output
+    file) into a typed DataFrame.
+    
+    Parameters
+    ----------
+    file : str
+        Path to the table.
+    index : str, optional
+        ID column used as index. The default is None (first column).
+    sep : str, optional
+        Field separator. The default is None, in which case tab is used for
+        .txt files and comma otherwise.
+    cache : bool, optional
+        Keep the table in memory. If the file changes and only new columns
+        were appended (as Graphab does when adding local metrics), only the
+        new columns are read. The default is True.
+    
+    Returns
+    -------
+    table : pandas.DataFrame
+        Table indexed by ID with float64 metric columns.
+
+    '''
+    file = os.path.abspath(file)
+    sep = _separator(file) if sep is None else sep
+    stat = os.stat(file)
+    index = _header(file, sep)[0] if index is None else index
+    key = (file, index)
+    
+    with _cache_lock:
+        cached = _cache.get(key) if cache else None
+    
+    if cached is not None and cached["stat"] == (stat.st_mtime_ns,
+                                                 stat.st_size):
+        return cached["table"].copy()
+    
+    table = None
+    
+    if cached is not None:
+        header = _header(file, sep)
+        old = cached["columns"]
+        
+        if header[:len(old)] == old and index in header:
+            new = header[len(old):]
+            
+            with span("read appended columns", file = file):
+                part = _typed(_read(file, sep, usecols = [index] + new),
+                              index)
+            
+            if part.index.equals(cached["table"].index):
+                table = cached["table"].join(part) if len(new) > 0 else \
+                    cached["table"]
+    
+    if table is None:
+        with span("read table", file = file):
+            raw = _read(file, sep)
+            header = list(raw.columns)
+            table = _typed(raw, index)
+    
+    if cache:
+        with _cache_lock:
+            _cache[key] = {"stat" : (stat.st_mtime_ns, stat.st_size),
+                           "columns" : header,
+                           "table" : table}
+    
+    return table.copy()
+
+def read_delta(file, cache = False):
+    '''
+    Read a delta output file (delta-<metric>_<graph>.txt) into a DataFrame
+    indexed by the ID of the removed item.
+    
+    Parameters
+    ----------
+    file : str
+        Path to the delta file.
+    cache : bool, optional
+        Keep the table in memory. The default is False.
+    
+    Returns
+    -------
+    table : pandas.DataFrame
+        Delta values (float64) indexed by patch (int64) or link ID.
+
+    '''
+    return read_table(file, cache = cache)
+
+def find_outputs(directory, metric = None, graph = None):
+    '''
+    List the delta output files Graphab has written to a project directory.
+    
+    Parameters
+    ----------
+    directory : str
+        Project directory.
+    metric : str, optional
+        Restrict the files to a metric. The default is None.
+    graph : str, optional
+        Restrict the files to a graph. The default is None.
+    
+    Returns
+    -------
+    files : list
+        Sorted file paths.
+
+    '''
+    pattern = "delta-" + ("*" if metric is None else f"{metric}*") + \
+        ("*" if graph is None else f"_{graph}") + ".txt"
+    
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+def parse_metric_output(text):
+    '''
+    Parse metric values from the text Graphab prints after calculating a
+    global or component metric.
+    
+    Parameters
+    ----------
+    text : str
+        Process output.
+    
+    Returns
+    -------
+    values : dict
+        Metric name (including parameters, as printed by Graphab) mapped to
+        a float, or to a list of floats for multi-valued and component
+        metrics. Empty if no value was found.
+
+    '''
+    values = {}
+    
+    for name, value in _assignment.findall(text):
+        numbers = [float(v) for v in _number.findall(value)]
+        
+        if len(numbers) == 0 or not _number.fullmatch(
+                value.strip("[]").split(",")[0].strip()
+                ):
+            continue
+        
+        values[name] = numbers[0] if len(numbers) == 1 and \
+            not value.startswith("[") else numbers
+    
+    return values
+
+def clear_cache():
+    '''
+    Remove all tables from the result cache.
+    '''
+    with _cache_lock:
+        _cache.clear()
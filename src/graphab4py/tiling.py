@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 10:58:23 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .raster import _windows, crop_raster, habitat_extent, link_search_buffer
+from .labeling import _label_profile, _finalize_labels
+
+#-----------------------------------------------------------------------------|
+# Helpers
+def _merge_links(tables):
+    '''
+    Combine link tables of several tiles. For each pair of patches, the link
+    with the lowest distance is kept.
+    '''
+    import pandas as pd
+    
+    links = pd.concat(tables, ignore_index = True)
+    links = links[links["ID1"] != links["ID2"]]
+    id1 = np.minimum(links["ID1"], links["ID2"])
+    id2 = np.maximum(links["ID1"], links["ID2"])
+    links = links.assign(ID1 = id1, ID2 = id2)
+    links = links.loc[links.groupby(["ID1", "ID2"])["Dist"].idxmin()]
+    
+    return links.sort_values(["ID1", "ID2"]).reset_index(drop = True)
+
+#-----------------------------------------------------------------------------|
+# Classes
+class GraphabEngine():
+    '''
+    Run the per-tile steps of a TiledProject with Graphab.
+    '''
+    def create_project(self, name, landscape, habitat, directory,
+                       nomerge = False, nodata = None, connexity = 8,
+                       **ga_settings):
+        from .project import Project
+        
+        prj = Project()
+        prj.create_project(
+            name = name, patches = landscape, habitat = habitat,
+            nomerge = nomerge, nodata = nodata, connexity = connexity,
+            directory = directory, overwrite = True, **ga_settings
+            )
+        
+        return {"project" : prj,
+                "patch_raster" : os.path.join(
+                    os.path.dirname(prj.project_file), "patches.tif"
+                    )
+                }
+    
+    def create_linkset(self, tile_project, disttype, linkname, threshold,
+                       cost_raster = None, **ga_settings):
+        prj = tile_project["project"]
+        prj.create_linkset(
+            disttype = disttype, linkname = linkname, threshold = threshold,
+            complete = True, cost_raster = cost_raster, **ga_settings
+            )
+        
+        return os.path.join(
+            os.path.dirname(prj.project_file), linkname + "-links.csv"
+            )
+
+class TiledProject():
+    def __init__(self, tile_size = 4096, halo = 0, n_jobs = None,
+                 engine = None, block_size = None):
+        '''
+        Process a landscape in overlapping tiles. Each tile is processed as an
+        independent Graphab project and the results are merged into a single
+        set of patches and links.
+        
+        Parameters
+        ----------
+        tile_size : int, optional
+            Edge length of the tile cores in cells. The default is 4096.
+        halo : numeric, optional
+            Width of the overlap added around each tile core in map units.
+            It must be at least as large as the distance links can reach (see
+            graphab4py.raster.link_search_buffer()). The default is 0.
+        n_jobs : int, optional
+            Number of tiles processed in parallel. The default is None, in
+            which case a single tile is processed at a time.
+        engine : object, optional
+            Engine running the per-tile steps. The default is None, in which
+            case Graphab is used.
+        block_size : int, optional
+            Edge length of the blocks read at once when merging (in cells).
+            The default is None.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.tile_size = int(tile_size)
+        self.halo = float(halo)
+        self.n_jobs = 1 if n_jobs is None else int(n_jobs)
+        self.engine = GraphabEngine() if engine is None else engine
+        self.block_size = block_size
+        self.tiles = None
+        self.linksets = None
+        self.linkset_params = {}
+    
+    def _map(self, function, items):
+        with ThreadPoolExecutor(max_workers = self.n_jobs) as executor:
+            return list(executor.map(function, items))
+    
+    def _tile_dir(self):
+        return os.path.join(self.directory, self.name + "-tiles")
+    
+    def create_project(self, name, patches, habitat, nomerge = False,
+                       nodata = None, minarea = None, connexity = 8,
+                       directory = None, **ga_settings):
+        '''
+        Split the landscape into tiles and create a project for each tile.
+        
+        Parameters
+        ----------
+        name : str
+            Project name.
+        patches : str
+            File path of the landscape raster.
+        habitat : int
+            Integer(s) indicating habitat patches.
+        nomerge : bool, optional
+            Do not merge contiguous patches of different codes.
+            The default is False.
+        nodata : int, optional
+            NoData value. The default is None.
+        minarea : numeric, optional
+            Minimum patch area in ha. Applied after merging the tiles, since
+            patches cut by tile edges would otherwise be dropped.
+            The default is None.
+        connexity : int in {4, 8}, optional
+            Consider the 4 or 8 neighbours when merging pixels to patches.
+            The default is 8.
+        directory : str, optional
+            Directory in which the project shall be created. If set to none,
+            the current working directory is used. The default is None.
+        
+        :param kwargs:
+            Dictionary containing Graphab settings.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        import rasterio
+        from rasterio.windows import Window
+        
+        self.name = name
+        self.patches = patches
+        self.habitat = habitat
+        self.nomerge = nomerge
+        self.nodata = nodata
+        self.minarea = minarea
+        self.connexity = connexity
+        self.directory = os.getcwd() if directory is None else directory
+        self.ga_settings = ga_settings
+        
+        os.makedirs(self._tile_dir(), exist_ok = True)
+        os.makedirs(os.path.join(self.directory, self.name), exist_ok = True)
+        
+        with rasterio.open(patches) as src:
+            self.shape = (src.height, src.width)
+            self.profile = src.profile.copy()
+            self.res = (abs(src.res[0]), abs(src.res[1]))
+        
+        hx = math.ceil(self.halo / self.res[0])
+        hy = math.ceil(self.halo / self.res[1])
+        tiles = []
+        
+        for core in _windows(*self.shape, block_size = self.tile_size):
+            r = core.row_off // self.tile_size
+            c = core.col_off // self.tile_size
+            col_off = max(0, core.col_off - hx)
+            row_off = max(0, core.row_off - hy)
+            col_end = min(self.shape[1], core.col_off + core.width + hx)
+            row_end = min(self.shape[0], core.row_off + core.height + hy)
+            
+            tiles.append({
+                "name" : f"{name}_{r}_{c}",
+                "core" : core,
+                "window" : Window(
+                    col_off, row_off, col_end - col_off, row_end - row_off
+                    ),
+                "landscape" : os.path.join(
+                    self._tile_dir(), f"{name}_{r}_{c}.tif"
+                    )
+                })
+        
+        def create(tile):
+            crop_raster(
+                self.patches, tile["landscape"], tile["window"],
+                block_size = self.block_size
+                )
+            
+            if habitat_extent(tile["landscape"], self.habitat) is None:
+                return None
+            
+            tile["project"] = self.engine.create_project(
+                name = tile["name"], landscape = tile["landscape"],
+                habitat = self.habitat, directory = self._tile_dir(),
+                nomerge = self.nomerge, nodata = self.nodata,
+                connexity = self.connexity, **self.ga_settings
+                )
+            
+            return tile
+        
+        self.tiles = [t for t in self._map(create, tiles) if t is not None]
+        self._merge_patches()
+        
+        print(f"Tiled project created ({len(self.tiles)} tiles).")
+    
+    def _merge_patches(self):
+        '''
+        Stitch the tile cores into a global patch raster and merge patches
+        touching each other across tile boundaries.
+        '''
+        import rasterio
+        
+        prj_dir = os.path.join(self.directory, self.name)
+        provisional = os.path.join(self._tile_dir(), "provisional.tif")
+        self.patch_raster = os.path.join(prj_dir, "patches.tif")
+        
+        profile = self.profile.copy()
+        profile.update(_label_profile)
+        
+        # Write tile cores with offset labels
+        offset = 0
+        
+        with rasterio.open(provisional, "w", **profile) as dst:
+            for tile in self.tiles:
+                with rasterio.open(tile["project"]["patch_raster"]) as src:
+                    local = src.read(1).astype("int64")
+                
+                local[local < 0] = 0
+                n_local = int(local.max())
+                tile["offset"] = offset
+                core, window = tile["core"], tile["window"]
+                rows = slice(core.row_off - window.row_off,
+                             core.row_off - window.row_off + core.height)
+                cols = slice(core.col_off - window.col_off,
+                             core.col_off - window.col_off + core.width)
+                data = local[rows, cols]
+                data[data > 0] += offset
+                dst.write(data.astype("int32"), 1, window = core)
+                offset += n_local
+        
+        self.patch_table = _finalize_labels(
+            provisional, offset, self.patch_raster, self.tile_size,
+            connexity = self.connexity,
+            codes_file = self.patches if self.nomerge else None,
+            minarea = self.minarea, block_size = self.block_size
+            )
+        os.remove(provisional)
+        
+        self.patch_table.to_csv(os.path.join(prj_dir, "patches.csv"),
+                                index = False)
+    
+    def _tile_ids(self, tile):
+        '''
+        Map local patch IDs of a tile to global patch IDs.
+        '''
+        import rasterio
+        
+        with rasterio.open(tile["project"]["patch_raster"]) as src:
+            local = src.read(1).astype("int64")
+        
+        with rasterio.open(self.patch_raster) as src:
+            glob = src.read(1, window = tile["window"]).astype("int64")
+        
+        mask = local > 0
+        ids, index = np.unique(local[mask], return_index = True)
+        mapping = np.zeros(int(local.max()) + 1, dtype = "int64")
+        mapping[ids] = glob[mask][index]
+        
+        return mapping
+    
+    def create_linkset(self, disttype, linkname, threshold,
+                       cost_raster = None, **ga_settings):
+        '''
+        Create a complete linkset on each tile and merge the links into a
+        single linkset.
+        
+        Parameters
+        ----------
+        disttype : str
+            Type of distance to use. Either "euclid" or "cost".
+        linkname : str
+            Name of the linkset.
+        threshold : int
+            Maximum distance or maximum accumulated cost (depending on the type
+            of distance).
+        cost_raster : str, optional
+            Path to an external cost raster file (.tif). The default is None.
+        
+        :param kwargs:
+            Additional Graphab settings.
+        
+        Raises
+        ------
+        ValueError
+            The halo is narrower than the distance links can reach.
+        
+        Returns
+        -------
+        links : pandas.DataFrame
+            Merged links with the columns "ID1", "ID2", "Dist", and "DistM".
+
+        '''
+        import pandas as pd
+        
+        if self.tiles is None:
+            raise Exception(
+                "No project was created yet. Use create_project first."
+                )
+        
+        reach = link_search_buffer(
+            threshold, disttype = disttype, cost_raster = cost_raster,
+            block_size = self.block_size
+            )
+        
+        if reach > self.halo:
+            raise ValueError(
+                f"Halo of {self.halo} map units is too narrow for a threshold "
+                + f"of {threshold}. Links may reach up to {reach} map units."
+                )
+        
+        settings = dict(self.ga_settings)
+        settings.update(ga_settings)
+        
+        def link(tile):
+            tile_cost = None
+            
+            if cost_raster is not None:
+                tile_cost = os.path.join(
+                    self._tile_dir(), f"{tile['name']}-{linkname}-cost.tif"
+                    )
+                crop_raster(cost_raster, tile_cost, tile["window"],
+                            block_size = self.block_size)
+            
+            links_file = self.engine.create_linkset(
+                tile["project"], disttype = disttype, linkname = linkname,
+                threshold = threshold, cost_raster = tile_cost, **settings
+                )
+            
+            links = pd.read_csv(links_file)
+            mapping = self._tile_ids(tile)
+            links["ID1"] = mapping[links["ID1"].to_numpy()]
+            links["ID2"] = mapping[links["ID2"].to_numpy()]
+            
+            return links[(links["ID1"] > 0) & (links["ID2"] > 0)]
+        
+        tables = self._map(link, self.tiles)
+        columns = ["ID1", "ID2", "Dist", "DistM"]
+        tables = [t[columns] for t in tables] or \
+            [pd.DataFrame(columns = columns)]
+        links = _merge_links(tables)
+        links.to_csv(
+            os.path.join(self.directory, self.name, linkname + "-links.csv"),
+            index = False
+            )
+        
+        if self.linksets is None:
+            self.linksets = [linkname]
+        
+        elif linkname not in self.linksets:
+            self.linksets.append(linkname)
+        
+        self.linkset_params[linkname] = {"disttype" : disttype,
+                                         "threshold" : threshold,
+                                         "cost_raster" : cost_raster
+                                         }
+        
+        print("Linkset created.")
+        
+        return links
+    
+    def get_links(self, linkset = None):
+        '''
+        Read the merged links of a linkset.
+        
+        Parameters
+        ----------
+        linkset : str, optional
+            Name of the linkset. The default is None (first linkset).
+        
+        Returns
+        -------
+        links : pandas.DataFrame
+            Link table.
+
+        '''
+        import pandas as pd
+        
+        if self.linksets is None:
+            raise Exception(
+                "No linksets were created yet. Use create_linkset to " +
+                "create a linkset first."
+                )
+        
+        linkset = self.linksets[0] if linkset is None else linkset
+        
+        return pd.read_csv(
+            os.path.join(self.directory, self.name, linkset + "-links.csv")
+            )
+    
+    def get_graph(self, linkset = None, threshold = None):
+        '''
+        Create a graph of the merged patches and links, which can be used to
+        calculate metrics in Python.
+        
+        Parameters
+        ----------
+        linkset : str, optional
+            Name of the linkset. The default is None (first linkset).
+        threshold : numeric, optional
+            Omit links with a distance above threshold. The default is None.
+        
+        Returns
+        -------
+        graph : graphab4py.graph.Graph
+            Graph of the full landscape.
+
+        '''
+        from .graph import Graph
+        
+        area = self.shape[0] * self.shape[1] * self.res[0] * self.res[1]
+        
+        return Graph(
+            self.patch_table, self.get_links(linkset),
+            threshold = threshold, area = area
+            )
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 20:52:14 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Development"
+
+#-----------------------------------------------------------------------------|
+import os, json, time, threading, functools
+
+_enabled = False
+_exporters = []
+_local = threading.local()
+
+#-----------------------------------------------------------------------------|
+# Classes
+class Span():
+    def __init__(self, name, attributes = None):
+        '''
+        Timing span of a traced operation. Spans opened while another span is
+        open in the same thread are its children.
+        
+        Parameters
+        ----------
+        name : str
+            Span name.
+        attributes : dict, optional
+            Additional information. The default is None.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.name = name
+        self.attributes = {} if attributes is None else dict(attributes)
+        self.parent = None
+        self.depth = 0
+        self.thread = threading.get_ident()
+        self.start = None
+        self.end = None
+        self.error = None
+    
+    @property
+    def duration(self):
+        '''
+        Duration in seconds.
+        '''
+        return (self.end - self.start) / 1e9
+    
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        
+        if stack is None:
+            stack = _local.stack = []
+        
+        if len(stack) > 0:
+            self.parent = stack[-1]
+            self.depth = self.parent.depth + 1
+        
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        
+        for exporter in _exporters:
+            exporter.on_start(self)
+        
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        
+        _local.stack.pop()
+        
+        for exporter in _exporters:
+            exporter.on_end(self)
+        
+        return False
+
+class _NullSpan():
+    '''
+    Span used while tracing is disabled. Entering and leaving it does
+    nothing.
+    '''
+    attributes = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_null_span = _NullSpan()
+
+class LogExporter():
+    def __init__(self, write = print, threshold = 0.):
+        '''
+        Write finished spans as indented lines.
+        
+        Parameters
+        ----------
+        write : callable, optional
+            Function called with each line, e.g., logging.getLogger().info.
+            The default is print.
+        threshold : float, optional
+            Omit spans shorter than this number of seconds. The default is 0.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.write = write
+        self.threshold = threshold
+    
+    def on_start(self, span):
+        pass
+    
+    def on_end(self, span):
+        if span.duration >= self.threshold:
+            error = "" if span.error is None else f" ({span.error})"
+            self.write(
+                "  " * span.depth + f"{span.name}: " +
+                f"{span.duration * 1e3:.3f} ms{error}"
+                )
+    
+    def close(self):
+        pass
+
+class ChromeTraceExporter():
+    def __init__(self, file):
+        '''
+        Collect finished spans and write them as a JSON trace that can be
+        opened with the Chrome trace viewer (chrome://tracing) or Perfetto.
+        
+        Parameters
+        ----------
+        file : str
+            Output file. It is written by close() and by disable().
+        
+        Returns
+        -------
+        None.
+
+        '''
+        self.file = file
+        self.events = []
+        self._lock = threading.Lock()
+    
+    def on_start(self, span):
+        pass
+    
+    def on_end(self, span):
+        args = {key : str(val) for key, val in span.attributes.items()}
+        
+        if span.error is not None:
+            args["error"] = span.error
+        
+        event = {"name" : span.name,
+                 "ph" : "X",
+                 "ts" : span.start / 1e3,
+                 "dur" : (span.end - span.start) / 1e3,
+                 "pid" : os.getpid(),
+                 "tid" : span.thread,
+                 "args" : args}
+        
+        with self._lock:
+            self.events.append(event)
+    
+    def close(self):
+        with self._lock:
+            events = sorted(self.events, key = lambda e: e["ts"])
+        
+        with open(self.file, "w") as f:
+            json.dump({"traceEvents" : events,
+                       "displayTimeUnit" : "ms"}, f)
+
+class OpenTelemetryExporter():
+    def __init__(self, tracer = None):
+        '''
+        Forward spans to OpenTelemetry. Requires the opentelemetry-api
+        package; exporting is configured through the OpenTelemetry SDK.
+        
+        Parameters
+        ----------
+        tracer : opentelemetry.trace.Tracer, optional
+            Tracer to use. The default is None, in which case the tracer of
+            the global tracer provider is used.
+        
+        Returns
+        -------
+        None.
+
+        '''
+        try:
+            from opentelemetry import trace
+        
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryExporter requires the opentelemetry-api " +
+                "package."
+                )
+        
+        self._trace = trace
+        self.tracer = trace.get_tracer("graphab4py") if tracer is None \
+            else tracer
+        self._spans = {}
+        self._lock = threading.Lock()
+    
+    def on_start(self, span):
+        with self._lock:
+            parent = self._spans.get(id(span.parent))
+        
+        context = None if parent is None else \
+            self._trace.set_span_in_context(parent)
+        otel_span = self.tracer.start_span(
+            span.name, context = context,
+            attributes = {key : str(val) for key, val in
+                          span.attributes.items()}
+            )
+        
+        with self._lock:
+            self._spans[id(span)] = otel_span
+    
+    def on_end(self, span):
+        with self._lock:
+            otel_span = self._spans.pop(id(span), None)
+        
+        if otel_span is None:
+            return
+        
+        if span.error is not None:
+            otel_span.set_attribute("error", span.error)
+        
+        otel_span.end()
+    
+    def close(self):
+        pass
+
+#-----------------------------------------------------------------------------|
+# Functions
+def enable(*exporters):
+    '''
+    Enable tracing of Graphab4py operations.
+    
+    Parameters
+    ----------
+    *exporters : objects
+        Exporters receiving the spans (LogExporter, ChromeTraceExporter,
+        OpenTelemetryExporter or any object with the methods on_start,
+        on_end and close). Without exporters, a LogExporter is used.
+    
+    Returns
+    -------
+    None.
+
+    '''
+    global _enabled
+    _exporters[:] = list(exporters) if len(exporters) > 0 else \
+        [LogExporter()]
+    _enabled = True
+
+def disable():
+    '''
+    Disable tracing and close the exporters (e.g., write the Chrome trace).
+    '''
+    global _enabled
+    _enabled = False
+    
+    for exporter in _exporters:
+        exporter.close()
+    
+    _exporters.clear()
+
+def is_enabled():
+    return _enabled
+
+def span(name, **attributes):
+    '''
+    Context manager measuring the enclosed block as a span.
+    
+    Parameters
+    ----------
+    name : str
+        Span name.
+    
+    :param kwargs:
+        Span attributes.
+    
+    Returns
+    -------
+    span : Span
+        Span, or a shared no-op object if tracing is disabled.
+
+    '''
+    if not _enabled:
+        return _null_span
+    
+    return Span(name, attributes)
+
+def traced(name = None):
+    '''
+    Decorator measuring each call of a function as a span.
+    
+    Parameters
+    ----------
+    name : str, optional
+        Span name. The default is None, in which case the qualified name of
+        the function is used.
+    
+    Returns
+    -------
+    decorator : function
+
+    '''
+    def decorator(function):
+        span_name = function.__qualname__ if name is None else name
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            
+            with Span(span_name):
+                return function(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
+
+def trace_methods(cls):
+    '''
+    Class decorator applying traced() to all public methods of a class.
+    '''
+    for key, value in list(vars(cls).items()):
+        if not key.startswith("_") and callable(value):
+            setattr(cls, key, traced()(value))
+    
+    return cls
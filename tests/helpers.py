@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+helpers
+
+Purpose
+-------
+Shared utilities for the graphab4py tests, e.g., writing small synthetic
+rasters to temporary files.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 10:02:17 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import numpy as np
+import pandas as pd
+
+def write_raster(file, data, res = 10., origin = (1000., 2000.),
+                 nodata = None, crs = "EPSG:2056"):
+    import rasterio
+    from rasterio.transform import from_origin
+    
+    data = np.asarray(data)
+    profile = {"driver" : "GTiff",
+               "height" : data.shape[0],
+               "width" : data.shape[1],
+               "count" : 1,
+               "dtype" : data.dtype,
+               "crs" : crs,
+               "transform" : from_origin(origin[0], origin[1], res, res),
+               "nodata" : nodata
+               }
+    
+    with rasterio.open(file, "w", **profile) as dst:
+        dst.write(data, 1)
+    
+    return file
+
+def read_raster(file):
+    import rasterio
+    
+    with rasterio.open(file) as src:
+        return src.read(1), src.transform
+
+def euclid_links(labels, res, threshold):
+    rows, cols = np.nonzero(labels)
+    ids = labels[rows, cols]
+    dx = np.maximum(np.abs(cols[:, None] - cols[None, :]) * res - res, 0)
+    dy = np.maximum(np.abs(rows[:, None] - rows[None, :]) * res - res, 0)
+    dist = np.sqrt(dx**2 + dy**2)
+    table = pd.DataFrame({
+        "ID1" : np.repeat(ids, len(ids)),
+        "ID2" : np.tile(ids, len(ids)),
+        "Dist" : dist.ravel()
+        })
+    table = table[(table["ID1"] < table["ID2"]) & (table["Dist"] <= threshold)]
+    table = table.groupby(["ID1", "ID2"], as_index = False)["Dist"].min()
+    table["DistM"] = table["Dist"]
+    
+    return table
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_batch
+
+Purpose
+-------
+Test the batch runner: results of all landscapes are aggregated into one
+table, completed steps are reused on reruns and resource budgets are
+enforced.
+
+Notes
+-----
+Graphab is replaced by the offline stand-in of the benchmark suite.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 23:58:24 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, time, threading, unittest, tempfile
+import pandas as pd
+from src.graphab4py.batch import run_batch, _Budget
+from src.graphab4py.graph import Graph
+from benchmarks import landscapes
+from benchmarks.fake_graphab import make_java
+
+@unittest.skipIf(os.name == "nt", "Requires a POSIX shell.")
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rows = []
+        
+        for k, threshold in enumerate([100, 200]):
+            data = landscapes.random_cluster((40, 40), .3, .5, seed = k)
+            rows.append({
+                "name" : f"land{k}",
+                "landscape" : landscapes.write(
+                    os.path.join(self.tmp.name, f"land{k}.tif"), data
+                    ),
+                "threshold" : threshold
+                })
+        
+        self.manifest = pd.DataFrame(rows)
+        self.pipeline = {
+            "project" : {"habitat" : 1},
+            "linksets" : [{"disttype" : "euclid", "linkname" : "L1",
+                           "threshold" : "{threshold}", "reuse" : False}],
+            "graphs" : [{"graphname" : "g1"}],
+            "metrics" : [{"metric" : "PC", "d" : 100, "p" : .05},
+                         {"metric" : "NC"}]
+            }
+        self.settings = {
+            "java" : make_java(self.tmp.name, "src.graphab4py"),
+            "graphab" : "fake-graphab.jar"
+            }
+        self.directory = os.path.join(self.tmp.name, "projects")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_batch(self):
+        out = os.path.join(self.tmp.name, "results.csv")
+        results = run_batch(self.manifest, self.pipeline, self.directory,
+                            cores = 2, memory = "2g", results_file = out,
+                            **self.settings)
+        
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results.attrs["failed"], {})
+        self.assertFalse(results["reused"].any())
+        self.assertTrue((results["cores"] == 1).all())
+        self.assertEqual(list(results["memory"].unique()), ["1024m"])
+        pd.testing.assert_frame_equal(pd.read_csv(out), results,
+                                      check_dtype = False)
+        
+        prj_dir = os.path.join(self.directory, "land1")
+        expected = Graph(
+            pd.read_csv(os.path.join(prj_dir, "patches.csv")),
+            pd.read_csv(os.path.join(prj_dir, "L1-links.csv")),
+            area = 40 * 40 * 100.
+            ).metric("PC", d = 100, p = .05)
+        pc = results[(results["name"] == "land1") &
+                     (results["metric"] == "PC")]
+        self.assertAlmostEqual(pc["value"].iloc[0], expected)
+        self.assertEqual(pc["parameters"].iloc[0], "d=100,p=0.05")
+        
+        # Rerun: everything is reused; a changed metric is recomputed
+        xml = os.path.join(prj_dir, "land1.xml")
+        mtime = os.stat(xml).st_mtime_ns
+        again = run_batch(self.manifest, self.pipeline, self.directory,
+                          **self.settings)
+        self.assertTrue(again["reused"].all())
+        pd.testing.assert_series_equal(again["value"], results["value"])
+        
+        self.pipeline["metrics"][1] = {"metric" : "EC", "d" : 100, "p" : .05}
+        changed = run_batch(self.manifest, self.pipeline, self.directory,
+                            **self.settings)
+        self.assertEqual(list(changed["reused"]), [True, False] * 2)
+        self.assertEqual(os.stat(xml).st_mtime_ns, mtime)
+    
+    def test_changed_linkset(self):
+        run_batch(self.manifest, self.pipeline, self.directory,
+                  **self.settings)
+        
+        # A new threshold invalidates the linkset; the project is recreated
+        # instead of adding a second linkset of the same name
+        manifest = self.manifest.assign(threshold = [100, 300])
+        results = run_batch(manifest, self.pipeline, self.directory,
+                            **self.settings)
+        
+        self.assertEqual(list(results["reused"]), [True, True, False, False])
+        
+        with open(os.path.join(self.directory, "land1", "land1.xml")) as f:
+            xml = f.read()
+        
+        self.assertEqual(xml.count("<name>L1</name>"), 1)
+        self.assertEqual(xml.count("<name>g1</name>"), 1)
+        self.assertIn("300", xml)
+    
+    def test_failure(self):
+        manifest = self.manifest.copy()
+        manifest.loc[1, "landscape"] = os.path.join(self.tmp.name, "none.tif")
+        
+        with self.assertWarns(UserWarning):
+            results = run_batch(manifest, self.pipeline, self.directory,
+                                **self.settings)
+        
+        self.assertEqual(list(results.attrs["failed"].keys()), ["land1"])
+        self.assertEqual(list(results["name"].unique()), ["land0"])
+        
+        with self.assertRaises(ValueError):
+            run_batch(self.manifest.assign(memory = "4g"), self.pipeline,
+                      self.directory, memory = "2g", **self.settings)
+
+class TestBudget(unittest.TestCase):
+    def test_budget(self):
+        budget = _Budget(4, 1000)
+        active, peak = [0, 0], threading.Lock()
+        
+        def job(cores, memory):
+            budget.acquire(cores, memory)
+            
+            with peak:
+                active[0] += cores
+                active[1] = max(active[1], active[0])
+            
+            time.sleep(.02)
+            
+            with peak:
+                active[0] -= cores
+            
+            budget.release(cores, memory)
+        
+        threads = [threading.Thread(target = job, args = (2, 400))
+                   for _ in range(6)]
+        
+        for t in threads:
+            t.start()
+        
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(active[1], 4)
+
+if __name__ == "__main__":
+    unittest.main()
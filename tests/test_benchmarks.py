@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_benchmarks
+
+Purpose
+-------
+Test the neutral landscape generators, the fake Graphab used by the
+benchmarks, and the comparison of benchmark reports.
+
+Notes
+-----
+The fake Graphab is run through Project, so the test covers the command
+lines built by graphab4py and the parsing of the outputs.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:47:19 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+import pandas as pd
+from src.graphab4py.project import Project
+from src.graphab4py.graph import Graph
+from benchmarks import landscapes
+from benchmarks.fake_graphab import make_java
+from benchmarks.suite import compare
+
+class TestLandscapes(unittest.TestCase):
+    def test_landscapes(self):
+        a = landscapes.random_cluster((120, 100), habitat = .3, seed = 1)
+        b = landscapes.random_cluster((120, 100), habitat = .3, seed = 1)
+        np.testing.assert_array_equal(a, b)
+        self.assertAlmostEqual(a.mean(), .3, delta = .15)
+        
+        c = landscapes.fractal_landscape((64, 80), habitat = .25, seed = 2)
+        self.assertAlmostEqual(c.mean(), .25, delta = .01)
+        
+        cost = landscapes.resistance(c, {0 : 10, 1 : 1}, seed = 3)
+        self.assertGreater(cost[c == 0].mean(), 5 * cost[c == 1].mean())
+
+@unittest.skipIf(os.name == "nt", "Requires a POSIX shell.")
+class TestFakeGraphab(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        data = landscapes.random_cluster((48, 48), .3, .5, seed = 4)
+        self.landscape = landscapes.write(
+            os.path.join(self.tmp.name, "landscape.tif"), data
+            )
+        self.project = Project(
+            java = make_java(self.tmp.name, "src.graphab4py"),
+            graphab = "fake-graphab.jar"
+            )
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_workflow(self):
+        prj = self.project
+        prj.create_project("prj", self.landscape, habitat = 1,
+                           directory = self.tmp.name)
+        prj.create_linkset("euclid", "L1", 200, reuse = False)
+        prj.create_graph("g1")
+        out = prj.calculate_metric("PC", d = 100, p = .05)
+        
+        prj_dir = os.path.dirname(prj.project_file)
+        patches = pd.read_csv(os.path.join(prj_dir, "patches.csv"))
+        links = pd.read_csv(os.path.join(prj_dir, "L1-links.csv"))
+        expected = Graph(patches, links, area = 48 * 48 * 100.).metric(
+            "PC", d = 100, p = .05
+            )
+        self.assertAlmostEqual(out["metric_value"], expected)
+        self.assertEqual(prj.runs[-1]["exit_code"], 0)
+        
+        delta = prj.delta_by_item("PC", select = [1, 2], d = 100, p = .05)
+        self.assertEqual(list(delta.index), [1, 2])
+        
+        loaded = Project()
+        loaded.load_project_xml(prj.project_file)
+        self.assertEqual((loaded.linksets, loaded.graphs), (["L1"], ["g1"]))
+
+class TestReports(unittest.TestCase):
+    def test_compare(self):
+        def report(times):
+            return {"results" : [{"scenario" : s, "size" : 64,
+                                  "fragmentation" : .5, "median" : t}
+                                 for s, t in times.items()]}
+        
+        rows = compare(report({"a" : 1., "b" : 1., "c" : 1.}),
+                       report({"a" : 1.5, "b" : .5, "c" : 1.05}))
+        self.assertEqual([r[-1] for r in rows], ["slower", "faster", "same"])
+
+if __name__ == "__main__":
+    unittest.main()
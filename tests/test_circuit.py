@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_circuit
+
+Purpose
+-------
+Test the effective resistance computations in graphab4py.circuit.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 17:31:44 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+import pandas as pd
+from src.graphab4py.circuit import graph_resistance, raster_resistance, \
+    _raster_laplacian
+from tests.helpers import write_raster
+
+class TestResistance(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_graph(self):
+        links = pd.DataFrame({"ID1" : [1, 2, 1, 4],
+                              "ID2" : [2, 3, 3, 5],
+                              "Dist" : [1., 2., 3., 2.]})
+        out = graph_resistance(links, n_jobs = 2, batch_size = 1)
+        
+        np.testing.assert_allclose(out["Resistance"],
+                                   [5. / 6., 4. / 3., 1.5, 2.])
+        self.assertNotIn("Resistance", links.columns)
+    
+    def test_raster_series(self):
+        labels = np.array([[1, 0, 0, 0, 0, 0, 2]], dtype = "int32")
+        cost = np.array([[1, 1, 1, 3, 1, 1, 1]], dtype = "float32")
+        patch_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost
+            )
+        links = pd.DataFrame({"ID1" : [1], "ID2" : [2], "Dist" : [8.]})
+        out = raster_resistance(patch_file, cost_file, links)
+        
+        self.assertAlmostEqual(out["Resistance"].iloc[0], 8.)
+    
+    def test_raster_pinv(self):
+        rng = np.random.default_rng(31)
+        labels = np.zeros((14, 16), dtype = "int32")
+        labels[1:3, 1:3] = 1
+        labels[10:13, 2:4] = 2
+        labels[5:7, 12:15] = 3
+        cost = rng.uniform(1, 5, labels.shape).astype("float32")
+        cost[8, :10] = -9999.
+        patch_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost, nodata = -9999.
+            )
+        links = pd.DataFrame({"ID1" : [1, 1, 2], "ID2" : [2, 3, 3]})
+        out = raster_resistance(patch_file, cost_file, links, n_jobs = 2,
+                                batch_size = 2)
+        
+        laplacian = _raster_laplacian(
+            labels, np.where(cost == -9999., np.nan, cost).astype("float64"),
+            np.array([1, 2, 3])
+            )
+        g = np.linalg.pinv(laplacian.toarray())
+        expected = [g[a, a] + g[b, b] - 2 * g[a, b]
+                    for a, b in [(0, 1), (0, 2), (1, 2)]]
+        np.testing.assert_allclose(out["Resistance"], expected, rtol = 1e-6)
+
+if __name__ == "__main__":
+    unittest.main()
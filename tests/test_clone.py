@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_clone
+
+Purpose
+-------
+Test cloning a project: rasters and cost surfaces are shared, files Graphab
+rewrites are independent copies and only the project file is renamed.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:04:37 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import xml.etree.ElementTree as ET
+from src.graphab4py.project import Project
+
+class TestClone(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        prj_dir = os.path.join(self.tmp.name, "base")
+        os.makedirs(os.path.join(prj_dir, "surfaces", "cost"))
+        files = {"base.xml" : "<Project><name>base</name><extCostFile>" +
+                 os.path.join(prj_dir, "cost-crop.tif") +
+                 "</extCostFile></Project>",
+                 "patches.tif" : "raster",
+                 "patches.csv" : "Id,Area\n1,2\n",
+                 os.path.join("surfaces", "cost", "1.npy") : "surface"}
+        
+        for name, text in files.items():
+            with open(os.path.join(prj_dir, name), "w") as f:
+                f.write(text)
+        
+        self.prj = Project(memory = "2g")
+        self.prj.name = "base"
+        self.prj.directory = self.tmp.name
+        self.prj.project_file = os.path.join(prj_dir, "base.xml")
+        self.prj.linksets = ["L1"]
+        self.cost_source = os.path.join(self.tmp.name, "cost.tif")
+        self.prj.crop = {"file" : os.path.join(prj_dir, "base-crop.tif"),
+                         "window" : (0, 0, 1, 1)}
+        self.prj.linkset_info = {
+            "L1" : {"disttype" : "cost",
+                    "cost_raster" : os.path.join(prj_dir, "cost-crop.tif"),
+                    "cost_source" : self.cost_source}
+            }
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_clone(self):
+        clone = self.prj.clone("scenario1", method = "hardlink")
+        new_dir = os.path.join(self.tmp.name, "scenario1")
+        
+        self.assertEqual(clone.project_file,
+                         os.path.join(new_dir, "scenario1.xml"))
+        self.assertEqual(clone.directory, self.tmp.name)
+        self.assertEqual(clone.settings, {"memory" : "2g"})
+        self.assertEqual(clone.linksets, ["L1"])
+        self.assertIsNot(clone.linksets, self.prj.linksets)
+        self.assertEqual(
+            ET.parse(clone.project_file).getroot().find("name").text,
+            "scenario1"
+            )
+        self.assertFalse(os.path.exists(os.path.join(new_dir, "base.xml")))
+        
+        def inode(prj, *path):
+            return os.stat(os.path.join(
+                os.path.dirname(prj.project_file), *path
+                )).st_ino
+        
+        self.assertEqual(inode(clone, "patches.tif"),
+                         inode(self.prj, "patches.tif"))
+        
+        # Paths into the project directory refer to the clone
+        self.assertEqual(clone.crop["file"],
+                         os.path.join(new_dir, "base-crop.tif"))
+        self.assertEqual(clone.linkset_info["L1"]["cost_raster"],
+                         os.path.join(new_dir, "cost-crop.tif"))
+        self.assertEqual(clone.linkset_info["L1"]["cost_source"],
+                         self.cost_source)
+        self.assertEqual(
+            ET.parse(clone.project_file).getroot().findtext("extCostFile"),
+            os.path.join(new_dir, "cost-crop.tif")
+            )
+        self.assertEqual(inode(clone, "surfaces", "cost", "1.npy"),
+                         inode(self.prj, "surfaces", "cost", "1.npy"))
+        self.assertNotEqual(inode(clone, "patches.csv"),
+                            inode(self.prj, "patches.csv"))
+        
+        with open(os.path.join(new_dir, "patches.csv"), "a") as f:
+            f.write("2,5\n")
+        
+        with open(os.path.join(self.tmp.name, "base", "patches.csv")) as f:
+            self.assertEqual(f.read(), "Id,Area\n1,2\n")
+        
+        with self.assertRaises(FileExistsError):
+            self.prj.clone("scenario1")
+    
+    def test_clone_auto(self):
+        clone = self.prj.clone("scenario2")
+        
+        with open(clone.project_file, "r") as f:
+            self.assertIn("scenario2", f.read())
+        
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(clone.project_file))),
+            ["patches.csv", "patches.tif", "scenario2.xml", "surfaces"]
+            )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_costdist
+
+Purpose
+-------
+Test the native least-cost distance engine in graphab4py.costdist.
+
+Notes
+-----
+Distances of the small fixture were computed by hand following the Graphab
+cost accumulation rule (mean cost of adjacent cells times step length).
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 14:31:10 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, math, unittest, tempfile
+import numpy as np
+from src.graphab4py.costdist import accumulated_cost, cost_links, \
+    CostSurfaceStore
+from src.graphab4py.project import Project
+from tests.helpers import write_raster, read_raster
+
+class TestCostLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_fixture(self):
+        labels = np.zeros((5, 9), dtype = "int32")
+        labels[1:4, 1] = 1
+        labels[1:4, 6] = 2
+        labels[0, 8] = 3
+        cost = np.ones((5, 9), dtype = "float32")
+        cost[:, 4] = 2.
+        cost[:, 7] = -9999.
+        patch_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost, nodata = -9999.
+            )
+        
+        links = cost_links(patch_file, cost_file, 10, n_jobs = 2)
+        links = links.set_index(["ID1", "ID2"])
+        
+        # 1 -> 2: five horizontal steps, two of them touching the cost 2 column
+        self.assertAlmostEqual(links.loc[(1, 2), "Dist"], 6.)
+        self.assertAlmostEqual(links.loc[(1, 2), "DistM"], 50.)
+        
+        # 2 -> 3: around the NoData column is impossible, hence no link
+        self.assertNotIn((2, 3), links.index)
+        self.assertNotIn((1, 3), links.index)
+        
+        links = cost_links(patch_file, cost_file, 5.5, n_jobs = 1)
+        self.assertEqual(len(links), 0)
+    
+    def test_windowed_equals_global(self):
+        rng = np.random.default_rng(7)
+        labels = np.zeros((48, 52), dtype = "int32")
+        
+        for pid in range(1, 13):
+            r, c = rng.integers(0, 46), rng.integers(0, 50)
+            labels[r:r + 2, c:c + 2] = pid
+        
+        cost = rng.uniform(1, 10, labels.shape).astype("float32")
+        patch_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost
+            )
+        threshold = 60.
+        links = cost_links(
+            patch_file, cost_file, threshold, n_jobs = 3, block_size = 16
+            )
+        links = links.set_index(["ID1", "ID2"])
+        expected = {}
+        
+        for pid in np.unique(labels[labels > 0]):
+            dist, _ = accumulated_cost(labels == pid, cost, threshold, res = 10)
+            
+            for other in np.unique(labels[labels > pid]):
+                d = dist[labels == other].min()
+                
+                if math.isfinite(d):
+                    expected[(pid, other)] = d
+        
+        self.assertEqual(sorted(links.index), sorted(expected.keys()))
+        
+        for key, d in expected.items():
+            self.assertAlmostEqual(links.loc[key, "Dist"], d, places = 4)
+            self.assertGreaterEqual(links.loc[key, "DistM"], 10.)
+
+class TestCostSurfaceStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(11)
+        labels = np.zeros((40, 44), dtype = "int32")
+        
+        for pid in range(1, 9):
+            r, c = rng.integers(0, 38), rng.integers(0, 42)
+            labels[r:r + 2, c:c + 2] = pid
+        
+        self.patch_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        self.cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"),
+            rng.uniform(1, 5, labels.shape).astype("float32")
+            )
+        self.store_dir = os.path.join(self.tmp.name, "store")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_lower_threshold_reuse(self):
+        store = CostSurfaceStore(self.store_dir, self.cost_file)
+        computed = store.build(self.patch_file, 40, n_jobs = 2)
+        self.assertEqual(computed, list(range(1, 9)))
+        
+        # Reopened store is reused for a lower threshold
+        store = CostSurfaceStore(self.store_dir, self.cost_file)
+        self.assertEqual(store.build(self.patch_file, 25), [])
+        surface, window, threshold = store.get(1)
+        self.assertIsInstance(surface, np.memmap)
+        self.assertEqual(surface.shape[1:], window[2:])
+        self.assertEqual(threshold, 40.)
+        
+        stored = cost_links(self.patch_file, self.cost_file, 25,
+                            store = store)
+        direct = cost_links(self.patch_file, self.cost_file, 25, n_jobs = 2)
+        self.assertGreater(len(direct), 0)
+        np.testing.assert_array_equal(stored[["ID1", "ID2"]],
+                                      direct[["ID1", "ID2"]])
+        np.testing.assert_allclose(stored["Dist"], direct["Dist"],
+                                   rtol = 1e-6)
+        
+        # A higher threshold requires recomputation
+        self.assertEqual(len(store.build(self.patch_file, 50, ids = [3])), 1)
+    
+    def test_compressed_and_invalidation(self):
+        store = CostSurfaceStore(self.store_dir, self.cost_file,
+                                 compress = True)
+        store.build(self.patch_file, 20, n_jobs = 1)
+        self.assertTrue(store.surfaces[1]["file"].endswith(".npz"))
+        self.assertEqual(store.get(1)[0].shape[0], 2)
+        
+        write_raster(self.cost_file, np.ones((40, 44), dtype = "float32"))
+        os.utime(self.cost_file, (0, 0))
+        store = CostSurfaceStore(self.store_dir, self.cost_file)
+        self.assertEqual(store.surfaces, {})
+        self.assertEqual(os.listdir(self.store_dir), ["index.json"])
+    
+    def test_patch_invalidation(self):
+        store = CostSurfaceStore(self.store_dir, self.cost_file)
+        store.build(self.patch_file, 20, n_jobs = 1)
+        self.assertEqual(store.build(self.patch_file, 20), [])
+        
+        labels = np.zeros((40, 44), dtype = "int32")
+        labels[5:7, 5:7] = 1
+        labels[5:7, 10:12] = 2
+        write_raster(self.patch_file, labels)
+        os.utime(self.patch_file, (0, 0))
+        store = CostSurfaceStore(self.store_dir, self.cost_file)
+        self.assertEqual(store.build(self.patch_file, 20, n_jobs = 1), [1, 2])
+        self.assertEqual(sorted(store.surfaces.keys()), [1, 2])
+
+class TestCorridors(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(self.prj_dir)
+        rng = np.random.default_rng(19)
+        labels = np.zeros((36, 40), dtype = "int32")
+        
+        for pid in range(1, 7):
+            r, c = rng.integers(0, 34), rng.integers(0, 38)
+            labels[r:r + 2, c:c + 2] = pid
+        
+        self.labels = labels
+        self.cost = rng.uniform(1, 4, labels.shape).astype("float32")
+        write_raster(os.path.join(self.prj_dir, "patches.tif"), labels)
+        self.cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), self.cost
+            )
+        self.project = Project()
+        self.project.project_file = os.path.join(self.prj_dir, "prj.xml")
+        self.project.linkset_info = {
+            "L1" : {"disttype" : "cost", "threshold" : 60,
+                    "complete" : True, "cost_raster" : self.cost_file}
+            }
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def expected(self, pairs, width):
+        count = np.zeros(self.labels.shape, dtype = "int32")
+        
+        for a, b in pairs:
+            da, _ = accumulated_cost(self.labels == a, self.cost)
+            db, _ = accumulated_cost(self.labels == b, self.cost)
+            d = da[self.labels == b].min()
+            count += (da + db - d <= width)
+        
+        return count
+    
+    def test_corridors(self):
+        out = self.project.corridors("L1", width = 3, n_jobs = 3,
+                                     block_size = 16)
+        links = cost_links(os.path.join(self.prj_dir, "patches.tif"),
+                           self.cost_file, 60)
+        self.assertGreater(len(links), 1)
+        count, _ = read_raster(out)
+        expected = self.expected(zip(links["ID1"], links["ID2"]), 3)
+        
+        # Tolerate cells at the float32 precision limit of stored surfaces
+        self.assertLessEqual(np.count_nonzero(count != expected), 2)
+        stores = os.listdir(os.path.join(self.prj_dir, "surfaces"))
+        self.assertEqual(len(stores), 1)
+        self.assertTrue(stores[0].startswith("cost-"))
+        
+        # A cost raster with the same name elsewhere gets its own store
+        other = os.path.join(self.tmp.name, "other")
+        os.makedirs(other)
+        self.assertNotEqual(
+            self.project._surface_store(self.cost_file).directory,
+            self.project._surface_store(
+                write_raster(os.path.join(other, "cost.tif"), self.cost)
+                ).directory
+            )
+    
+    def test_xml_linkset(self):
+        # Linksets of a loaded project are only described by the XML
+        with open(self.project.project_file, "w") as f:
+            f.write("<Project><costLinks><entry><string>L2</string>" +
+                    "<Linkset><name>L2</name><type>1</type>" +
+                    "<type_dist>2</type_dist><distMax>60.0</distMax>" +
+                    f"<extCostFile>{self.cost_file}</extCostFile>" +
+                    "</Linkset></entry></costLinks></Project>")
+        
+        self.project.linkset_info = {}
+        out = self.project.corridors("L2", width = 3)
+        links = cost_links(os.path.join(self.prj_dir, "patches.tif"),
+                           self.cost_file, 60)
+        count, _ = read_raster(out)
+        expected = self.expected(zip(links["ID1"], links["ID2"]), 3)
+        self.assertLessEqual(np.count_nonzero(count != expected), 2)
+    
+    def test_selected_links(self):
+        links = cost_links(os.path.join(self.prj_dir, "patches.tif"),
+                           self.cost_file, 60)
+        pair = (int(links["ID2"].iloc[0]), int(links["ID1"].iloc[0]))
+        out = self.project.corridors(
+            "L1", links = [pair], out_file = os.path.join(
+                self.tmp.name, "one.tif"
+                ), value = "cost"
+            )
+        cost, _ = read_raster(out)
+        inside = cost >= 0
+        self.assertTrue(np.all(inside == (self.expected([pair], 1e-4) > 0)))
+        np.testing.assert_allclose(cost[inside], links["Dist"].iloc[0],
+                                   rtol = 1e-5)
+        
+        with self.assertRaises(KeyError):
+            self.project.corridors("L1", links = [(1, 1000)])
+
+if __name__ == "__main__":
+    unittest.main()
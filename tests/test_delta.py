@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_delta
+
+Purpose
+-------
+Test how delta analyses pass large selections to Graphab and merge the
+output of sharded runs.
+
+Notes
+-----
+Graphab is replaced by a stand-in that records its arguments and writes a
+delta output file for the selected items.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 17:58:12 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, json, threading, unittest, tempfile
+import pandas as pd
+from src.graphab4py.project import Project, _split_memory
+
+class _GraphabStandIn(Project):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.lock = threading.Lock()
+        self.fail_at = None
+    
+    def _base_call(self, java = None, memory = None, cores = None,
+                   graphab = None, **kwargs):
+        settings = kwargs["delta"]
+        sel = [s[4:].split(",") for s in settings if s.startswith("sel=")]
+        fsel = [s[5:] for s in settings if s.startswith("fsel=")]
+        
+        if len(fsel) > 0:
+            with open(fsel[0], "r") as f:
+                sel = [[l.strip() for l in f if l.strip() != ""]]
+        
+        if self.fail_at is not None and len(self.calls) == self.fail_at:
+            raise Exception("Graphab stopped.")
+        
+        with self.lock:
+            self.calls.append({"project" : kwargs["project"],
+                               "cores" : cores, "memory" : memory,
+                               "settings" : settings, "items" : sel[0]})
+        
+        pd.DataFrame({"Id" : [int(i) for i in sel[0]],
+                      "d_PC" : [int(i) / 10 for i in sel[0]]}).to_csv(
+            os.path.join(os.path.dirname(kwargs["project"]),
+                         "delta-PC_g1.txt"), sep = "\t", index = False
+            )
+        
+        return "", ""
+
+class TestDelta(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(prj_dir)
+        
+        with open(os.path.join(prj_dir, "prj.xml"), "w") as f:
+            f.write("<Project/>")
+        
+        pd.DataFrame({"Id" : range(1, 2501)}).to_csv(
+            os.path.join(prj_dir, "patches.csv"), index = False
+            )
+        self.prj_dir = prj_dir
+        self.project = _GraphabStandIn()
+        self.project.name = "prj"
+        self.project.project_file = os.path.join(prj_dir, "prj.xml")
+        self.project.linksets = ["L1"]
+        self.project.graphs = ["g1"]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_spill_selection(self):
+        delta = self.project.delta_by_item("PC", select = [1, 2, 3],
+                                           d = 1000, p = .05)
+        self.assertIn("sel=1,2,3", self.project.calls[-1]["settings"])
+        self.assertEqual(list(delta.index), [1, 2, 3])
+        self.assertEqual(delta["d_PC"].dtype, "float64")
+        
+        self.project.delta_by_item("PC", select = range(1, 2001), d = 1000,
+                                   p = .05)
+        call = self.project.calls[-1]
+        self.assertTrue(any(s.startswith("fsel=") for s in call["settings"]))
+        self.assertEqual(len(call["items"]), 2000)
+        self.assertEqual(sorted(os.listdir(self.prj_dir)),
+                         ["delta-PC_g1.txt", "patches.csv", "prj.xml"])
+    
+    def test_shards(self):
+        with open(os.path.join(self.prj_dir, "delta-PC_g1.txt"), "w") as f:
+            f.write("Id\td_PC\n")
+        
+        self.project.delta_by_item("PC", shards = 3, d = 1000, p = .05,
+                                   cores = 6, memory = "12g")
+        
+        self.assertEqual(len(self.project.calls), 3)
+        
+        for call in self.project.calls:
+            self.assertNotEqual(os.path.dirname(call["project"]),
+                                self.prj_dir)
+            self.assertEqual(call["cores"], 2)
+            self.assertEqual(call["memory"], "4096m")
+        
+        merged = pd.read_csv(os.path.join(self.prj_dir, "delta-PC_g1.txt"),
+                             sep = "\t")
+        self.assertEqual(sorted(merged["Id"]), list(range(1, 2501)))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["prj"])
+    
+    def test_shards_after_chunks(self):
+        self.project.delta_by_chunks("PC", select = range(1, 401),
+                                     chunk_size = 200, shards = 2,
+                                     d = 1000, p = .05)
+        self.project.delta_by_item("PC", select = range(1, 101), shards = 2,
+                                   d = 1000, p = .05)
+        
+        self.assertEqual(len(self.project.calls), 6)
+        self.assertTrue(os.path.isfile(os.path.join(
+            self.prj_dir, "runs", "delta-PC", "manifest.json"
+            )))
+        merged = pd.read_csv(os.path.join(self.prj_dir, "delta-PC_g1.txt"),
+                             sep = "\t")
+        self.assertEqual(sorted(merged["Id"]), list(range(1, 101)))
+    
+    def test_chunks_resume(self):
+        run_dir = os.path.join(self.tmp.name, "run")
+        self.project.fail_at = 2
+        
+        with self.assertRaises(Exception):
+            self.project.delta_by_chunks("PC", select = range(1, 1001),
+                                         chunk_size = 300, run_dir = run_dir,
+                                         d = 1000, p = .05)
+        
+        # Cut the last row as an interrupted append would
+        results_file = os.path.join(run_dir, "results.txt")
+        
+        with open(results_file, "rb+") as f:
+            f.truncate(os.path.getsize(results_file) - 3)
+        
+        self.project.fail_at = None
+        results = self.project.delta_by_chunks(
+            "PC", select = range(1, 1001), chunk_size = 300,
+            run_dir = run_dir, d = 1000, p = .05
+            )
+        
+        self.assertEqual(len(self.project.calls), 4)
+        self.assertEqual(self.project.calls[2]["items"][0], "600")
+        self.assertEqual(len(self.project.calls[2]["items"]), 300)
+        self.assertEqual(list(results.index), list(range(1, 1001)))
+        self.assertFalse(results.isna().any().any())
+        
+        with open(os.path.join(run_dir, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        
+        self.assertEqual(manifest["completed"], 1000)
+        self.assertEqual(manifest["eta"], 0)
+        self.assertEqual(len(manifest["chunks"]), 4)
+        
+        with self.assertRaises(ValueError):
+            self.project.delta_by_chunks("PC", select = range(1, 1001),
+                                         run_dir = run_dir, d = 500, p = .05)
+    
+    def test_split_memory(self):
+        self.assertEqual(_split_memory("2g", 4), "512m")
+        self.assertEqual(_split_memory("1000m", 3), "333m")
+        self.assertIsNone(_split_memory(None, 3))
+
+if __name__ == "__main__":
+    unittest.main()
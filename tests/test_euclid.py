@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_euclid
+
+Purpose
+-------
+Test the native euclidean linkset builder in graphab4py.euclid against
+brute-force edge-to-edge distances.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 16:40:02 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from src.graphab4py.euclid import euclid_links
+from tests.helpers import write_raster, euclid_links as brute_links
+
+class TestEuclidLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(29)
+        habitat = rng.random((50, 47)) < .08
+        habitat[20:26, 10:18] = True
+        labels, _ = ndimage.label(habitat, structure = np.ones((3, 3)))
+        self.labels = labels.astype("int32")
+        self.file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), self.labels
+            )
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_complete(self):
+        links = euclid_links(self.file, 45., n_jobs = 2, block_size = 16)
+        ref = brute_links(self.labels, 10., 45.).reset_index(drop = True)
+        
+        self.assertGreater(len(ref), 0)
+        np.testing.assert_array_equal(links[["ID1", "ID2"]],
+                                      ref[["ID1", "ID2"]])
+        np.testing.assert_allclose(links["Dist"], ref["Dist"])
+        np.testing.assert_allclose(links["DistM"], ref["Dist"])
+    
+    def test_planar(self):
+        links = euclid_links(self.file, planar = True, n_jobs = 2)
+        ref = brute_links(self.labels, 10., np.inf).set_index(["ID1", "ID2"])
+        
+        for id1, id2, dist in zip(links["ID1"], links["ID2"], links["Dist"]):
+            self.assertAlmostEqual(dist, ref.loc[(id1, id2), "Dist"])
+        
+        # The planar graph connects all patches with fewer links
+        n = self.labels.max()
+        adjacency = coo_matrix(
+            (np.ones(len(links)), (links["ID1"] - 1, links["ID2"] - 1)),
+            shape = (n, n)
+            )
+        self.assertEqual(connected_components(adjacency)[0], 1)
+        self.assertLess(len(links), len(ref))
+
+if __name__ == "__main__":
+    unittest.main()
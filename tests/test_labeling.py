@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_labeling
+
+Purpose
+-------
+Test the block-wise patch extraction provided in graphab4py.labeling.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 13:28:40 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+from scipy import ndimage
+from src.graphab4py.labeling import label_patches, compare_patches
+from tests.helpers import write_raster, read_raster
+
+class TestLabelPatches(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        self.landscape = rng.integers(0, 3, (53, 47)).astype("int16")
+        self.file = write_raster(
+            os.path.join(self.tmp.name, "landscape.tif"), self.landscape
+            )
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def _reference(self, mask, connexity):
+        structure = np.ones((3, 3)) if connexity == 8 else None
+        labels, _ = ndimage.label(mask, structure = structure)
+        ref = write_raster(
+            os.path.join(self.tmp.name, f"ref{connexity}.tif"),
+            labels.astype("int32")
+            )
+        
+        return labels, ref
+    
+    def test_blockwise_equals_in_memory(self):
+        for connexity in [4, 8]:
+            table, out = label_patches(
+                self.file, [1, 2], connexity = connexity, block_size = 8,
+                out_file = os.path.join(self.tmp.name, f"p{connexity}.tif")
+                )
+            labels, ref = self._reference(self.landscape > 0, connexity)
+            report = compare_patches(out, ref, block_size = 8)
+            
+            self.assertTrue(report["identical"], report)
+            self.assertEqual(len(table), labels.max())
+            self.assertEqual(table["ncells"].sum(), (labels > 0).sum())
+    
+    def test_nomerge(self):
+        _, out = label_patches(
+            self.file, "1,2", nomerge = True, block_size = 8,
+            out_file = os.path.join(self.tmp.name, "nomerge.tif")
+            )
+        labels, _ = read_raster(out)
+        ref1, n1 = ndimage.label(self.landscape == 1, np.ones((3, 3)))
+        ref2, n2 = ndimage.label(self.landscape == 2, np.ones((3, 3)))
+        
+        self.assertEqual(labels.max(), n1 + n2)
+    
+    def test_minarea_maxsize_and_attributes(self):
+        landscape = np.zeros((30, 30), dtype = "int16")
+        landscape[2:4, 2:5] = 1
+        landscape[10:30, 10:30] = 1
+        landscape[0, 29] = 1
+        file = write_raster(
+            os.path.join(self.tmp.name, "simple.tif"), landscape, res = 10.
+            )
+        
+        table, out = label_patches(
+            file, 1, minarea = .05, block_size = 7,
+            out_file = os.path.join(self.tmp.name, "simple-patches.tif")
+            )
+        self.assertEqual(len(table), 2)
+        small = table.iloc[0]
+        self.assertEqual(small["Area"], 600.)
+        self.assertEqual(small["Perim"], 100.)
+        self.assertEqual(
+            (small["row_min"], small["row_max"], small["col_min"],
+             small["col_max"]), (2, 3, 2, 4)
+            )
+        self.assertAlmostEqual(small["x"], 1035.)
+        self.assertAlmostEqual(small["y"], 1970.)
+        
+        # 200 m x 200 m patch split along a 100 m grid
+        table, _ = label_patches(
+            file, 1, minarea = .05, maxsize = 1, block_size = 7,
+            out_file = os.path.join(self.tmp.name, "split-patches.tif")
+            )
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table["Area"].sum(), 600. + 40000.)
+        self.assertTrue((table["Area"] <= 10000.).all())
+
+if __name__ == "__main__":
+    unittest.main()
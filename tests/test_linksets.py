@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_linksets
+
+Purpose
+-------
+Test the reuse of existing linksets when creating linksets with a different
+threshold.
+
+Notes
+-----
+The project XML is a minimal stand-in for a Graphab project, so that the
+tests run without Java.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 15:48:20 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+from src.graphab4py.project import Project
+from src.graphab4py.costdist import cost_links
+from tests.helpers import write_raster, read_raster, euclid_links
+
+_xml = """<Project>
+  <name>prj</name>
+  <costLinks>
+    <entry>
+      <string>G1</string>
+      <Linkset>
+        <name>G1</name>
+        <type>1</type>
+        <type_dist>1</type_dist>
+        <distMax>100.0</distMax>
+      </Linkset>
+    </entry>
+  </costLinks>
+</Project>
+"""
+
+class TestLinksetReuse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(self.prj_dir)
+        rng = np.random.default_rng(23)
+        labels = np.zeros((40, 44), dtype = "int32")
+        
+        for pid in range(1, 9):
+            r, c = rng.integers(0, 38), rng.integers(0, 42)
+            labels[r:r + 2, c:c + 2] = pid
+        
+        self.patch_file = write_raster(
+            os.path.join(self.prj_dir, "patches.tif"), labels
+            )
+        self.cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"),
+            rng.uniform(1, 5, labels.shape).astype("float32")
+            )
+        
+        with open(os.path.join(self.prj_dir, "prj.xml"), "w") as f:
+            f.write(_xml)
+        
+        pd.DataFrame({"ID1" : [1, 1, 2], "ID2" : [2, 3, 3],
+                      "Dist" : [20., 60., 90.], "DistM" : [20., 60., 90.]}
+                     ).to_csv(os.path.join(self.prj_dir, "G1-links.csv"),
+                              index = False)
+        
+        self.project = Project()
+        self.project.project_file = os.path.join(self.prj_dir, "prj.xml")
+        self.project.linksets = ["G1"]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_lower_threshold(self):
+        self.project.create_linkset("euclid", "G2", 60, reuse = True)
+        
+        links = pd.read_csv(os.path.join(self.prj_dir, "G2-links.csv"))
+        self.assertEqual(list(links["Dist"]), [20., 60.])
+        self.assertEqual(self.project.linksets, ["G1", "G2"])
+        
+        params = self.project._linkset_params()
+        self.assertEqual(params["G2"]["threshold"], 60)
+        root = ET.parse(self.project.project_file).getroot()
+        names = [e.findtext("Linkset/name") for e in
+                 root.find("costLinks").findall("entry")]
+        self.assertEqual(names, ["G1", "G2"])
+    
+    def test_native_thresholds(self):
+        self.project.create_linkset("cost", "N1", 20, cost_raster =
+                                    self.cost_file, native = True)
+        self.project.create_linkset("cost", "N2", 45, cost_raster =
+                                    self.cost_file, native = True)
+        self.project.create_linkset("cost", "N3", 30, cost_raster =
+                                    self.cost_file, native = True)
+        
+        self.assertEqual(self.project.linksets, ["G1"])
+        
+        for name, threshold in [("N2", 45), ("N3", 30)]:
+            links = pd.read_csv(os.path.join(self.prj_dir,
+                                             name + "-links.csv"))
+            expected = cost_links(self.patch_file, self.cost_file, threshold)
+            self.assertGreater(len(expected), 0)
+            np.testing.assert_array_equal(links[["ID1", "ID2"]],
+                                          expected[["ID1", "ID2"]])
+            np.testing.assert_allclose(links["Dist"], expected["Dist"],
+                                       rtol = 1e-6)
+        
+        # N2 extended the surfaces of N1, so only one file per patch is kept
+        files = os.listdir(
+            self.project._surface_store(self.cost_file).directory
+            )
+        self.assertEqual(len([f for f in files if f.endswith(".npy")]), 8)
+
+    def test_native_cropped(self):
+        # Cost raster on the grid of the landscape before cropping
+        cost, _ = read_raster(self.cost_file)
+        large = np.ones((50, 54), dtype = "float32")
+        large[5:45, 5:49] = cost
+        source = write_raster(os.path.join(self.tmp.name, "large.tif"),
+                              large, origin = (950., 2050.))
+        self.project.crop = {"window" : (5, 5, 44, 40), "shape" : (50, 54),
+                             "transform" : (10., 0., 950., 0., -10., 2050.),
+                             "offset" : (50., -50.)}
+        
+        for name, threshold in [("N1", 20), ("N2", 45)]:
+            self.project.create_linkset("cost", name, threshold,
+                                        cost_raster = source, native = True)
+            links = pd.read_csv(os.path.join(self.prj_dir,
+                                             name + "-links.csv"))
+            expected = cost_links(self.patch_file, self.cost_file, threshold)
+            np.testing.assert_array_equal(links[["ID1", "ID2"]],
+                                          expected[["ID1", "ID2"]])
+        
+        # Both linksets use one cropped raster and one surface store
+        crops = [f for f in os.listdir(self.prj_dir)
+                 if f.endswith("-cost-crop.tif")]
+        self.assertEqual(len(crops), 1)
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.prj_dir, "surfaces"))), 1
+            )
+        store = self.project._surface_store(
+            os.path.join(self.prj_dir, crops[0]), source
+            )
+        self.assertEqual(len(store.surfaces), 8)
+        self.assertEqual(store.build(self.patch_file, 45), [])
+    
+    def test_native_euclid(self):
+        self.project.create_linkset("euclid", "E1", 150, native = True)
+        self.project.create_linkset("euclid", "E2", 120, native = True)
+        labels, _ = read_raster(self.patch_file)
+        
+        for name, threshold in [("E1", 150), ("E2", 120)]:
+            links = pd.read_csv(os.path.join(self.prj_dir,
+                                             name + "-links.csv"))
+            expected = euclid_links(labels, 10., threshold)
+            np.testing.assert_array_equal(links[["ID1", "ID2"]],
+                                          expected[["ID1", "ID2"]])
+            np.testing.assert_allclose(links["Dist"], expected["Dist"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_optimize
+
+Purpose
+-------
+Test greedy patch and link selection against a naive greedy search that
+recomputes the metric of every candidate in each step.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 23:12:08 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import unittest
+import numpy as np
+import pandas as pd
+from src.graphab4py.graph import Graph
+from src.graphab4py.optimize import greedy_selection
+
+class TestGreedySelection(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 30
+        xy = rng.random((n, 2)) * 1000
+        self.patches = pd.DataFrame({"Id" : np.arange(1, n + 1),
+                                     "Area" : rng.random(n) * 50 + 1})
+        self.links = self._links(self.patches["Id"], xy, 180.)
+        self.graph = Graph(self.patches, self.links, area = 1e6)
+        
+        m = 12
+        cand_xy = rng.random((m, 2)) * 1000
+        self.candidates = pd.DataFrame({"Id" : np.arange(101, 101 + m),
+                                        "Area" : rng.random(m) * 50 + 1})
+        self.cand_links = self._links(
+            np.r_[self.patches["Id"], self.candidates["Id"]],
+            np.r_[xy, cand_xy], 180.
+            )
+        self.cand_links = self.cand_links[
+            self.cand_links["ID2"] > 100
+            ].reset_index(drop = True)
+        self.args = {"metric" : "PC", "d" : 200, "p" : .5}
+    
+    def _links(self, ids, xy, threshold):
+        ids = np.asarray(ids)
+        dist = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(axis = -1))
+        i, j = np.nonzero(np.triu(dist <= threshold, 1))
+        
+        return pd.DataFrame({"ID1" : ids[i], "ID2" : ids[j],
+                             "Dist" : dist[i, j]})
+    
+    def _naive_remove(self, k):
+        removed, values = [], []
+        
+        for step in range(k):
+            best = None
+            
+            for pid in self.patches["Id"]:
+                if pid in removed:
+                    continue
+                
+                value = self.graph.scenario(remove = removed + [pid]).metric(
+                    "PC", d = 200, p = .5
+                    )
+                
+                if best is None or value < best[1]:
+                    best = (pid, value)
+            
+            removed.append(best[0])
+            values.append(best[1])
+        
+        return removed, values
+    
+    def test_remove(self):
+        removed, values = self._naive_remove(4)
+        plain = greedy_selection(self.graph, 4, mode = "remove", lazy = False,
+                                 **self.args)
+        lazy = greedy_selection(self.graph, 4, mode = "remove", n_jobs = 1,
+                                **self.args)
+        
+        self.assertEqual(list(plain["Item"]), removed)
+        np.testing.assert_allclose(plain["PC"], values)
+        self.assertEqual(list(lazy["Item"]), removed)
+        self.assertLessEqual(lazy["Evaluations"].sum(),
+                             plain["Evaluations"].sum())
+        self.assertAlmostEqual(
+            lazy.attrs["initial"], self.graph.metric("PC", d = 200, p = .5)
+            )
+        np.testing.assert_allclose(
+            lazy["Gain"], -np.diff(np.r_[lazy.attrs["initial"], lazy["PC"]])
+            )
+    
+    def test_add(self):
+        selection = greedy_selection(
+            self.graph, 3, mode = "add", candidates = self.candidates,
+            links = self.cand_links, lazy = False, **self.args
+            )
+        selected = list(selection["Item"])
+        table = self.candidates[self.candidates["Id"].isin(selected)]
+        links = self.cand_links[
+            self.cand_links["ID1"].isin(list(self.patches["Id"]) + selected) &
+            self.cand_links["ID2"].isin(selected)
+            ]
+        expected = self.graph.scenario(add = table, links = links).metric(
+            "PC", d = 200, p = .5
+            )
+        
+        self.assertAlmostEqual(selection["PC"].iloc[-1], expected)
+        self.assertTrue((selection["Gain"] > 0).all())
+        
+        # The first selection is the best single candidate
+        single = [self.graph.scenario(
+            add = self.candidates[self.candidates["Id"] == c],
+            links = self.cand_links[(self.cand_links["ID2"] == c) &
+                                    (self.cand_links["ID1"] < 100)]
+            ).metric("PC", d = 200, p = .5) for c in self.candidates["Id"]]
+        self.assertEqual(selected[0],
+                         self.candidates["Id"].iloc[int(np.argmax(single))])
+    
+    def test_links(self):
+        candidates = pd.DataFrame({"ID1" : [1, 2, 3], "ID2" : [4, 5, 6],
+                                   "Dist" : [10., 10., 10.]})
+        selection = greedy_selection(self.graph, 2, mode = "links",
+                                     candidates = candidates, **self.args)
+        
+        self.assertEqual(list(selection.columns),
+                         ["Item", "Gain", "PC", "Evaluations", "ID1", "ID2",
+                          "Dist"])
+        
+        with self.assertRaises(ValueError):
+            greedy_selection(self.graph, 2, mode = "links", **self.args)
+
+if __name__ == "__main__":
+    unittest.main()
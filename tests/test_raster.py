@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_raster
+
+Purpose
+-------
+Test the raster utilities provided in graphab4py.raster.
+
+Notes
+-----
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 10:04:51 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+from src.graphab4py.raster import crop_to_habitat, crop_like, \
+    link_search_buffer, zonal_stats, reclassify, build_cost_rasters
+from tests.helpers import write_raster, read_raster
+
+class TestCrop(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.landscape = np.zeros((40, 50), dtype = "int16")
+        self.landscape[12:15, 20:23] = 1
+        self.landscape[30, 35] = 1
+        self.landscape[5, 5] = 2
+        self.file = write_raster(
+            os.path.join(self.tmp.name, "landscape.tif"), self.landscape
+            )
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_crop_to_habitat(self):
+        out = os.path.join(self.tmp.name, "crop.tif")
+        crop = crop_to_habitat(self.file, 1, out, buffer = 20, block_size = 7)
+        
+        self.assertEqual(crop["window"], (18, 10, 20, 23))
+        self.assertEqual(crop["offset"], (180., -100.))
+        
+        data, transform = read_raster(out)
+        np.testing.assert_array_equal(data, self.landscape[10:33, 18:38])
+        self.assertEqual((transform.c, transform.f), (1180., 1900.))
+    
+    def test_crop_like(self):
+        crop = crop_to_habitat(
+            self.file, [1, 2], os.path.join(self.tmp.name, "crop.tif"),
+            block_size = 16
+            )
+        cost = np.arange(40 * 50, dtype = "float32").reshape(40, 50)
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost
+            )
+        out = crop_like(
+            cost_file, crop, os.path.join(self.tmp.name, "cost_crop.tif")
+            )
+        data, _ = read_raster(out)
+        np.testing.assert_array_equal(data, cost[5:31, 5:36])
+        
+        # Rasters on the cropped grid are used as they are
+        self.assertEqual(crop_like(out, crop, out + ".tif"), out)
+        
+        with self.assertRaises(ValueError):
+            crop_like(write_raster(os.path.join(self.tmp.name, "other.tif"),
+                                   cost[:30]), crop,
+                      os.path.join(self.tmp.name, "other_crop.tif"))
+    
+    def test_link_search_buffer(self):
+        cost = np.full((10, 10), 4., dtype = "float32")
+        cost[0, 0] = 2.
+        cost_file = write_raster(
+            os.path.join(self.tmp.name, "cost.tif"), cost
+            )
+        
+        self.assertEqual(link_search_buffer(500), 500.)
+        self.assertEqual(
+            link_search_buffer(9, "cost", cost_file, block_size = 3), 50.
+            )
+
+class TestZonalStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_zonal_stats(self):
+        rng = np.random.default_rng(3)
+        labels = rng.integers(0, 6, (37, 41)).astype("int32")
+        labels[labels == 4] = 0
+        values = rng.random((37, 41)).astype("float32")
+        values[0, :5] = -9999.
+        label_file = write_raster(
+            os.path.join(self.tmp.name, "patches.tif"), labels
+            )
+        value_file = write_raster(
+            os.path.join(self.tmp.name, "values.tif"), values,
+            nodata = -9999.
+            )
+        
+        table = zonal_stats(
+            label_file, value_file,
+            stats = ["count", "sum", "mean", "min", "max", "std"],
+            n_jobs = 3, block_size = 8
+            )
+        
+        self.assertEqual(list(table.index), [1, 2, 3, 5])
+        
+        for pid in table.index:
+            v = values[(labels == pid) & (values != -9999.)].astype("float64")
+            row = table.loc[pid]
+            self.assertEqual(row["count"], v.size)
+            self.assertAlmostEqual(row["sum"], v.sum(), places = 4)
+            self.assertAlmostEqual(row["mean"], v.mean(), places = 6)
+            self.assertAlmostEqual(row["min"], v.min())
+            self.assertAlmostEqual(row["max"], v.max())
+            self.assertAlmostEqual(row["std"], v.std(), places = 6)
+    
+    def test_misaligned(self):
+        a = write_raster(os.path.join(self.tmp.name, "a.tif"),
+                         np.zeros((5, 5), dtype = "int32"))
+        b = write_raster(os.path.join(self.tmp.name, "b.tif"),
+                         np.zeros((5, 6), dtype = "float32"))
+        
+        with self.assertRaises(ValueError):
+            zonal_stats(a, b)
+
+class TestCostRasters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_build_cost_rasters(self):
+        rng = np.random.default_rng(5)
+        landcover = rng.integers(1, 5, (45, 38)).astype("int16")
+        landcover[0, 0] = 0
+        slope = rng.random((45, 38)).astype("float32") * 30
+        lc_file = write_raster(
+            os.path.join(self.tmp.name, "lc.tif"), landcover, nodata = 0
+            )
+        slope_file = write_raster(
+            os.path.join(self.tmp.name, "slope.tif"), slope
+            )
+        t1 = {1 : 1, 2 : 10, 3 : 100, 4 : 1000}
+        t2 = {1 : 5, 2 : 5, 3 : 50}
+        out1 = os.path.join(self.tmp.name, "c1.tif")
+        out2 = os.path.join(self.tmp.name, "c2.tif")
+        out3 = os.path.join(self.tmp.name, "c3.tif")
+        
+        build_cost_rasters(
+            {"lc" : lc_file, "slope" : slope_file},
+            {out1 : t1,
+             out2 : t2,
+             out3 : lambda b: reclassify(b["lc"], t1) * (1 + b["slope"] / 10)},
+            n_jobs = 4, block_size = 16
+            )
+        
+        c1, _ = read_raster(out1)
+        c2, _ = read_raster(out2)
+        c3, _ = read_raster(out3)
+        expected1 = reclassify(landcover, t1, default = -9999.)
+        expected2 = reclassify(landcover, t2, default = -9999.)
+        expected1[0, 0] = expected2[0, 0] = -9999.
+        expected3 = np.where(
+            expected1 > 0, expected1 * (1 + slope.astype("float64") / 10),
+            -9999.
+            )
+        
+        np.testing.assert_array_equal(c1, expected1)
+        np.testing.assert_array_equal(c2, expected2)
+        np.testing.assert_allclose(c3, expected3, rtol = 1e-6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_results
+
+Purpose
+-------
+Test reading Graphab output tables and parsing metric values.
+
+Notes
+-----
+Graphab is replaced by a stand-in that prints a metric value or appends a
+local metric column to the patch table.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 18:52:40 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+from unittest import mock
+import pandas as pd
+from src.graphab4py import results
+from src.graphab4py.project import Project
+from src.graphab4py.results import read_table, read_delta, \
+    parse_metric_output
+
+class _GraphabStandIn(Project):
+    def _base_call(self, java = None, memory = None, cores = None,
+                   graphab = None, **kwargs):
+        if "gmetric" in kwargs and kwargs["gmetric"][0] == "PC":
+            return "Global metric\nPC : [3.0955E-4]\n", ""
+        
+        if "gmetric" in kwargs:
+            return "Global metric\nEC_d1000_p0.05 : 1.5E3\n", ""
+        
+        file = os.path.join(os.path.dirname(kwargs["project"]),
+                            "patches.csv")
+        table = pd.read_csv(file)
+        table["F_d1000_g1"] = table["Id"] * 2
+        table.to_csv(file, index = False)
+        
+        return "", ""
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        results.clear_cache()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_read_delta(self):
+        file = os.path.join(self.tmp.name, "delta-PC_g1.txt")
+        
+        with open(file, "w") as f:
+            f.write("Id\td_PC\n3\t0.5\n1\t2\n")
+        
+        delta = read_delta(file)
+        self.assertEqual(list(delta.index), [3, 1])
+        self.assertEqual(delta.index.dtype, "int64")
+        self.assertEqual(delta["d_PC"].dtype, "float64")
+        
+        with open(file, "w") as f:
+            f.write("Id\td_PC\n1-2\t0.5\n2-3\t2\n")
+        
+        self.assertEqual(list(read_delta(file).index), ["1-2", "2-3"])
+    
+    def test_appended_columns(self):
+        file = os.path.join(self.tmp.name, "patches.csv")
+        table = pd.DataFrame({"Id" : [1, 2, 3], "Area" : [1., 2., 3.]})
+        table.to_csv(file, index = False)
+        read_table(file)
+        
+        table["F"] = [4, 5, 6]
+        table.to_csv(file, index = False)
+        
+        with mock.patch.object(results, "_read",
+                               wraps = results._read) as reader:
+            updated = read_table(file)
+        
+        self.assertEqual(reader.call_args.kwargs["usecols"], ["Id", "F"])
+        self.assertEqual(list(updated.columns), ["Area", "F"])
+        self.assertEqual(list(updated["F"]), [4., 5., 6.])
+    
+    def test_parse_metric_output(self):
+        self.assertEqual(
+            parse_metric_output("PC_d1000_p0.05 : 1.2E-4\n"),
+            {"PC_d1000_p0.05" : 1.2e-4}
+            )
+        self.assertEqual(
+            parse_metric_output("{NC=[3.0]}\nCCP = [0.5, 0.25]"),
+            {"NC" : [3.], "CCP" : [.5, .25]}
+            )
+        self.assertEqual(parse_metric_output("PC : [3.0955E-4]"),
+                         {"PC" : [3.0955e-4]})
+        self.assertEqual(parse_metric_output("{EC=[1250.5]}\n"),
+                         {"EC" : [1250.5]})
+    
+    def test_calculate_metric(self):
+        prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(prj_dir)
+        pd.DataFrame({"Id" : [1, 2], "Area" : [1., 2.]}).to_csv(
+            os.path.join(prj_dir, "patches.csv"), index = False
+            )
+        project = _GraphabStandIn()
+        project.project_file = os.path.join(prj_dir, "prj.xml")
+        project.linksets = ["L1"]
+        project.graphs = ["g1"]
+        
+        out = project.calculate_metric("EC", d = 1000, p = .05)
+        self.assertEqual(out["metric_value"], 1500.)
+        
+        out = project.calculate_metric("PC", d = 1000, p = .05)
+        self.assertEqual(out["metric_value"], 3.0955e-4)
+        self.assertEqual(out["metric_values"], {"PC" : [3.0955e-4]})
+        
+        out = project.calculate_metric("F", d = 1000, mtype = "local")
+        self.assertEqual(list(out["metric_table"]["F_d1000_g1"]), [2., 4.])
+
+if __name__ == "__main__":
+    unittest.main()
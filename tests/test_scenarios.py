@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_scenarios
+
+Purpose
+-------
+Test incremental scenario graphs: metrics of a scenario with added, removed
+and modified patches equal those of a graph rebuilt from scratch, and only
+changed components are recomputed.
+
+Notes
+-----
+The project is a directory with the files Graphab would write (patches.tif,
+patches.csv, <linkset>-links.csv and the project XML).
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 22:31:52 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+import pandas as pd
+from src.graphab4py.project import Project
+from src.graphab4py.graph import Graph
+from tests.helpers import write_raster, euclid_links
+
+_xml = '''<Project><name>prj</name><costLinks><entry><string>L1</string>
+<Linkset><name>L1</name><type>1</type><type_dist>1</type_dist>
+<distMax>{0}</distMax></Linkset></entry></costLinks></Project>'''
+
+def _patch_table(labels, res = 10.):
+    ids, counts = np.unique(labels[labels > 0], return_counts = True)
+    
+    return pd.DataFrame({"Id" : ids, "Area" : counts * res**2,
+                         "Capacity" : counts * res**2})
+
+class TestScenarios(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.threshold = 35.
+        labels = np.zeros((40, 40), dtype = "int32")
+        labels[2:5, 2:5] = 1
+        labels[2:4, 8:10] = 2
+        labels[9:12, 3:6] = 3
+        labels[30:33, 30:34] = 4
+        labels[35:37, 36:38] = 5
+        labels[20, 20] = 6
+        self.labels = labels
+        
+        new = np.zeros_like(labels)
+        new[5:7, 12:14] = 7
+        new[26:28, 28:31] = 8
+        self.new = new
+        
+        prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(prj_dir)
+        write_raster(os.path.join(prj_dir, "patches.tif"), labels)
+        self.new_file = write_raster(
+            os.path.join(self.tmp.name, "new.tif"), new
+            )
+        _patch_table(labels).to_csv(
+            os.path.join(prj_dir, "patches.csv"), index = False
+            )
+        euclid_links(labels, 10., self.threshold).to_csv(
+            os.path.join(prj_dir, "L1-links.csv"), index = False
+            )
+        
+        with open(os.path.join(prj_dir, "prj.xml"), "w") as f:
+            f.write(_xml.format(self.threshold))
+        
+        self.prj = Project()
+        self.prj.name = "prj"
+        self.prj.directory = self.tmp.name
+        self.prj.project_file = os.path.join(prj_dir, "prj.xml")
+        self.prj.linksets = ["L1"]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_scenario_equals_rebuild(self):
+        base = self.prj.get_graph()
+        self.assertEqual(base.area, 40 * 40 * 100.)
+        
+        scenario = self.prj.scenario(add = self.new_file, remove = [6],
+                                     capacity = {4 : 50.}, graph = base)
+        
+        labels = np.where(self.new > 0, self.new, self.labels)
+        labels[labels == 6] = 0
+        patches = _patch_table(labels)
+        patches.loc[patches["Id"] == 4, "Capacity"] = 50.
+        rebuilt = Graph(patches, euclid_links(labels, 10., self.threshold),
+                        area = base.area)
+        
+        self.assertEqual(sorted(scenario.ids), sorted(rebuilt.ids))
+        self.assertEqual(len(scenario.links), len(rebuilt.links))
+        self.assertTrue(scenario.links["ID2"].isin([7, 8]).any())
+        
+        for metric, args in [("EC", {"d" : 30, "p" : .5}),
+                             ("PC", {"d" : 30, "p" : .5}),
+                             ("IIC", {}), ("NC", {})]:
+            self.assertAlmostEqual(scenario.metric(metric, **args),
+                                   rebuilt.metric(metric, **args))
+        
+        # The base graph is unchanged
+        self.assertIn(6, base.ids)
+        self.assertNotIn(7, base.ids)
+    
+    def test_cached_components(self):
+        base = self.prj.get_graph()
+        ec = base.metric("EC", d = 30, p = .5)
+        cached = len(base._pair_cache)
+        
+        # Patches 4 and 5 form a component which the scenario does not touch
+        scenario = base.scenario(capacity = {1 : 500.})
+        scenario.metric("EC", d = 30, p = .5)
+        self.assertEqual(len(base._pair_cache), cached + 1)
+        
+        same = base.scenario(capacity = {1 : 900.}).scenario(
+            capacity = {1 : float(base.capacity[0])}
+            )
+        self.assertAlmostEqual(same.metric("EC", d = 30, p = .5), ec)
+    
+    def test_duplicate_link(self):
+        patches = pd.DataFrame({"Id" : [1, 2], "Area" : [1., 1.]})
+        links = pd.DataFrame({"ID1" : [1], "ID2" : [2], "Dist" : [100.]})
+        base = Graph(patches, links, area = 2.)
+        shorter = base.scenario(links = pd.DataFrame(
+            {"ID1" : [2], "ID2" : [1], "Dist" : [50.]}
+            ))
+        longer = base.scenario(links = pd.DataFrame(
+            {"ID1" : [2], "ID2" : [1], "Dist" : [200.]}
+            ))
+        
+        self.assertAlmostEqual(base.metric("PC", d = 100, p = .5), .75)
+        self.assertAlmostEqual(shorter.metric("PC", d = 100, p = .5),
+                               (2 + 2 * .5 ** .5) / 4)
+        self.assertAlmostEqual(longer.metric("PC", d = 100, p = .5), .75)
+        self.assertEqual(shorter.distances([1])[0, 1], 50.)
+    
+    def test_invalid_scenarios(self):
+        base = self.prj.get_graph()
+        
+        with self.assertRaises(ValueError):
+            base.scenario(add = pd.DataFrame({"Id" : [1], "Area" : [1.]}),
+                          links = pd.DataFrame(columns = ["ID1", "ID2",
+                                                          "Dist"]))
+        
+        with self.assertRaises(KeyError):
+            base.scenario(links = pd.DataFrame({"ID1" : [1], "ID2" : [99],
+                                                "Dist" : [1.]}))
+        
+        with self.assertRaises(KeyError):
+            base.scenario(remove = [99])
+
+if __name__ == "__main__":
+    unittest.main()
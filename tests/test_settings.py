@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_settings
+
+Purpose
+-------
+Test that Graphab settings are merged per call and do not leak between
+projects running in parallel threads, the creation of CDS archives for fast
+startup, JVM profiles, and the resource records of Graphab calls.
+
+Notes
+-----
+Running Graphab is replaced by a stand-in that records the command. Java is
+replaced by a shell script that reports a version and writes a dummy archive.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 19:21:09 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, sys, json, stat, time, threading, unittest, tempfile
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from src.graphab4py import project
+from src.graphab4py.project import Project, set_cores, enable_fast_startup
+
+_java = '''#!/bin/sh
+for a in "$@"; do
+    case "$a" in
+        -version) echo 'openjdk version "{0}" 2022-01-18'; exit 0;;
+        -XX:ArchiveClassesAtExit=*) echo archive > "${{a#*=}}";;
+    esac
+done
+'''
+
+class TestSettings(unittest.TestCase):
+    def setUp(self):
+        self.saved = dict(project.ga_settings)
+        project.ga_settings.update({"java" : "java", "memory" : "2g",
+                                    "cores" : None, "graphab" : "g.jar"})
+        self.commands = []
+        self.lock = threading.Lock()
+    
+    def tearDown(self):
+        project.ga_settings.clear()
+        project.ga_settings.update(self.saved)
+    
+    def _run(self, cmd):
+        with self.lock:
+            self.commands.append(cmd)
+        
+        time.sleep(.01)
+        
+        return b"done", b"", {"pid" : 1, "wall_time" : .01, "exit_code" : 0}
+    
+    def test_call_settings(self):
+        prj = Project(memory = "4g")
+        settings = prj._call_settings(cores = 3, memory = None)
+        
+        self.assertEqual(settings["memory"], "4g")
+        self.assertEqual(settings["cores"], 3)
+        
+        with self.assertRaises(TypeError):
+            settings["cores"] = 1
+        
+        with self.assertRaises(TypeError):
+            Project(heap = "4g")
+    
+    def test_concurrent_projects(self):
+        small = Project(memory = "1g", cores = 1)
+        large = Project(memory = "8g", cores = 4)
+        
+        def run(k):
+            prj = small if k % 2 == 0 else large
+            
+            return prj._base_call(project = f"p{k}.xml")
+        
+        with mock.patch.object(project, "_run_process", self._run):
+            with ThreadPoolExecutor(max_workers = 8) as executor:
+                list(executor.map(run, range(40)))
+            
+            large._base_call(project = "p.xml", memory = "16g")
+        
+        for cmd in self.commands[:-1]:
+            k = int(cmd[-1][1:-4])
+            memory, cores = ("1g", "1") if k % 2 == 0 else ("8g", "4")
+            self.assertIn(f"-Xmx{memory}", cmd)
+            self.assertEqual(cmd[cmd.index("-proc") + 1], cores)
+        
+        self.assertIn("-Xmx16g", self.commands[-1])
+        self.assertEqual(project.ga_settings["memory"], "2g")
+        self.assertIsNone(project.ga_settings["cores"])
+    
+    @unittest.skipIf(os.name == "nt", "Requires a POSIX shell.")
+    def test_fast_startup(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        java = os.path.join(tmp.name, "java")
+        jar = os.path.join(tmp.name, "graphab.jar")
+        
+        for file, text in [(java, _java.format("17.0.2")), (jar, "v1")]:
+            with open(file, "w") as f:
+                f.write(text)
+        
+        os.chmod(java, os.stat(java).st_mode | stat.S_IEXEC)
+        project.ga_settings.update({"java" : java, "graphab" : jar})
+        project._java_versions.clear()
+        
+        with mock.patch.object(project, "_cds_dir",
+                               os.path.join(tmp.name, "cds")):
+            archive = enable_fast_startup(temporary = True)
+            self.assertTrue(os.path.isfile(archive))
+            
+            with mock.patch.object(project, "_run_process", self._run):
+                Project()._base_call(project = "p.xml")
+                
+                with open(jar, "w") as f:
+                    f.write("v2")
+                
+                Project()._base_call(project = "p.xml")
+            
+            self.assertIn(f"-XX:SharedArchiveFile={archive}",
+                          self.commands[0])
+            self.assertNotIn(f"-XX:SharedArchiveFile={archive}",
+                             self.commands[1])
+            archives = lambda: [f for f in os.listdir(project._cds_dir)
+                                if f.endswith(".jsa")]
+            self.assertEqual(len(archives()), 1)
+            
+            # Archives of another Graphab installation are kept
+            other = os.path.join(tmp.name, "other.jar")
+            
+            with open(other, "w") as f:
+                f.write("v1")
+            
+            current = project._cds_archive(java, jar)
+            
+            with mock.patch.object(project, "_run_process", self._run):
+                Project(graphab = other)._base_call(project = "p.xml")
+                Project()._base_call(project = "p.xml")
+                self.assertEqual(len(archives()), 2)
+                self.assertIn(f"-XX:SharedArchiveFile={current}",
+                              self.commands[-1])
+                
+                os.remove(other)
+                
+                with open(jar, "w") as f:
+                    f.write("v3")
+                
+                Project()._base_call(project = "p.xml")
+            
+            self.assertEqual(len(archives()), 1)
+            
+            with open(java, "w") as f:
+                f.write(_java.format("1.8.0_292"))
+            
+            project._java_versions.clear()
+            
+            with self.assertRaises(ValueError):
+                enable_fast_startup(temporary = True)
+    
+    def test_jvm_profiles(self):
+        prj = Project(memory = "4g", cores = 2)
+        
+        plain = Project()
+        project.ga_settings["memory"] = None
+        
+        with mock.patch.object(project, "_run_process", self._run), \
+                mock.patch.dict(project.operation_profiles):
+            prj._base_call(operation = "create", create = [])
+            prj._base_call(operation = "metric", project = "p.xml")
+            prj._base_call(operation = "delta", project = "p.xml")
+            prj._base_call(operation = "create", jvm_profile = "low-memory",
+                           create = [])
+            plain._base_call(operation = "create", create = [])
+            project.set_jvm_profile("low-memory", operation = "metric")
+            plain._base_call(operation = "metric", project = "p.xml")
+            
+            with self.assertRaises(ValueError):
+                prj._base_call(jvm_profile = "fast", project = "p.xml")
+        
+        create, metric, delta, low, plain_create, plain_metric = \
+            self.commands
+        
+        for flag in ["-XX:+UseG1GC", "-Xms4g", "-Xss256m"]:
+            self.assertIn(flag, create)
+            self.assertNotIn(flag, low)
+        
+        self.assertIn("-XX:+UseParallelGC", delta)
+        self.assertIn("-XX:ActiveProcessorCount=2", low)
+        self.assertEqual(project.operation_profiles["metric"], "default")
+        
+        self.assertEqual(metric[:metric.index("-jar")],
+                         ["java", "-Djava.awt.headless=true", "-Xmx4g"])
+        
+        # Without resource limits, only explicitly set profiles apply
+        self.assertEqual(plain_create[:plain_create.index("-jar")],
+                         ["java", "-Djava.awt.headless=true"])
+        self.assertIn("-XX:+UseSerialGC", plain_metric)
+        self.assertIn("-XX:+UseSerialGC", low)
+        self.assertLess(low.index("-XX:+UseSerialGC"), low.index("-jar"))
+    
+    def test_run_record(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        log = os.path.join(tmp.name, "runs.jsonl")
+        script = "import sys; x = bytearray(2**27); sys.exit(3)"
+        prj = Project(run_log = log)
+        
+        out, err, usage = project._run_process(
+            [sys.executable, "-c", script]
+            )
+        self.assertEqual(usage["exit_code"], 3)
+        self.assertEqual(project.process_ids, [])
+        
+        if hasattr(os, "wait4"):
+            self.assertGreater(usage["max_rss"], 2**27)
+            self.assertGreaterEqual(usage["user_time"], 0)
+        
+        with mock.patch.object(project, "_run_process", self._run):
+            prj._base_call(operation = "metric", project = "p.xml")
+            prj._base_call(operation = "delta", project = "p.xml")
+        
+        self.assertEqual(len(prj.runs), 2)
+        self.assertEqual(prj.last_run["operation"], "delta")
+        
+        with open(log, "r") as f:
+            records = [json.loads(l) for l in f]
+        
+        self.assertEqual([r["operation"] for r in records],
+                         ["metric", "delta"])
+        self.assertEqual(records[0]["command"], self.commands[0])
+        
+        with mock.patch.object(project, "_run_process", self._run), \
+                mock.patch.object(project, "_max_runs", 3):
+            for _ in range(4):
+                prj._base_call(operation = "graph", project = "p.xml")
+        
+        self.assertEqual([r["operation"] for r in prj.runs], ["graph"] * 3)
+    
+    @unittest.skipIf(not hasattr(os, "wait4"), "Requires os.wait4.")
+    def test_interrupted_process(self):
+        processes = []
+        popen = project.subprocess.Popen
+        
+        def start(*args, **kwargs):
+            processes.append(popen(*args, **kwargs))
+            
+            return processes[-1]
+        
+        with mock.patch.object(project.subprocess, "Popen", start), \
+                mock.patch.object(threading.Thread, "join",
+                                  side_effect = KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                project._run_process(
+                    [sys.executable, "-c", "import time; time.sleep(60)"]
+                    )
+        
+        self.assertIsNotNone(processes[0].returncode)
+        self.assertEqual(project.process_ids, [])
+    
+    def test_set_cores(self):
+        set_cores(6)
+        self.assertEqual(project.ga_settings["cores"], 6)
+        self.assertEqual(project.ga_settings["memory"], "2g")
+
+if __name__ == "__main__":
+    unittest.main()
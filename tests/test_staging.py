@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_staging
+
+Purpose
+-------
+Test running Graphab on a copy of the project in a scratch directory: only
+changed files are synced back, failed runs leave the project untouched and
+interrupted syncs are completed.
+
+Notes
+-----
+Running Graphab is replaced by a stand-in that edits the staged project.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 21:38:16 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, json, unittest, tempfile
+from unittest import mock
+from src.graphab4py import project
+from src.graphab4py.project import Project
+
+class TestStaging(unittest.TestCase):
+    def setUp(self):
+        self.saved = dict(project.ga_settings)
+        project.ga_settings.update({"java" : "java", "memory" : None,
+                                    "cores" : None, "graphab" : "g.jar"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prj_dir = os.path.join(self.tmp.name, "net", "prj")
+        self.scratch = os.path.join(self.tmp.name, "scratch")
+        os.makedirs(self.prj_dir)
+        
+        for name, text in [("prj.xml", "<Project/>"),
+                           ("patches.csv", "Id,Area\n1,2\n"),
+                           ("old.txt", "old")]:
+            with open(os.path.join(self.prj_dir, name), "w") as f:
+                f.write(text)
+        
+        self.xml = os.path.join(self.prj_dir, "prj.xml")
+        self.staged = []
+    
+    def tearDown(self):
+        project.ga_settings.clear()
+        project.ga_settings.update(self.saved)
+        self.tmp.cleanup()
+    
+    def _graphab(self, exit_code = 0):
+        def run(cmd):
+            staged = os.path.dirname(cmd[cmd.index("--project") + 1])
+            self.staged.append(staged)
+            
+            # Rewrite one file unchanged, change one, add one, delete one
+            with open(os.path.join(staged, "prj.xml"), "w") as f:
+                f.write("<Project/>")
+            
+            with open(os.path.join(staged, "patches.csv"), "a") as f:
+                f.write("2,5\n")
+            
+            with open(os.path.join(staged, "delta-F_g1.txt"), "w") as f:
+                f.write("Id\td_F\n1\t0.5\n")
+            
+            os.remove(os.path.join(staged, "old.txt"))
+            
+            return b"", b"", {"pid" : 1, "exit_code" : exit_code}
+        
+        return run
+    
+    def test_sync_back(self):
+        prj = Project(scratch = self.scratch)
+        
+        with mock.patch.object(project, "_run_process", self._graphab()), \
+                mock.patch.object(project, "_file_hash",
+                                  wraps = project._file_hash) as hashed:
+            prj._base_call(project = self.xml,
+                           delta = ["F", f"sel={self.prj_dir}/a.txt"])
+        
+        self.assertNotEqual(os.path.dirname(self.staged[0]), self.prj_dir)
+        self.assertTrue(self.staged[0].startswith(self.scratch))
+        self.assertEqual(sorted(os.listdir(self.prj_dir)),
+                         ["delta-F_g1.txt", "patches.csv", "prj.xml"])
+        
+        with open(os.path.join(self.prj_dir, "patches.csv"), "r") as f:
+            self.assertEqual(f.read(), "Id,Area\n1,2\n2,5\n")
+        
+        # Only the rewritten file of equal size is compared by hash
+        self.assertEqual(hashed.call_count, 2)
+        self.assertIn(self.staged[0], prj.last_run["command"][-1])
+        self.assertEqual(os.listdir(self.scratch), [])
+    
+    def test_failed_run(self):
+        prj = Project(scratch = self.scratch)
+        
+        with mock.patch.object(project, "_run_process",
+                               self._graphab(exit_code = 1)):
+            with self.assertWarns(UserWarning):
+                prj._base_call(project = self.xml)
+        
+        self.assertEqual(sorted(os.listdir(self.prj_dir)),
+                         ["old.txt", "patches.csv", "prj.xml"])
+        self.assertEqual(os.listdir(self.scratch), [])
+    
+    def test_interrupted_sync(self):
+        with open(os.path.join(self.prj_dir, "patches.csv.g4p-sync"),
+                  "w") as f:
+            f.write("Id,Area\n1,3\n")
+        
+        with open(os.path.join(self.prj_dir, "orphan.txt.g4p-sync"),
+                  "w") as f:
+            f.write("partial")
+        
+        journal = os.path.join(self.prj_dir, ".g4p-sync.json")
+        
+        with open(journal, "w") as f:
+            json.dump({"replace" : ["patches.csv"], "remove" : ["old.txt"]},
+                      f)
+        
+        project._recover_sync(self.prj_dir)
+        self.assertFalse(os.path.exists(journal))
+        
+        with open(os.path.join(self.prj_dir, "patches.csv"), "r") as f:
+            self.assertEqual(f.read(), "Id,Area\n1,3\n")
+        
+        # Without a journal, copies of an unfinished copy phase are dropped
+        project._recover_sync(self.prj_dir)
+        self.assertEqual(sorted(os.listdir(self.prj_dir)),
+                         ["patches.csv", "prj.xml"])
+
+if __name__ == "__main__":
+    unittest.main()
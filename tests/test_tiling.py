@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_tiling
+
+Purpose
+-------
+Test tiled processing by comparing the merged patches and links of a tiled
+run against an untiled run on a small synthetic landscape.
+
+Notes
+-----
+Graphab is replaced by a minimal Python engine (scipy.ndimage labelling and
+brute-force edge-to-edge distances), so the test runs offline.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 11:47:05 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, unittest, tempfile
+import numpy as np
+import pandas as pd
+from src.graphab4py.tiling import TiledProject
+from src.graphab4py.graph import Graph
+from tests.helpers import write_raster, read_raster, euclid_links
+
+class _PythonEngine():
+    def create_project(self, name, landscape, habitat, directory,
+                       nomerge = False, nodata = None, connexity = 8,
+                       **ga_settings):
+        from scipy import ndimage
+        
+        data, transform = read_raster(landscape)
+        structure = np.ones((3, 3)) if connexity == 8 else None
+        labels, _ = ndimage.label(data == habitat, structure = structure)
+        prj_dir = os.path.join(directory, name)
+        os.makedirs(prj_dir, exist_ok = True)
+        patch_raster = write_raster(
+            os.path.join(prj_dir, "patches.tif"), labels.astype("int32"),
+            res = transform.a, origin = (transform.c, transform.f)
+            )
+        
+        return {"dir" : prj_dir, "patch_raster" : patch_raster}
+    
+    def create_linkset(self, tile_project, disttype, linkname, threshold,
+                       cost_raster = None, **ga_settings):
+        labels, transform = read_raster(tile_project["patch_raster"])
+        links = euclid_links(labels, transform.a, threshold)
+        links_file = os.path.join(tile_project["dir"], linkname + "-links.csv")
+        links.to_csv(links_file, index = False)
+        
+        return links_file
+
+class TestTiledProject(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(42)
+        landscape = (rng.random((61, 57)) < .3).astype("int16")
+        landscape[30, :] = 1
+        landscape[:, 9] = 2
+        self.landscape = landscape
+        self.file = write_raster(
+            os.path.join(self.tmp.name, "landscape.tif"), landscape
+            )
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_tiled_equals_untiled(self):
+        threshold = 25.
+        tp = TiledProject(
+            tile_size = 16, halo = threshold, n_jobs = 3,
+            engine = _PythonEngine(), block_size = 10
+            )
+        tp.create_project(
+            "tiled", self.file, habitat = 1, directory = self.tmp.name
+            )
+        tiled_links = tp.create_linkset("euclid", "L1", threshold)
+        tiled_labels, _ = read_raster(tp.patch_raster)
+        
+        engine = _PythonEngine()
+        prj = engine.create_project(
+            "untiled", self.file, 1, os.path.join(self.tmp.name, "ref")
+            )
+        ref_labels, _ = read_raster(prj["patch_raster"])
+        ref_links = pd.read_csv(engine.create_linkset(prj, "euclid", "L1",
+                                                      threshold))
+        
+        # Patches must match one to one
+        self.assertEqual(tiled_labels.max(), ref_labels.max())
+        np.testing.assert_array_equal(tiled_labels > 0, ref_labels > 0)
+        pairs = np.unique(
+            np.stack([tiled_labels[tiled_labels > 0],
+                      ref_labels[ref_labels > 0]]), axis = 1
+            )
+        self.assertEqual(pairs.shape[1], ref_labels.max())
+        mapping = np.zeros(tiled_labels.max() + 1, dtype = "int64")
+        mapping[pairs[0]] = pairs[1]
+        
+        # Links must match after translating patch IDs
+        id1 = mapping[tiled_links["ID1"]]
+        id2 = mapping[tiled_links["ID2"]]
+        tiled = pd.DataFrame({"ID1" : np.minimum(id1, id2),
+                              "ID2" : np.maximum(id1, id2),
+                              "Dist" : tiled_links["Dist"]})
+        tiled = tiled.sort_values(["ID1", "ID2"]).reset_index(drop = True)
+        ref = ref_links[["ID1", "ID2", "Dist"]].sort_values(["ID1", "ID2"])
+        pd.testing.assert_frame_equal(
+            tiled, ref.reset_index(drop = True), check_dtype = False
+            )
+        
+        # Metrics on the merged graph equal metrics on the untiled graph
+        cells = np.bincount(ref_labels.ravel())[1:]
+        ref_patches = pd.DataFrame({"Id" : np.arange(1, len(cells) + 1),
+                                    "Area" : cells * 100.})
+        area = self.landscape.size * 100.
+        ec_ref = Graph(ref_patches, ref_links, area = area).metric(
+            "EC", d = 20, p = .5
+            )
+        ec_tiled = tp.get_graph().metric("EC", d = 20, p = .5)
+        self.assertAlmostEqual(ec_tiled, ec_ref)
+    
+    def test_halo_too_narrow(self):
+        tp = TiledProject(tile_size = 16, halo = 10, engine = _PythonEngine())
+        tp.create_project(
+            "tiled", self.file, habitat = 1, directory = self.tmp.name
+            )
+        
+        with self.assertRaises(ValueError):
+            tp.create_linkset("euclid", "L1", 25)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''
+Script name
+-----------
+test_tracing
+
+Purpose
+-------
+Test nested timing spans around Project methods and their export as a
+Chrome trace.
+
+Notes
+-----
+Graphab is replaced by a stand-in that appends a local metric column to the
+patch table.
+
+'''
+
+__author__ = "Manuel"
+__date__ = "Mon Oct 19 21:10:37 2026"
+__credits__ = ["Manuel R. Popp"]
+__license__ = "Unlicense"
+__version__ = "1.0.0"
+__maintainer__ = "Manuel R. Popp"
+__email__ = "requests@cdpopp.de"
+__status__ = "Production"
+
+#-----------------------------------------------------------------------------|
+import os, json, unittest, tempfile
+import pandas as pd
+from src.graphab4py import tracing, results
+from src.graphab4py.project import Project
+
+class _GraphabStandIn(Project):
+    def _base_call(self, java = None, memory = None, cores = None,
+                   graphab = None, **kwargs):
+        with tracing.span("Graphab process"):
+            file = os.path.join(os.path.dirname(self.project_file),
+                                "patches.csv")
+            table = pd.read_csv(file)
+            table["F_g1"] = table["Id"] * 2
+            table.to_csv(file, index = False)
+        
+        return "", ""
+
+class _Recorder():
+    def __init__(self):
+        self.spans = []
+        self.closed = False
+    
+    def on_start(self, span):
+        pass
+    
+    def on_end(self, span):
+        self.spans.append(span)
+    
+    def close(self):
+        self.closed = True
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        results.clear_cache()
+        prj_dir = os.path.join(self.tmp.name, "prj")
+        os.makedirs(prj_dir)
+        pd.DataFrame({"Id" : [1, 2], "Area" : [1., 2.]}).to_csv(
+            os.path.join(prj_dir, "patches.csv"), index = False
+            )
+        self.project = _GraphabStandIn()
+        self.project.project_file = os.path.join(prj_dir, "prj.xml")
+        self.project.linksets = ["L1"]
+        self.project.graphs = ["g1"]
+    
+    def tearDown(self):
+        tracing.disable()
+        self.tmp.cleanup()
+    
+    def test_spans(self):
+        recorder = _Recorder()
+        trace_file = os.path.join(self.tmp.name, "trace.json")
+        tracing.enable(recorder, tracing.ChromeTraceExporter(trace_file))
+        self.project.calculate_metric("F", mtype = "local")
+        tracing.disable()
+        
+        names = [s.name for s in recorder.spans]
+        self.assertEqual(names[-1], "Project.calculate_metric")
+        self.assertIn("Graphab process", names)
+        self.assertIn("read appended columns", names)
+        
+        root = recorder.spans[-1]
+        
+        for span in recorder.spans[:-1]:
+            self.assertIs(span.parent, root)
+            self.assertLessEqual(span.duration, root.duration)
+        
+        self.assertTrue(recorder.closed)
+        
+        with open(trace_file, "r") as f:
+            trace = json.load(f)
+        
+        self.assertEqual(sorted(e["name"] for e in trace["traceEvents"]),
+                         sorted(names))
+        self.assertTrue(all(e["ph"] == "X" for e in trace["traceEvents"]))
+    
+    def test_disabled(self):
+        recorder = _Recorder()
+        tracing.enable(recorder)
+        tracing.disable()
+        self.project.calculate_metric("F", mtype = "local")
+        
+        self.assertEqual(recorder.spans, [])
+        self.assertIs(tracing.span("x"), tracing._null_span)
+
+if __name__ == "__main__":
+    unittest.main()